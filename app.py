@@ -1,24 +1,45 @@
 import os
-import html
 import re
-import base64
 import hashlib
-import hmac
+import uuid
 from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Optional
+from zoneinfo import available_timezones
 
 import pandas as pd
 import streamlit as st
+import streamlit.components.v1 as components
 
 from scheduler_core import (
-    generate_slots,
-    get_conn,
-    load_polls,
-    slot_label,
+    DEFAULT_TIMEZONE,
+    CredentialCache,
+    PollRepository,
+    SlotArrays,
+    SlotRules,
+    generate_slot_arrays,
+    hash_password,
+    open_repository,
+    render_timeline_html,
+    run_positions,
+    slot_runs,
+    span,
+    tracer,
 )
+from scheduler_calendar_sync import start_sync
+from scheduler_export import EXPORT_FORMATS
+from scheduler_metrics import ACTIVE_POLLS, CACHE_LOOKUPS, CACHE_MISSES, serve_from_env
+from scheduler_solver import best_meetings, plan_series
+from synology_client import PushJob, SynologyClient
 
 st.set_page_config(page_title="DB/DC Seminar Scheduler", layout="wide")
 
 DEFAULT_ADMIN_PASS = "changeme"
+ARCHIVE_SWEEP_SECONDS = 3600
+TIMEZONES = sorted(available_timezones() | {DEFAULT_TIMEZONE})
+# static HTML component (components/slot_grid/index.html); no frontend build step
+SLOT_GRID = components.declare_component(
+    "slot_grid", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "slot_grid")
+)
 
 TRANSLATIONS = {
     "ko": {
@@ -39,6 +60,19 @@ TRANSLATIONS = {
         "start_time": "시작 시간",
         "end_time": "종료 시간",
         "slot_minutes": "슬롯 길이(분)",
+        "timezone": "시간대",
+        "weekdays": "요일",
+        "weekday_names": "월,화,수,목,금,토,일",
+        "exclude_dates": "제외할 날짜 (선택)",
+        "exclude_dates_help": "쉼표로 구분한 YYYY-MM-DD 목록 (공휴일 등)",
+        "exclude_dates_invalid": "제외할 날짜 형식이 올바르지 않습니다: {value}",
+        "use_break": "점심시간 제외",
+        "skip_conflicts": "확정된 다른 일정과 겹치는 슬롯 제외",
+        "conflicts_final": "슬롯 {count}개가 확정된 다른 일정과 겹칩니다: {polls}",
+        "conflicts_skipped": "확정된 다른 일정과 겹치는 슬롯 {count}개를 제외했습니다.",
+        "conflicts_open": "슬롯 {count}개가 투표 중인 다른 일정의 후보 시간과 겹칩니다: {polls}",
+        "break_start": "휴식 시작",
+        "break_end": "휴식 종료",
         "create_submit": "일정 생성/덮어쓰기",
         "poll_id_required": "일정명을 입력해주세요.",
         "date_required": "시작/종료 날짜를 모두 선택해주세요.",
@@ -48,6 +82,12 @@ TRANSLATIONS = {
         "participation": "참여 및 현황",
         "no_polls": "아직 생성된 일정이 없습니다.",
         "open_polls": "열린 일정",
+        "catalog_search": "일정 검색",
+        "catalog_search_help": "제목과 설명에서 찾습니다. 단어의 앞부분만 입력해도 됩니다.",
+        "catalog_archived": "지난 일정 보기",
+        "catalog_prev": "이전",
+        "catalog_next": "다음",
+        "catalog_empty": "조건에 맞는 일정이 없습니다.",
         "vote_section": "투표하기",
         "voter_name": "이름",
         "comment": "메모 (선택)",
@@ -59,8 +99,10 @@ TRANSLATIONS = {
         "popular_col_slot": "슬롯",
         "popular_col_yes": "찬성",
         "no_responses": "아직 응답이 없습니다. 투표를 입력하거나 직접 확정하세요.",
-        "export_title": "CSV 내보내기",
-        "export_button": "CSV 다운로드",
+        "export_title": "결과 내보내기",
+        "export_button": "다운로드",
+        "export_format": "파일 형식",
+        "export_all": "모든 일정 포함",
         "export_success": "다운로드 준비 완료",
         "export_fail": "내보내기에 실패했습니다: {error}",
         "timeline_title": "타임라인 미리보기",
@@ -107,7 +149,26 @@ TRANSLATIONS = {
         "syno_need_slot": "업로드할 슬롯을 결정할 수 없습니다. 투표를 먼저 받으세요.",
         "syno_success": "Synology 캘린더에 업로드되었습니다.",
         "syno_error": "Synology 업로드 실패: {error}",
+        "syno_pending": "Synology 캘린더에 업로드 중입니다…",
+        "syno_sync_all": "확정된 일정 모두 동기화",
+        "syno_sync_help": "확정된 모든 일정을 캘린더에 올립니다. 이미 올린 일정은 바뀐 경우에만 다시 보냅니다.",
+        "syno_sync_done": "동기화 완료: 새로 {created}건, 변경 {updated}건, 그대로 {unchanged}건, 실패 {failed}건",
+        "diag_title": "진단 (요청별 소요 시간)",
+        "diag_enable": "추적 켜기",
+        "diag_enable_help": "켜면 다음 새로고침부터 이 세션의 구간 시간과 SQL을 기록합니다. 모든 세션을 기록하려면 SCHEDULER_TRACE=1로 시작하세요.",
+        "diag_empty": "기록된 실행이 없습니다. 추적을 켜고 페이지를 사용해 보세요.",
+        "diag_rerun": "실행",
+        "diag_col_span": "구간 / SQL",
+        "diag_col_start": "시작(ms)",
+        "diag_col_ms": "소요(ms)",
+        "diag_col_params": "파라미터",
+        "diag_col_when": "시각",
+        "diag_col_rerun": "실행",
+        "diag_col_plan": "쿼리 계획",
+        "diag_slow": "느린 쿼리 ({ms}ms 이상, 모든 세션)",
+        "diag_slow_none": "아직 느린 쿼리가 없습니다.",
         "slot_click_hint": "가능한 슬롯을 클릭해 선택/해제하세요 (미선택 시 전부 사용)",
+        "slot_grid_hint": "칸을 클릭하거나 드래그해서 여러 슬롯을 한 번에 선택/해제하세요.",
         "participant_filter": "참여자 필터",
         "admin_edit_title": "참여자 일정 편집",
         "admin_edit_pick": "편집할 참여자",
@@ -117,7 +178,25 @@ TRANSLATIONS = {
         "finalize_section": "일정 확정",
         "finalize_slot": "확정할 슬롯",
         "finalize_button": "확정하기",
+        "finalize_hide_conflicts": "다른 확정 일정과 겹치는 슬롯 숨기기",
+        "finalize_all_conflict": "모든 슬롯이 다른 확정 일정과 겹칩니다.",
         "finalized_label": "확정된 슬롯: {label}",
+        "finalize_stale": "선택한 시간이 현재 슬롯과 맞지 않습니다. 새로고침 후 다시 선택하세요.",
+        "solver_title": "최적 시간 찾기",
+        "solver_required": "필수 참여자",
+        "solver_length": "회의 길이 (연속 슬롯 수)",
+        "solver_none": "조건을 만족하는 시간이 없습니다.",
+        "solver_col_slot": "시간",
+        "solver_col_count": "참석 가능",
+        "solver_col_missing": "빠지는 필수 참여자",
+        "solver_pick": "확정할 추천",
+        "solver_finalize": "추천 시간으로 확정",
+        "solver_series": "여러 회차 추천",
+        "solver_series_k": "회차 수",
+        "solver_series_cover": "1인당 최소 참석 횟수",
+        "solver_series_gap": "회차 간 최소 간격(일)",
+        "solver_series_run": "회차 추천 계산",
+        "solver_short": "목표 참석 횟수에 못 미치는 참여자: {names}",
         "email_draft": "메일 초안",
         "need_final_for_export": "관리자가 일정 확정을 완료해야 내보낼 수 있습니다.",
         "syno_missing_fields": "URL/계정/비밀번호/캘린더 ID를 입력하세요.",
@@ -143,6 +222,19 @@ TRANSLATIONS = {
         "start_time": "Start time",
         "end_time": "End time",
         "slot_minutes": "Slot length (minutes)",
+        "timezone": "Timezone",
+        "weekdays": "Weekdays",
+        "weekday_names": "Mon,Tue,Wed,Thu,Fri,Sat,Sun",
+        "exclude_dates": "Excluded dates (optional)",
+        "exclude_dates_help": "Comma-separated YYYY-MM-DD list, e.g. holidays",
+        "exclude_dates_invalid": "Invalid excluded date: {value}",
+        "use_break": "Skip a lunch break",
+        "skip_conflicts": "Leave out slots that clash with finalized polls",
+        "conflicts_final": "{count} slot(s) overlap finalized polls: {polls}",
+        "conflicts_skipped": "Left out {count} slot(s) that clash with finalized polls.",
+        "conflicts_open": "{count} slot(s) overlap candidate times of other open polls: {polls}",
+        "break_start": "Break start",
+        "break_end": "Break end",
         "create_submit": "Create/overwrite poll",
         "poll_id_required": "Schedule name is required.",
         "date_required": "Select both start and end dates.",
@@ -152,6 +244,12 @@ TRANSLATIONS = {
         "participation": "Participation & status",
         "no_polls": "No polls yet.",
         "open_polls": "Open polls",
+        "catalog_search": "Search polls",
+        "catalog_search_help": "Matches title and description; the start of a word is enough.",
+        "catalog_archived": "Show archived",
+        "catalog_prev": "Previous",
+        "catalog_next": "Next",
+        "catalog_empty": "No polls match.",
         "vote_section": "Vote",
         "voter_name": "Name/Nickname",
         "comment": "Note (optional)",
@@ -163,8 +261,10 @@ TRANSLATIONS = {
         "popular_col_slot": "Slot",
         "popular_col_yes": "Yes",
         "no_responses": "No responses yet. Add votes or finalize directly.",
-        "export_title": "CSV export",
-        "export_button": "Download CSV",
+        "export_title": "Export results",
+        "export_button": "Download",
+        "export_format": "File format",
+        "export_all": "Include all polls",
         "export_success": "Download ready",
         "export_fail": "Export failed: {error}",
         "timeline_title": "Timeline preview",
@@ -211,7 +311,26 @@ TRANSLATIONS = {
         "syno_need_slot": "Cannot determine a slot to upload. Collect votes first.",
         "syno_success": "Uploaded to Synology Calendar.",
         "syno_error": "Synology upload failed: {error}",
+        "syno_pending": "Uploading to Synology Calendar…",
+        "syno_sync_all": "Sync all finalized polls",
+        "syno_sync_help": "Pushes every finalized poll to the calendar; events already there are resent only if they changed.",
+        "syno_sync_done": "Sync finished: {created} new, {updated} updated, {unchanged} unchanged, {failed} failed",
+        "diag_title": "Diagnostics (time per rerun)",
+        "diag_enable": "Enable tracing",
+        "diag_enable_help": "From the next rerun on, records span timings and SQL for this session. Start with SCHEDULER_TRACE=1 to record every session.",
+        "diag_empty": "No reruns recorded yet. Enable tracing and use the page.",
+        "diag_rerun": "Rerun",
+        "diag_col_span": "Span / SQL",
+        "diag_col_start": "Start (ms)",
+        "diag_col_ms": "Time (ms)",
+        "diag_col_params": "Parameters",
+        "diag_col_when": "When",
+        "diag_col_rerun": "Rerun",
+        "diag_col_plan": "Query plan",
+        "diag_slow": "Slow queries (over {ms} ms, all sessions)",
+        "diag_slow_none": "No slow queries yet.",
         "slot_click_hint": "Click slots to include/exclude (all used if none picked).",
+        "slot_grid_hint": "Click a cell, or drag across several, to select or clear them.",
         "participant_filter": "Filter by participant",
         "admin_edit_title": "Edit participant schedule",
         "admin_edit_pick": "Participant to edit",
@@ -221,7 +340,25 @@ TRANSLATIONS = {
         "finalize_section": "Finalize schedule",
         "finalize_slot": "Slot to finalize",
         "finalize_button": "Finalize",
+        "finalize_hide_conflicts": "Hide slots that clash with other finalized polls",
+        "finalize_all_conflict": "Every slot clashes with another finalized poll.",
         "finalized_label": "Finalized slot: {label}",
+        "finalize_stale": "That time no longer matches the poll's slots. Reload and pick again.",
+        "solver_title": "Find the best time",
+        "solver_required": "Required participants",
+        "solver_length": "Meeting length (consecutive slots)",
+        "solver_none": "No time satisfies these constraints.",
+        "solver_col_slot": "Time",
+        "solver_col_count": "Can attend",
+        "solver_col_missing": "Required but unavailable",
+        "solver_pick": "Suggestion to finalize",
+        "solver_finalize": "Finalize suggestion",
+        "solver_series": "Series of meetings",
+        "solver_series_k": "Meetings",
+        "solver_series_cover": "Min. meetings per person",
+        "solver_series_gap": "Min. days between meetings",
+        "solver_series_run": "Plan series",
+        "solver_short": "Below the attendance target: {names}",
         "email_draft": "Email draft",
         "need_final_for_export": "Export is available only after an admin finalizes the schedule.",
         "syno_missing_fields": "Enter URL/account/password/calendar ID.",
@@ -250,25 +387,12 @@ def slugify(text: str) -> str:
     return f"poll-{digest}"
 
 
-def hash_password(password: str) -> str:
-    salt = os.urandom(16)
-    iterations = 200_000
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
-    return f"pbkdf2${iterations}${base64.b64encode(salt).decode('ascii')}${base64.b64encode(dk).decode('ascii')}"
-
-
-def check_password(password: str, stored: str) -> tuple[bool, bool]:
-    if stored.startswith("pbkdf2$"):
-        try:
-            _, iter_s, salt_b64, dk_b64 = stored.split("$", 3)
-            iterations = int(iter_s)
-            salt = base64.b64decode(salt_b64)
-            dk_expected = base64.b64decode(dk_b64)
-        except Exception:
-            return False, False
-        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
-        return hmac.compare_digest(dk, dk_expected), False
-    return password == stored, True
+def parse_dates(raw: str):
+    """Parse a comma/space separated list of ISO dates; None if any entry is malformed."""
+    try:
+        return [date.fromisoformat(part) for part in re.split(r"[,\s]+", raw.strip()) if part]
+    except ValueError:
+        return None
 
 
 def get_admin_password() -> str:
@@ -290,113 +414,225 @@ def load_usage_md(lang: str) -> str:
 
 
 @st.cache_resource
-def get_conn_cached():
-    return get_conn()
+def get_repository() -> PollRepository:
+    """Process-wide storage backend chosen by ``SCHEDULER_DB_URL`` (SQLite by default)."""
+    repo = open_repository()
+    ACTIVE_POLLS.set_function(repo.count_active_polls)
+    serve_from_env()
+    return repo
 
 
-def render_timeline(options_df: pd.DataFrame, summary_map: dict, voters_map: dict):
-    """Draw a horizontal timeline per day with slot popularity intensity and voter tooltip."""
-    if options_df.empty:
-        return
-
-    st.markdown(
-        """
-        <style>
-        .timeline-card {background: linear-gradient(120deg,#0f172a 0%,#1f2937 40%,#0b1628 100%); color:#eef2ff;
-            padding:16px 18px; border-radius:14px; margin-bottom:12px; box-shadow:0 12px 28px rgba(15,23,42,0.35);}
-        .timeline-title {font-weight:700; margin-bottom:6px;}
-        .timeline-row {margin:10px 0 16px 0;}
-        .timeline-label {font-size:13px; color:#cbd5e1; margin-bottom:6px;}
-        .timeline-bar {display:flex; border-radius:10px; overflow:visible; background:#0b1222; border:1px solid #1e293b; flex-wrap:wrap;}
-        .timeline-segment {height:32px; display:flex; align-items:center; justify-content:center;
-            font-size:12px; color:#e2e8f0; white-space:nowrap; position:relative; cursor:pointer;}
-        .timeline-segment:not(:last-child) {border-right:1px solid rgba(255,255,255,0.08);}
-        .timeline-badge {margin-left:8px; padding:3px 8px; border-radius:999px; font-size:11px; background:rgba(255,255,255,0.08);}
-        .timeline-segment:hover {outline:1px solid rgba(255,255,255,0.25);}
-        .timeline-segment[data-tip]:hover:after {
-            content: attr(data-tip);
-            position:absolute;
-            bottom:110%;
-            left:50%;
-            transform:translateX(-50%);
-            background:rgba(15,23,42,0.95);
-            color:#e2e8f0;
-            padding:6px 10px;
-            border-radius:8px;
-            font-size:11px;
-            white-space:pre-line;
-            word-break:break-word;
-            max-width:90vw;
-            line-height:1.35;
-            box-shadow:0 8px 18px rgba(0,0,0,0.4);
-            z-index:10;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_poll_snapshot(poll_id: str, revision: int):
+    CACHE_MISSES.labels("snapshot").inc()
+    return get_repository().load_poll_snapshot(poll_id)
+
+
+def get_poll_snapshot(poll_id: str, revision: int):
+    """Poll meta/options/votes, reloaded only when a write bumps the poll's revision."""
+    CACHE_LOOKUPS.labels("snapshot").inc()
+    return cached_poll_snapshot(poll_id, revision)
 
-    palette = ["#1e293b", "#0ea5e9", "#0ea5e9", "#0284c7", "#0369a1", "#075985"]
 
-    def color_for(count: int, max_count: int) -> str:
-        if max_count <= 0:
-            return palette[0]
-        ratio = count / max_count
-        idx = min(len(palette) - 1, int(ratio * (len(palette) - 1)))
-        return palette[idx]
+@st.cache_data(ttl=ARCHIVE_SWEEP_SECONDS, show_spinner=False)
+def sweep_archive() -> int:
+    """Archive polls whose final slot has passed, at most once per ``ARCHIVE_SWEEP_SECONDS``."""
+    return len(get_repository().archive_finished_polls())
+
+
+def reset_catalog():
+    st.session_state["catalog_cursors"] = []
+
+
+def catalog_next(cursor):
+    st.session_state.setdefault("catalog_cursors", []).append(cursor)
+
+
+def catalog_prev():
+    cursors = st.session_state.setdefault("catalog_cursors", [])
+    if cursors:
+        cursors.pop()
+
+
+def load_catalog_page():
+    """Current page of the poll list; only ``POLL_PAGE_SIZE`` rows ever reach the browser."""
+    cursors = st.session_state.setdefault("catalog_cursors", [])
+    with span("load_poll_page"):
+        return get_repository().load_poll_page(
+            st.session_state.get("catalog_query", ""),
+            st.session_state.get("catalog_archived", False),
+            cursors[-1] if cursors else None,
+        )
 
-    day_groups = []
-    for _, row in options_df.iterrows():
-        start_dt = datetime.fromisoformat(row["start_ts"])
-        end_dt = datetime.fromisoformat(row["end_ts"])
-        key = start_dt.strftime("%Y-%m-%d (%a)")
-        day_groups.append((key, start_dt, end_dt, row["option_id"]))
 
-    grouped = {}
-    for key, start_dt, end_dt, oid in day_groups:
-        grouped.setdefault(key, []).append((start_dt, end_dt, oid))
+TIMELINE_CSS = """
+<style>
+.timeline-card {background: linear-gradient(120deg,#0f172a 0%,#1f2937 40%,#0b1628 100%); color:#eef2ff;
+    padding:16px 18px; border-radius:14px; margin-bottom:12px; box-shadow:0 12px 28px rgba(15,23,42,0.35);}
+.timeline-title {font-weight:700; margin-bottom:6px;}
+.timeline-row {margin:10px 0 16px 0;}
+.timeline-label {font-size:13px; color:#cbd5e1; margin-bottom:6px;}
+.timeline-bar {display:flex; border-radius:10px; overflow:visible; background:#0b1222; border:1px solid #1e293b; flex-wrap:wrap;}
+.timeline-segment {height:32px; display:flex; align-items:center; justify-content:center;
+    font-size:12px; color:#e2e8f0; white-space:nowrap; position:relative; cursor:pointer;}
+.timeline-segment:not(:last-child) {border-right:1px solid rgba(255,255,255,0.08);}
+.timeline-badge {margin-left:8px; padding:3px 8px; border-radius:999px; font-size:11px; background:rgba(255,255,255,0.08);}
+.timeline-segment:hover {outline:1px solid rgba(255,255,255,0.25);}
+.timeline-segment[data-tip]:hover:after {
+    content: attr(data-tip);
+    position:absolute;
+    bottom:110%;
+    left:50%;
+    transform:translateX(-50%);
+    background:rgba(15,23,42,0.95);
+    color:#e2e8f0;
+    padding:6px 10px;
+    border-radius:8px;
+    font-size:11px;
+    white-space:pre-line;
+    word-break:break-word;
+    max-width:90vw;
+    line-height:1.35;
+    box-shadow:0 8px 18px rgba(0,0,0,0.4);
+    z-index:10;
+}
+</style>
+"""
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def timeline_html(poll_id: str, revision: int, voter_filter: tuple, lang: str) -> str:
+    """Timeline markup memoized per (poll revision, participant filter, language)."""
+    CACHE_MISSES.labels("timeline").inc()
+    snapshot = get_poll_snapshot(poll_id, revision)
+    if snapshot is None:
+        return ""
+    tally = snapshot.availability.tally(voter_filter) if voter_filter else snapshot.tally
+    strings = {**TRANSLATIONS["ko"], **TRANSLATIONS.get(lang, {})}
+    return render_timeline_html(
+        snapshot.slots,
+        tally.counts,
+        tally.voters,
+        title=strings["timeline_title"],
+        people_suffix=strings["people_suffix"],
+        slots_badge=strings["timeline_slots_badge"],
+    )
 
-    max_count_overall = max(summary_map.values()) if summary_map else 0
 
-    st.markdown(
-        f"<div class='timeline-card'><div class='timeline-title'>{t('timeline_title')}</div>",
-        unsafe_allow_html=True,
+def render_timeline(snapshot, voter_filter: tuple = ()):
+    """Draw a horizontal timeline per day with slot popularity intensity and voter tooltip."""
+    with span("render_timeline", filtered=bool(voter_filter)):
+        CACHE_LOOKUPS.labels("timeline").inc()
+        markup = timeline_html(snapshot.poll_id, snapshot.revision, voter_filter, st.session_state.get("lang", "ko"))
+        if markup:
+            st.markdown(TIMELINE_CSS + markup, unsafe_allow_html=True)
+
+
+def slot_grid(slot_index, sel_key: str, key: str):
+    """Day x time picker writing the chosen option ids to ``st.session_state[sel_key]``.
+
+    One widget for every slot; the browser sends the selection back once a click or drag
+    settles, so picking costs one rerun instead of one per slot.
+    """
+    days, times, cells = slot_index.grid()
+    position = slot_index.position
+    selected = [position[oid] for oid in st.session_state.get(sel_key, []) if oid in position]
+
+    def apply_grid():
+        value = st.session_state.get(key) or {}
+        ids = slot_index.option_ids
+        st.session_state[sel_key] = [ids[pos] for pos in run_positions(value.get("runs", [])) if pos < len(ids)]
+
+    SLOT_GRID(
+        days=days,
+        times=times,
+        cells=cells,
+        selected=slot_runs(selected),
+        hint=t("slot_grid_hint"),
+        key=key,
+        on_change=apply_grid,
+        default=None,
     )
-    for day_key, slots in grouped.items():
-        slots = sorted(slots, key=lambda x: x[0])
-        day_start = min(s[0] for s in slots)
-        day_end = max(s[1] for s in slots)
-        total_minutes = max(1, int((day_end - day_start).total_seconds() / 60))
-        seg_html = ""
-        for start_dt, end_dt, oid in slots:
-            duration = max(1, int((end_dt - start_dt).total_seconds() / 60))
-            width = duration / total_minutes * 100
-            count = summary_map.get(oid, 0)
-            voters = voters_map.get(oid, [])
-            voter_list = "\n".join(voters[:15]) if voters else ""
-            tooltip_lines = [
-                f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')}",
-                f"{count} {t('people_suffix')}",
+
+
+def render_diagnostics():
+    """Admin-only view of recent reruns' spans and of statements slower than the threshold."""
+    with st.expander(t("diag_title")):
+        # per session: flipping the process-wide tracer.enabled would trace everyone's reruns
+        st.session_state.trace_enabled = st.checkbox(
+            t("diag_enable"), value=st.session_state.trace_enabled, help=t("diag_enable_help")
+        )
+        # only this session's reruns; the one drawing this page is still growing, so it is left out
+        current = tracer.current()
+        traces = {
+            f"{tr.started_at:%H:%M:%S.%f} · {tr.label} · {tr.duration * 1000:.1f} ms": tr
+            for tr in reversed(tracer.session_traces(st.session_state.trace_session))
+            if tr is not current
+        }
+        if not traces:
+            st.info(t("diag_empty"))
+            return
+        pick = st.selectbox(t("diag_rerun"), list(traces), key="diag_trace")
+        spans = pd.DataFrame(
+            [
+                {
+                    t("diag_col_span"): "· " * sp.depth + (" ".join(sp.attrs["sql"].split()) if sp.kind == "sql" else sp.name),
+                    t("diag_col_start"): round(sp.start * 1000, 2),
+                    t("diag_col_ms"): round(sp.duration * 1000, 2),
+                    t("diag_col_params"): sp.attrs.get("params", ""),
+                }
+                for sp in traces[pick].sorted_spans()
             ]
-            if voter_list:
-                tooltip_lines.append(voter_list)
-            tooltip = "\n".join(tooltip_lines)
-            tooltip_safe = html.escape(tooltip, quote=True)
-            seg_html += (
-                f"<div class='timeline-segment' style='width:{width:.2f}%;"
-                f"background:{color_for(count, max_count_overall)}' data-tip='{tooltip_safe}' title='{tooltip_safe}'>"
-                f"{start_dt.strftime('%H:%M')}</div>"
-            )
-        st.markdown(
-            f"""
-            <div class='timeline-row'>
-              <div class='timeline-label'>{day_key}<span class='timeline-badge'>{t('timeline_slots_badge', count=len(slots))}</span></div>
-              <div class='timeline-bar'>{seg_html}</div>
-            </div>
-            """,
-            unsafe_allow_html=True,
         )
-    st.markdown("</div>", unsafe_allow_html=True)
+        st.dataframe(spans, hide_index=True, use_container_width=True)
+        st.markdown(f"**{t('diag_slow', ms=int(tracer.slow_ms))}**")
+        slow = list(tracer.slow_queries)[::-1]
+        if not slow:
+            st.caption(t("diag_slow_none"))
+        else:
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        {
+                            t("diag_col_when"): f"{at:%H:%M:%S}",
+                            t("diag_col_rerun"): label,
+                            t("diag_col_ms"): round(sp.duration * 1000, 2),
+                            t("diag_col_span"): " ".join(sp.attrs["sql"].split()),
+                            t("diag_col_params"): sp.attrs.get("params", ""),
+                            t("diag_col_plan"): " / ".join(sp.attrs.get("plan", [])),
+                        }
+                        for at, label, sp in slow
+                    ]
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+
+def synology_client(url: str, account: str, password: str) -> SynologyClient:
+    """Per-session client so discovery, login sid and HTTP connections are reused across pushes."""
+    clients = st.session_state.setdefault("syno_clients", {})
+    if (url, account, password) not in clients:
+        clients[(url, account, password)] = SynologyClient(url, account, password)
+    return clients[(url, account, password)]
+
+
+@st.fragment(run_every=1.0)
+def watch_push(job: PushJob):
+    """Re-render only this block every second until the background push finishes."""
+    if job.status == "running":
+        st.info(t("syno_pending"))
+    else:
+        st.rerun()
+
+
+def show_push(job: PushJob, describe: Optional[Callable[[Any], str]] = None):
+    if job.status == "running":
+        watch_push(job)
+    elif job.status == "done":
+        st.success(describe(job.result) if describe else t("syno_success"))
+    else:
+        st.error(t("syno_error", error=job.error))
 
 
 if "logged_in" not in st.session_state:
@@ -412,626 +648,577 @@ if st.session_state.get("simple_view_force_off"):
     st.session_state.pop("simple_view_force_off", None)
 if "flash_save" not in st.session_state:
     st.session_state.flash_save = False
+if "credentials" not in st.session_state:
+    st.session_state.credentials = CredentialCache()
+credentials = st.session_state.credentials
+if "trace_enabled" not in st.session_state:
+    st.session_state.trace_enabled = tracer.enabled
+if "trace_session" not in st.session_state:
+    st.session_state.trace_session = uuid.uuid4().hex
+trace = tracer.begin(st.session_state.mode, st.session_state.trace_enabled, st.session_state.trace_session)
+# st.stop() and st.rerun() end the script by raising, so the trace is closed in finally
+try:
+    lang_label_map = {"ko": "한국어", "en": "English"}
+    st.sidebar.selectbox(
+        t("language"),
+        options=list(lang_label_map.keys()),
+        format_func=lambda x: lang_label_map.get(x, x),
+        key="lang",
+    )
+    mode_label_map = {"guide": t("mode_guide"), "admin": t("mode_admin"), "guest": t("mode_guest")}
+    st.sidebar.radio(t("mode"), options=["guide", "guest", "admin"], format_func=lambda x: mode_label_map[x], key="mode")
 
-lang_label_map = {"ko": "한국어", "en": "English"}
-st.sidebar.selectbox(
-    t("language"),
-    options=list(lang_label_map.keys()),
-    format_func=lambda x: lang_label_map.get(x, x),
-    key="lang",
-)
-mode_label_map = {"guide": t("mode_guide"), "admin": t("mode_admin"), "guest": t("mode_guest")}
-st.sidebar.radio(t("mode"), options=["guide", "guest", "admin"], format_func=lambda x: mode_label_map[x], key="mode")
+    st.title(t("app_title"))
 
-st.title(t("app_title"))
+    admin_password = get_admin_password()
 
-admin_password = get_admin_password()
+    st.sidebar.info(t("sidebar_info"))
 
-st.sidebar.info(t("sidebar_info"))
+    if st.session_state.mode == "guide":
+        st.subheader(t("usage_title"))
+        st.markdown(load_usage_md(st.session_state.lang))
+        if st.session_state.flash_save:
+            st.success(t("vote_saved"))
+            st.session_state.flash_save = False
+        st.stop()
+
+    if st.session_state.mode == "admin":
+        if not st.session_state.logged_in:
+            with st.form("login"):
+                password = st.text_input(t("login_title"), type="password")
+                login = st.form_submit_button(t("login_button"))
+            if login:
+                if password == admin_password:
+                    st.session_state.logged_in = True
+                    st.success(t("login_success"))
+                    st.rerun()
+                else:
+                    st.error(t("login_error"))
+            st.stop()
+    else:
+        st.session_state.logged_in = False  # ensure guest mode doesn't carry admin flag
 
-if st.session_state.mode == "guide":
-    st.subheader(t("usage_title"))
-    st.markdown(load_usage_md(st.session_state.lang))
     if st.session_state.flash_save:
         st.success(t("vote_saved"))
         st.session_state.flash_save = False
-    st.stop()
-
-if st.session_state.mode == "admin":
-    if not st.session_state.logged_in:
-        with st.form("login"):
-            password = st.text_input(t("login_title"), type="password")
-            login = st.form_submit_button(t("login_button"))
-        if login:
-            if password == admin_password:
-                st.session_state.logged_in = True
-                st.success(t("login_success"))
-                st.rerun()
-            else:
-                st.error(t("login_error"))
-        st.stop()
-else:
-    st.session_state.logged_in = False  # ensure guest mode doesn't carry admin flag
-
-if st.session_state.flash_save:
-    st.success(t("vote_saved"))
-    st.session_state.flash_save = False
-
-conn = get_conn_cached()
-open_polls = load_polls(conn)
 
-is_admin = st.session_state.mode == "admin" and st.session_state.logged_in
+    repo = get_repository()
+    sweep_archive()
 
-if is_admin:
-    col_left, col_right = st.columns([1, 1.3])
-else:
-    col_left = None
-    col_right = st.container()
+    is_admin = st.session_state.mode == "admin" and st.session_state.logged_in
 
-with col_left if col_left else st.container():
     if is_admin:
-        # initialize defaults once
-        if "form_initialized" not in st.session_state:
-            st.session_state["form_poll_id"] = ""
-            st.session_state["form_name"] = ""
-            st.session_state["form_desc"] = t("poll_desc_default")
-            st.session_state["form_date_range"] = (date.today(), date.today() + timedelta(days=7))
-            st.session_state["form_start_time"] = time(9, 0)
-            st.session_state["form_end_time"] = time(18, 0)
-            st.session_state["form_slot_minutes"] = 60
-            st.session_state["form_poll_password"] = ""
-            st.session_state["form_initialized"] = True
-
-        # apply pending prefill before rendering widgets
-        prefill = st.session_state.pop("prefill_data", None)
-        if prefill:
-            for k, v in prefill.items():
-                st.session_state[k] = v
-
-        st.subheader(t("create_title"))
-        with st.form("create_poll"):
-            poll_name = st.text_input(t("poll_name"), key="form_name", help=t("poll_name_help"))
-            description = st.text_area(t("poll_desc"), key="form_desc")
-            date_range = st.date_input(
-                t("date_range"),
-                key="form_date_range",
-                help=t("date_help"),
-            )
-            if isinstance(date_range, date):
-                date_range = (date_range, date_range)
-            start_time = st.time_input(t("start_time"), key="form_start_time")
-            end_time = st.time_input(t("end_time"), key="form_end_time")
-            slot_minutes = st.number_input(t("slot_minutes"), min_value=15, max_value=240, step=15, key="form_slot_minutes")
-            poll_password = st.text_input(t("poll_password"), key="form_poll_password", help=t("poll_password_help"), type="password")
-            submitted = st.form_submit_button(t("create_submit"))
-
-        if submitted:
-            poll_id = st.session_state.get("form_poll_id") or slugify(poll_name)
-            title = poll_name.strip()
-            if not poll_name:
-                st.error(t("poll_id_required"))
-            elif len(date_range) != 2:
-                st.error(t("date_required"))
-            elif start_time >= end_time:
-                st.error(t("time_invalid"))
-            else:
-                start_d, end_d = date_range
-                slots = generate_slots(start_d, end_d, start_time, end_time, int(slot_minutes))
-                if not slots:
-                    st.error(t("no_slots"))
+        col_left, col_right = st.columns([1, 1.3])
+    else:
+        col_left = None
+        col_right = st.container()
+
+    with col_left if col_left else st.container():
+        if is_admin:
+            # initialize defaults once
+            if "form_initialized" not in st.session_state:
+                st.session_state["form_poll_id"] = ""
+                st.session_state["form_name"] = ""
+                st.session_state["form_desc"] = t("poll_desc_default")
+                st.session_state["form_date_range"] = (date.today(), date.today() + timedelta(days=7))
+                st.session_state["form_start_time"] = time(9, 0)
+                st.session_state["form_end_time"] = time(18, 0)
+                st.session_state["form_slot_minutes"] = 60
+                st.session_state["form_timezone"] = DEFAULT_TIMEZONE
+                st.session_state["form_poll_password"] = ""
+                st.session_state["form_weekdays"] = list(range(7))
+                st.session_state["form_exclude_dates"] = ""
+                st.session_state["form_use_break"] = False
+                st.session_state["form_break_start"] = time(12, 0)
+                st.session_state["form_break_end"] = time(13, 0)
+                st.session_state["form_skip_conflicts"] = False
+                st.session_state["form_initialized"] = True
+
+            # apply pending prefill before rendering widgets
+            prefill = st.session_state.pop("prefill_data", None)
+            if prefill:
+                for k, v in prefill.items():
+                    st.session_state[k] = v
+
+            st.subheader(t("create_title"))
+            with st.form("create_poll"):
+                poll_name = st.text_input(t("poll_name"), key="form_name", help=t("poll_name_help"))
+                description = st.text_area(t("poll_desc"), key="form_desc")
+                date_range = st.date_input(
+                    t("date_range"),
+                    key="form_date_range",
+                    help=t("date_help"),
+                )
+                if isinstance(date_range, date):
+                    date_range = (date_range, date_range)
+                start_time = st.time_input(t("start_time"), key="form_start_time")
+                end_time = st.time_input(t("end_time"), key="form_end_time")
+                slot_minutes = st.number_input(t("slot_minutes"), min_value=15, max_value=240, step=15, key="form_slot_minutes")
+                timezone = st.selectbox(t("timezone"), TIMEZONES, key="form_timezone")
+                weekday_names = t("weekday_names").split(",")
+                weekdays = st.multiselect(
+                    t("weekdays"), options=list(range(7)), format_func=lambda wd: weekday_names[wd], key="form_weekdays"
+                )
+                exclude_raw = st.text_input(t("exclude_dates"), key="form_exclude_dates", help=t("exclude_dates_help"))
+                use_break = st.checkbox(t("use_break"), key="form_use_break")
+                break_cols = st.columns(2)
+                break_start = break_cols[0].time_input(t("break_start"), key="form_break_start")
+                break_end = break_cols[1].time_input(t("break_end"), key="form_break_end")
+                skip_conflicts = st.checkbox(t("skip_conflicts"), key="form_skip_conflicts")
+                poll_password = st.text_input(t("poll_password"), key="form_poll_password", help=t("poll_password_help"), type="password")
+                submitted = st.form_submit_button(t("create_submit"))
+
+            if submitted:
+                poll_id = st.session_state.get("form_poll_id") or slugify(poll_name)
+                title = poll_name.strip()
+                if not poll_name:
+                    st.error(t("poll_id_required"))
+                elif len(date_range) != 2:
+                    st.error(t("date_required"))
+                elif start_time >= end_time:
+                    st.error(t("time_invalid"))
+                elif parse_dates(exclude_raw) is None:
+                    st.error(t("exclude_dates_invalid", value=exclude_raw))
                 else:
-                    conn.execute("DELETE FROM votes WHERE poll_id = ?", (poll_id,))
-                    conn.execute("DELETE FROM options WHERE poll_id = ?", (poll_id,))
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO polls(
-                            poll_id, title, description, start_date, end_date,
-                            start_time, end_time, slot_minutes, poll_password, created_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
+                    start_d, end_d = date_range
+                    rules = SlotRules(
+                        weekdays=sorted(weekdays),
+                        exclude_dates=parse_dates(exclude_raw),
+                        breaks=[(break_start, break_end)] if use_break and break_start < break_end else [],
+                    )
+                    slots = generate_slot_arrays(start_d, end_d, start_time, end_time, int(slot_minutes), rules)
+                    slot_start_min, slot_end_min = slots.minutes(timezone)
+                    conflict_index = repo.conflict_index(int(slot_end_min.max(initial=0)))
+                    conflicts = conflict_index.conflicts(slot_start_min, slot_end_min, exclude=poll_id)
+                    clashing = [bool(c.finals) for c in conflicts]
+                    if skip_conflicts and any(clashing):
+                        keep = [not clash for clash in clashing]
+                        slots = SlotArrays(slots.starts[keep], slots.ends[keep])
+                        conflicts = [c for c, k in zip(conflicts, keep) if k]
+                    if not len(slots):
+                        st.error(t("no_slots"))
+                    else:
+                        repo.create_poll(
                             poll_id,
                             title,
                             description,
-                            start_d.isoformat(),
-                            end_d.isoformat(),
-                            start_time.isoformat(),
-                            end_time.isoformat(),
+                            start_d,
+                            end_d,
+                            start_time,
+                            end_time,
                             int(slot_minutes),
-                            poll_password or None,
-                            datetime.utcnow().isoformat(),
-                        ),
-                    )
-                    for start_ts, end_ts in slots:
-                        conn.execute(
-                            "INSERT INTO options(poll_id, start_ts, end_ts) VALUES (?, ?, ?)",
-                            (poll_id, start_ts.isoformat(), end_ts.isoformat()),
+                            poll_password,
+                            slots,
+                            rules,
+                            timezone,
                         )
-                    conn.commit()
-                    # Remember the current poll id so repeated edits overwrite instead of creating duplicates
-                    st.session_state["form_poll_id"] = poll_id
-                    st.success(t("poll_ready", poll_id=title or poll_id))
-                    open_polls = load_polls(conn)
-
-with col_right:
-    st.subheader(t("participation") if not is_admin else t("open_polls"))
-    if open_polls.empty:
-        st.info(t("no_polls"))
-        st.stop()
-
-    poll_lookup = {row.poll_id: (row.title or row.poll_id) for _, row in open_polls.iterrows()}
-    selected_poll = st.selectbox(
-        t("open_polls"),
-        open_polls["poll_id"],
-        format_func=lambda pid: poll_lookup.get(pid, pid),
-    )
-    simple_view = st.session_state.get("simple_view", True)
-    if not is_admin:
-        st.checkbox(t("simple_view"), value=simple_view, key="simple_view")
-        simple_view = st.session_state.get("simple_view", True)
-
-    if selected_poll:
-        poll_meta_df = pd.read_sql("SELECT * FROM polls WHERE poll_id = ?", conn, params=(selected_poll,))
-        if poll_meta_df.empty:
-            st.error("선택한 일정 정보를 찾을 수 없습니다. 다시 선택하거나 새로고침하세요.")
-            st.stop()
-        poll_meta = poll_meta_df.iloc[0]
-        st.caption(poll_meta["description"])
-        poll_pw_required = poll_meta.get("poll_password")
-
-        options_df = pd.read_sql(
-            "SELECT option_id, start_ts, end_ts FROM options WHERE poll_id = ? ORDER BY start_ts",
-            conn,
-            params=(selected_poll,),
-        )
+                        # Remember the current poll id so repeated edits overwrite instead of creating duplicates
+                        st.session_state["form_poll_id"] = poll_id
+                        st.success(t("poll_ready", poll_id=title or poll_id))
+                        reset_catalog()
+                        finals = {pid for c in conflicts for pid in c.finals}
+                        if finals:
+                            st.warning(
+                                t(
+                                    "conflicts_final",
+                                    count=sum(bool(c.finals) for c in conflicts),
+                                    polls=conflict_index.describe(sorted(finals)),
+                                )
+                            )
+                        elif skip_conflicts and any(clashing):
+                            st.info(t("conflicts_skipped", count=sum(clashing)))
+                        competing = {pid for c in conflicts for pid in c.candidates}
+                        if competing:
+                            st.caption(
+                                t(
+                                    "conflicts_open",
+                                    count=sum(bool(c.candidates) for c in conflicts),
+                                    polls=conflict_index.describe(sorted(competing)[:5]) + (" …" if len(competing) > 5 else ""),
+                                )
+                            )
 
-        votes_df = pd.read_sql(
-            """
-            SELECT v.voter_name, v.option_id, v.available, o.start_ts, o.end_ts
-            FROM votes v
-            JOIN options o ON v.option_id = o.option_id
-            WHERE v.poll_id = ?
-            """,
-            conn,
-            params=(selected_poll,),
+    with col_right:
+        st.subheader(t("participation") if not is_admin else t("open_polls"))
+        search_cols = st.columns([3, 1])
+        search_cols[0].text_input(
+            t("catalog_search"), key="catalog_query", help=t("catalog_search_help"), on_change=reset_catalog
         )
+        search_cols[1].checkbox(t("catalog_archived"), key="catalog_archived", on_change=reset_catalog)
+        page = load_catalog_page()
+        open_polls = page.polls
+        if open_polls.empty:
+            filtered = st.session_state.get("catalog_query") or st.session_state.get("catalog_archived")
+            st.info(t("catalog_empty") if filtered or st.session_state["catalog_cursors"] else t("no_polls"))
+            st.stop()
 
-        summary_map = votes_df.groupby("option_id")["available"].sum().to_dict() if not votes_df.empty else {}
-        voters_map = (
-            votes_df[votes_df["available"] == 1].groupby("option_id")["voter_name"].apply(list).to_dict()
-            if not votes_df.empty
-            else {}
+        poll_lookup = {pid: (title or pid) for pid, title in zip(open_polls["poll_id"], open_polls["title"])}
+        selected_poll = st.selectbox(
+            t("open_polls"),
+            open_polls["poll_id"],
+            format_func=lambda pid: poll_lookup.get(pid, pid),
         )
-        if not (not is_admin and simple_view):
-            st.caption(t("timeline_hint"))
-            render_timeline(options_df, summary_map, voters_map)
-            if not votes_df.empty:
-                voter_filter = st.multiselect(t("participant_filter"), sorted(votes_df["voter_name"].unique()))
-                if voter_filter:
-                    filtered = votes_df[votes_df["voter_name"].isin(voter_filter)]
-                    summary_map = filtered.groupby("option_id")["available"].sum().to_dict()
-                    voters_map = (
-                        filtered[filtered["available"] == 1].groupby("option_id")["voter_name"].apply(list).to_dict()
-                        if not filtered.empty
-                        else {}
-                    )
-                    render_timeline(options_df, summary_map, voters_map)
-
-        if is_admin:
-            if st.button(t("edit_load"), type="secondary"):
-                st.session_state["prefill_data"] = {
-                    "form_poll_id": poll_meta["poll_id"],
-                    "form_name": poll_meta["title"] or poll_meta["poll_id"],
-                    "form_desc": poll_meta["description"],
-                    "form_date_range": (
-                        datetime.fromisoformat(poll_meta["start_date"]).date(),
-                        datetime.fromisoformat(poll_meta["end_date"]).date(),
-                    ),
-                    "form_start_time": time.fromisoformat(poll_meta["start_time"]),
-                    "form_end_time": time.fromisoformat(poll_meta["end_time"]),
-                    "form_slot_minutes": int(poll_meta["slot_minutes"]),
-                    "form_poll_password": poll_meta.get("poll_password") or "",
-                }
-                st.rerun()
-
-            st.markdown("###")
-            with st.expander(t("admin_slots_title")):
-                admin_sel_key = f"admin_slots_{selected_poll}"
-                existing_ids = options_df["option_id"].tolist()
-                if admin_sel_key not in st.session_state:
-                    st.session_state[admin_sel_key] = existing_ids
-                else:
-                    current = [oid for oid in st.session_state[admin_sel_key] if oid in existing_ids]
-                    st.session_state[admin_sel_key] = current or existing_ids
-
-                st.caption(t("admin_slots_hint"))
-                admin_grouped = {}
-                for _, opt in options_df.iterrows():
-                    start_dt = datetime.fromisoformat(opt["start_ts"])
-                    key = start_dt.strftime("%Y-%m-%d (%a)")
-                    admin_grouped.setdefault(key, []).append(opt)
-
-                for day, rows in admin_grouped.items():
-                    st.markdown(f"**{day}**")
-                    cols = st.columns(min(4, len(rows)))
-                    for idx, opt in enumerate(rows):
-                        col = cols[idx % len(cols)]
-                        with col:
-                            selected = opt["option_id"] in st.session_state[admin_sel_key]
-                            sdt = datetime.fromisoformat(opt["start_ts"])
-                            edt = datetime.fromisoformat(opt["end_ts"])
-                            label = f"{sdt.strftime('%H:%M')} - {edt.strftime('%H:%M')}"
-                            btn_type = "primary" if selected else "secondary"
-
-                            def toggle_admin_option(oid=opt["option_id"]):
-                                current = set(st.session_state.get(admin_sel_key, []))
-                                if oid in current:
-                                    current.remove(oid)
-                                else:
-                                    current.add(oid)
-                                st.session_state[admin_sel_key] = list(current)
-
-                            st.button(
-                                label,
-                                key=f"admin-btn-{opt['option_id']}",
-                                on_click=toggle_admin_option,
-                                type=btn_type,
-                                help=label,
-                                use_container_width=True,
-                            )
-                st.caption(t("selected_count", count=len(st.session_state[admin_sel_key])))
-                if st.button(t("admin_slots_apply"), type="primary"):
-                    chosen = set(st.session_state.get(admin_sel_key, []))
-                    if not chosen:
-                        st.error(t("admin_slots_need"))
-                    else:
-                        removed = set(existing_ids) - chosen
-                        if removed:
-                            placeholders = ",".join("?" for _ in removed)
-                            conn.execute(
-                                f"DELETE FROM votes WHERE poll_id = ? AND option_id IN ({placeholders})",
-                                (selected_poll, *removed),
-                            )
-                            conn.execute(
-                                f"DELETE FROM options WHERE poll_id = ? AND option_id IN ({placeholders})",
-                                (selected_poll, *removed),
-                            )
-                            if poll_meta.get("final_start_ts") and poll_meta.get("final_end_ts"):
-                                final_match = options_df[
-                                    (options_df["start_ts"] == poll_meta["final_start_ts"])
-                                    & (options_df["end_ts"] == poll_meta["final_end_ts"])
-                                ]
-                                if not final_match.empty and final_match.iloc[0]["option_id"] in removed:
-                                    conn.execute(
-                                        "UPDATE polls SET final_start_ts = NULL, final_end_ts = NULL WHERE poll_id = ?",
-                                        (selected_poll,),
-                                    )
-                        conn.commit()
-                        st.success(t("admin_slots_done"))
-                        st.rerun()
+        if st.session_state["catalog_cursors"] or page.next_cursor is not None:
+            pager = st.columns([1, 1, 4])
+            pager[0].button(
+                t("catalog_prev"), key="catalog_prev", disabled=not st.session_state["catalog_cursors"], on_click=catalog_prev
+            )
+            pager[1].button(
+                t("catalog_next"),
+                key="catalog_next",
+                disabled=page.next_cursor is None,
+                on_click=catalog_next,
+                args=(page.next_cursor,),
+            )
+        if trace is not None:
+            trace.label = f"{st.session_state.mode} · {selected_poll}"
+        simple_view = st.session_state.get("simple_view", True)
+        if not is_admin:
+            st.checkbox(t("simple_view"), value=simple_view, key="simple_view")
+            simple_view = st.session_state.get("simple_view", True)
+
+        if selected_poll:
+            with span("get_poll_snapshot"):
+                snapshot = get_poll_snapshot(selected_poll, repo.poll_revision(selected_poll))
+            if snapshot is None:
+                st.error("선택한 일정 정보를 찾을 수 없습니다. 다시 선택하거나 새로고침하세요.")
+                st.stop()
+            poll_meta = snapshot.meta
+            st.caption(poll_meta["description"])
+            poll_pw_required = poll_meta.get("poll_password")
+
+            availability = snapshot.availability
+            slot_index = snapshot.slots
+
+            tally = snapshot.tally
+            if not (not is_admin and simple_view):
+                st.caption(t("timeline_hint"))
+                render_timeline(snapshot)
+                if availability.voters:
+                    voter_filter = st.multiselect(t("participant_filter"), availability.voters)
+                    if voter_filter:
+                        tally = availability.tally(voter_filter)
+                        render_timeline(snapshot, tuple(sorted(voter_filter)))
+
+            if is_admin:
+                if st.button(t("edit_load"), type="secondary"):
+                    rules = SlotRules.from_json(poll_meta.get("slot_rules"))
+                    st.session_state["prefill_data"] = {
+                        "form_poll_id": poll_meta["poll_id"],
+                        "form_name": poll_meta["title"] or poll_meta["poll_id"],
+                        "form_desc": poll_meta["description"],
+                        "form_date_range": (
+                            datetime.fromisoformat(poll_meta["start_date"]).date(),
+                            datetime.fromisoformat(poll_meta["end_date"]).date(),
+                        ),
+                        "form_start_time": time.fromisoformat(poll_meta["start_time"]),
+                        "form_end_time": time.fromisoformat(poll_meta["end_time"]),
+                        "form_slot_minutes": int(poll_meta["slot_minutes"]),
+                        "form_timezone": snapshot.timezone,
+                        "form_poll_password": poll_meta.get("poll_password") or "",
+                        "form_weekdays": list(rules.weekdays) if rules.weekdays is not None else list(range(7)),
+                        "form_exclude_dates": ", ".join(d.isoformat() for d in rules.exclude_dates),
+                        "form_use_break": bool(rules.breaks),
+                        "form_break_start": rules.breaks[0][0] if rules.breaks else time(12, 0),
+                        "form_break_end": rules.breaks[0][1] if rules.breaks else time(13, 0),
+                    }
+                    st.rerun()
 
-            with st.expander(t("delete_poll")):
-                delete_choice = st.radio(
-                    t("delete_confirm"),
-                    options=open_polls["poll_id"].tolist(),
-                    index=list(open_polls["poll_id"]).index(selected_poll),
-                    format_func=lambda pid: poll_lookup.get(pid, pid),
-                    key=f"delete_choice_{selected_poll}",
-                )
-                pw_check = None
-                if poll_pw_required:
-                    pw_check = st.text_input(t("poll_password_prompt"), type="password", key=f"delpw_{selected_poll}")
-                if st.button(t("delete_poll"), type="primary"):
-                    if poll_pw_required and pw_check != poll_pw_required:
-                        st.error(t("access_needed"))
+                st.markdown("###")
+                with st.expander(t("admin_slots_title")):
+                    admin_sel_key = f"admin_slots_{selected_poll}"
+                    existing_ids = slot_index.option_ids
+                    if admin_sel_key not in st.session_state:
+                        st.session_state[admin_sel_key] = existing_ids
                     else:
-                        try:
-                            conn.execute("DELETE FROM votes WHERE poll_id = ?", (delete_choice,))
-                            conn.execute("DELETE FROM options WHERE poll_id = ?", (delete_choice,))
-                            conn.execute("DELETE FROM polls WHERE poll_id = ?", (delete_choice,))
-                            conn.commit()
-                            st.success(t("delete_done"))
+                        current = [oid for oid in st.session_state[admin_sel_key] if oid in existing_ids]
+                        st.session_state[admin_sel_key] = current or existing_ids
+
+                    st.caption(t("admin_slots_hint"))
+                    slot_grid(slot_index, admin_sel_key, key=f"admin_grid_{selected_poll}")
+                    st.caption(t("selected_count", count=len(st.session_state[admin_sel_key])))
+                    if st.button(t("admin_slots_apply"), type="primary"):
+                        chosen = set(st.session_state.get(admin_sel_key, []))
+                        if not chosen:
+                            st.error(t("admin_slots_need"))
+                        else:
+                            removed = set(existing_ids) - chosen
+                            repo.remove_options(selected_poll, removed)
+                            st.success(t("admin_slots_done"))
                             st.rerun()
-                        except Exception as exc:
-                            st.error(t("delete_fail", error=exc))
-
-        first_chosen = None
-
-        if not is_admin:
-            st.markdown(f"**{t('vote_section')}**")
-            sel_key = f"selections_{selected_poll}"
-            st.session_state.setdefault(sel_key, [])
-            voter_name = st.text_input(t("voter_name"), max_chars=40, key=f"name_{selected_poll}")
-            voter_pw = st.text_input(t("voter_pw"), type="password", key=f"pw_{selected_poll}", help=t("voter_pw_help"))
-            comment = st.text_input(t("comment"), max_chars=120, key=f"comment_{selected_poll}")
-
-            def load_my_vote():
-                if not voter_name:
-                    return
-                if not voter_pw:
-                    st.error(t("voter_pw_need"))
-                    return
-                existing = pd.read_sql(
-                    "SELECT option_id, available, comment, voter_password FROM votes WHERE poll_id = ? AND voter_name = ?",
-                    conn,
-                    params=(selected_poll, voter_name),
-                )
-                if not existing.empty:
-                    stored_pw = existing["voter_password"].dropna()
-                    if not stored_pw.empty and stored_pw.iloc[0]:
-                        ok, needs_upgrade = check_password(voter_pw, stored_pw.iloc[0])
-                        if not ok:
-                            st.error(t("voter_pw_mismatch"))
-                            return
-                        if needs_upgrade:
-                            conn.execute(
-                                "UPDATE votes SET voter_password = ? WHERE poll_id = ? AND voter_name = ?",
-                                (hash_password(voter_pw), selected_poll, voter_name),
-                            )
-                            conn.commit()
-                        # If previous record had no password, claim it by setting now
-                    if stored_pw.empty or not stored_pw.iloc[0]:
-                        conn.execute(
-                            "UPDATE votes SET voter_password = ? WHERE poll_id = ? AND voter_name = ?",
-                            (hash_password(voter_pw), selected_poll, voter_name),
-                        )
-                        conn.commit()
-                    chosen = existing[existing["available"] == 1]["option_id"].tolist()
-                    st.session_state[sel_key] = chosen
-                    first_comment = existing["comment"].dropna()
-                    if not first_comment.empty:
-                        st.session_state[f"comment_{selected_poll}"] = first_comment.iloc[0]
-
-            st.button(t("load_my_vote"), on_click=load_my_vote, use_container_width=True)
-
-            grouped_slots = {}
-            for _, opt in options_df.iterrows():
-                start_dt = datetime.fromisoformat(opt["start_ts"])
-                key = start_dt.strftime("%Y-%m-%d (%a)")
-                grouped_slots.setdefault(key, []).append(opt)
-
-            st.markdown(f"_{t('choose_slots')}_")
-            st.markdown(
-                """
-                <style>
-                .slot-button button {width:100%; margin-bottom:6px; border-radius:10px;}
-                @media (max-width: 768px) {.timeline-bar{flex-wrap:wrap;} .timeline-segment{min-width:80px; flex:1 1 45%;}}
-                </style>
-                """,
-                unsafe_allow_html=True,
-            )
-            for day, rows in grouped_slots.items():
-                st.markdown(f"**{day}**")
-                cols = st.columns(min(4, len(rows)))
-                for idx, opt in enumerate(rows):
-                    col = cols[idx % len(cols)]
-                    with col:
-                        selected = opt["option_id"] in st.session_state[sel_key]
-                        sdt = datetime.fromisoformat(opt["start_ts"])
-                        edt = datetime.fromisoformat(opt["end_ts"])
-                        label = f"{sdt.strftime('%H:%M')} - {edt.strftime('%H:%M')}"
-                        btn_label = label
-                        btn_type = "primary" if selected else "secondary"
-
-                        def toggle_option(oid=opt["option_id"]):
-                            current = set(st.session_state.get(sel_key, []))
-                            if oid in current:
-                                current.remove(oid)
-                            else:
-                                current.add(oid)
-                            st.session_state[sel_key] = list(current)
-
-                        st.button(
-                            btn_label,
-                            key=f"btn-{opt['option_id']}",
-                            on_click=toggle_option,
-                            type=btn_type,
-                            help=label,
-                            use_container_width=True,
-                        )
-            st.caption(t("selected_count", count=len(st.session_state[sel_key])))
 
-            save_clicked = st.button(t("vote_submit"), type="primary", use_container_width=True)
-
-            if st.session_state[sel_key]:
-                first_opt = options_df[options_df["option_id"] == st.session_state[sel_key][0]].iloc[0]
-                first_chosen = (
-                    datetime.fromisoformat(first_opt["start_ts"]),
-                    datetime.fromisoformat(first_opt["end_ts"]),
+                with st.expander(t("delete_poll")):
+                    delete_choice = st.radio(
+                        t("delete_confirm"),
+                        options=open_polls["poll_id"].tolist(),
+                        index=list(open_polls["poll_id"]).index(selected_poll),
+                        format_func=lambda pid: poll_lookup.get(pid, pid),
+                        key=f"delete_choice_{selected_poll}",
+                    )
+                    pw_check = None
+                    if poll_pw_required:
+                        pw_check = st.text_input(t("poll_password_prompt"), type="password", key=f"delpw_{selected_poll}")
+                    if st.button(t("delete_poll"), type="primary"):
+                        if poll_pw_required and pw_check != poll_pw_required:
+                            st.error(t("access_needed"))
+                        else:
+                            try:
+                                repo.delete_poll(delete_choice)
+                                st.success(t("delete_done"))
+                                st.rerun()
+                            except Exception as exc:
+                                st.error(t("delete_fail", error=exc))
+
+            first_chosen = None
+
+            if not is_admin:
+                st.markdown(f"**{t('vote_section')}**")
+                sel_key = f"selections_{selected_poll}"
+                st.session_state.setdefault(sel_key, [])
+                voter_name = st.text_input(t("voter_name"), max_chars=40, key=f"name_{selected_poll}")
+                voter_pw = st.text_input(t("voter_pw"), type="password", key=f"pw_{selected_poll}", help=t("voter_pw_help"))
+                comment = st.text_input(t("comment"), max_chars=120, key=f"comment_{selected_poll}")
+
+                def load_my_vote():
+                    if not voter_name:
+                        return
+                    if not voter_pw:
+                        st.error(t("voter_pw_need"))
+                        return
+                    record = repo.load_voter(selected_poll, voter_name)
+                    if record is not None:
+                        if record.voter_password:
+                            ok, needs_upgrade = credentials.verify(selected_poll, voter_name, record.voter_password, voter_pw)
+                            if not ok:
+                                st.error(t("voter_pw_mismatch"))
+                                return
+                        if not record.voter_password or needs_upgrade:
+                            # legacy plaintext or no password yet: (re)claim it with a fresh hash
+                            pw_hash = hash_password(voter_pw)
+                            repo.set_voter_password(selected_poll, voter_name, pw_hash)
+                            credentials.remember(selected_poll, voter_name, pw_hash, voter_pw)
+                        st.session_state[sel_key] = repo.load_voter_choices(selected_poll, voter_name)
+                        if record.comment:
+                            st.session_state[f"comment_{selected_poll}"] = record.comment
+
+                st.button(t("load_my_vote"), on_click=load_my_vote, use_container_width=True)
+
+                st.markdown(f"_{t('choose_slots')}_")
+                st.markdown(
+                    """
+                    <style>
+                    @media (max-width: 768px) {.timeline-bar{flex-wrap:wrap;} .timeline-segment{min-width:80px; flex:1 1 45%;}}
+                    </style>
+                    """,
+                    unsafe_allow_html=True,
                 )
+                slot_grid(slot_index, sel_key, key=f"grid_{selected_poll}")
+                st.caption(t("selected_count", count=len(st.session_state[sel_key])))
 
-            if save_clicked:
-                if not voter_name:
-                    st.error(t("name_required"))
-                elif not voter_pw:
-                    st.error(t("voter_pw_need"))
-                else:
-                    chosen = set(st.session_state.get(sel_key, []))
-                    pw_hash = hash_password(voter_pw)
-                    for _, opt in options_df.iterrows():
-                        available = int(opt["option_id"] in chosen)
-                        conn.execute(
-                            """
-                            INSERT OR REPLACE INTO votes(poll_id, voter_name, option_id, available, comment, voter_password)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            """,
-                            (selected_poll, voter_name, opt["option_id"], available, comment, pw_hash),
-                        )
-                    conn.commit()
-                    st.success(t("vote_saved"))
-                    st.session_state["simple_view_force_off"] = True
-                    st.session_state["flash_save"] = True
-                    st.rerun()
+                save_clicked = st.button(t("vote_submit"), type="primary", use_container_width=True)
 
-        summary = pd.DataFrame()
+                if st.session_state[sel_key] and st.session_state[sel_key][0] in slot_index.position:
+                    first_chosen = slot_index.bounds(st.session_state[sel_key][0])
 
-        best_slot = None
-        final_slot = None
-        if not votes_df.empty and not simple_view:
-            options_df["label"] = options_df.apply(lambda row: slot_label(row["start_ts"], row["end_ts"]), axis=1)
-            chosen = votes_df[votes_df["available"] == 1].merge(
-                options_df[["option_id", "label", "start_ts"]], on="option_id", how="left"
-            )
+                if save_clicked:
+                    if not voter_name:
+                        st.error(t("name_required"))
+                    elif not voter_pw:
+                        st.error(t("voter_pw_need"))
+                    else:
+                        chosen = set(st.session_state.get(sel_key, []))
+                        record = repo.load_voter(selected_poll, voter_name)
+                        if (
+                            record
+                            and record.voter_password
+                            and credentials.lookup(selected_poll, voter_name, record.voter_password, voter_pw)
+                        ):
+                            pw_hash = None  # verified earlier this session; keep the stored hash
+                        else:
+                            pw_hash = hash_password(voter_pw)
+                            credentials.remember(selected_poll, voter_name, pw_hash, voter_pw)
+                        repo.save_votes(selected_poll, voter_name, slot_index.option_ids, chosen, comment, pw_hash)
+                        st.success(t("vote_saved"))
+                        st.session_state["simple_view_force_off"] = True
+                        st.session_state["flash_save"] = True
+                        st.rerun()
 
-            def summarize_by_day(group):
-                day_map = {}
-                for _, r in group.iterrows():
-                    if "start_ts" not in r or not r["start_ts"]:
-                        continue
-                    day = datetime.fromisoformat(str(r["start_ts"])).strftime("%m/%d")
-                    day_map.setdefault(day, []).append(r["label"].split(" ", 1)[-1])
-                parts = []
-                for d, labels in sorted(day_map.items()):
-                    parts.append(f"{d}: {', '.join(sorted(set(labels)))}")
-                return " | ".join(parts)
-
-            if chosen.empty:
-                st.info(t("no_responses"))
+            summary = pd.DataFrame()
+
+            best_slot = None
+            final_slot = snapshot.final_slot
+            if availability.voters and not simple_view:
+                yes_by_option = snapshot.tally.voters
+
+                def summarize_by_day(labels):
+                    day_map = {}
+                    for label in labels:
+                        day, rest = label.split(" ", 1)
+                        day_map.setdefault(day, []).append(rest)
+                    parts = []
+                    for d, labels in sorted(day_map.items()):
+                        parts.append(f"{d}: {', '.join(sorted(set(labels)))}")
+                    return " | ".join(parts)
+
+                if not yes_by_option:
+                    st.info(t("no_responses"))
+                else:
+                    per_voter = pd.DataFrame(
+                        [
+                            (name, summarize_by_day(slot_index.labels[slot_index.position[oid]] for oid in choices))
+                            for name in availability.voters
+                            if (choices := availability.choices(name))
+                        ],
+                        columns=["voter_name", "label"],
+                    )
+                    st.markdown(f"**{t('selected_slots')}**")
+                    st.dataframe(per_voter.rename(columns={"voter_name": t("voter_name"), "label": t("popular_col_slot")}))
+
+                    names_by_label = {}
+                    for oid, names in yes_by_option.items():
+                        names_by_label.setdefault(slot_index.labels[slot_index.position[oid]], set()).update(names)
+                    per_slot = pd.DataFrame(
+                        [(label, ", ".join(sorted(names))) for label, names in sorted(names_by_label.items())],
+                        columns=["label", "voter_name"],
+                    )
+                    st.markdown(f"**{t('popular_names')}**")
+                    st.dataframe(per_slot.rename(columns={"label": t("popular_col_slot"), "voter_name": t("voter_name")}))
+                    best_id = tally.best_option()
+                    if best_id is not None:
+                        best_slot = slot_index.bounds(best_id)
             else:
-                per_voter = chosen.groupby("voter_name").apply(summarize_by_day).reset_index()
-                per_voter.columns = ["voter_name", "label"]
-                st.markdown(f"**{t('selected_slots')}**")
-                st.dataframe(per_voter.rename(columns={"voter_name": t("voter_name"), "label": t("popular_col_slot")}))
+                st.info(t("no_responses"))
 
-                per_slot = (
-                    chosen.groupby(["label"])["voter_name"].apply(lambda x: ", ".join(sorted(set(x)))).reset_index()
-                )
-                per_slot = per_slot.sort_values(by="label")
-                st.markdown(f"**{t('popular_names')}**")
-                st.dataframe(per_slot.rename(columns={"label": t("popular_col_slot"), "voter_name": t("voter_name")}))
-                if summary_map:
-                    best_id = max(summary_map.items(), key=lambda kv: kv[1])[0]
-                    best_slot_row = options_df[options_df["option_id"] == best_id].iloc[0]
-                    best_slot = (
-                        datetime.fromisoformat(best_slot_row["start_ts"]),
-                        datetime.fromisoformat(best_slot_row["end_ts"]),
+            st.markdown("---")
+            if is_admin:
+                total_voters = snapshot.tally.total_voters
+                if availability.voters:
+                    st.markdown(f"**{t('admin_edit_title')}**")
+                    selected_voter = st.selectbox(
+                        t("admin_edit_pick"),
+                        options=availability.voters,
+                        key=f"admin_edit_voter_{selected_poll}",
                     )
-                if poll_meta.get("final_start_ts") and poll_meta.get("final_end_ts"):
-                    final_slot = (
-                        datetime.fromisoformat(poll_meta["final_start_ts"]),
-                        datetime.fromisoformat(poll_meta["final_end_ts"]),
-                    )
-        else:
-            st.info(t("no_responses"))
+                    st.caption(t("admin_edit_hint"))
+                    if selected_voter:
+                        edit_sel_key = f"admin_edit_slots_{selected_poll}_{selected_voter}"
+                        st.session_state.setdefault(edit_sel_key, availability.choices(selected_voter))
+
+                        slot_grid(slot_index, edit_sel_key, key=f"edit_grid_{selected_poll}_{selected_voter}")
+                        st.caption(t("selected_count", count=len(st.session_state[edit_sel_key])))
+                        if st.button(t("admin_edit_save"), type="primary"):
+                            chosen = set(st.session_state.get(edit_sel_key, []))
+                            # comment and participant password stay as the voter left them
+                            repo.save_votes(selected_poll, selected_voter, slot_index.option_ids, chosen)
+                            st.success(t("admin_edit_done"))
+                            st.rerun()
 
-        st.markdown("---")
-        if is_admin:
-            total_voters = votes_df["voter_name"].nunique() if not votes_df.empty else 0
-            if not votes_df.empty:
-                st.markdown(f"**{t('admin_edit_title')}**")
-                voter_list = sorted(votes_df["voter_name"].unique())
-                selected_voter = st.selectbox(
-                    t("admin_edit_pick"),
-                    options=voter_list,
-                    key=f"admin_edit_voter_{selected_poll}",
-                )
-                st.caption(t("admin_edit_hint"))
-                if selected_voter:
-                    edit_sel_key = f"admin_edit_slots_{selected_poll}_{selected_voter}"
-                    existing_votes = votes_df[votes_df["voter_name"] == selected_voter]
-                    existing_selected = existing_votes[existing_votes["available"] == 1]["option_id"].tolist()
-                    st.session_state.setdefault(edit_sel_key, existing_selected)
-
-                    edit_grouped = {}
-                    for _, opt in options_df.iterrows():
-                        start_dt = datetime.fromisoformat(opt["start_ts"])
-                        key = start_dt.strftime("%Y-%m-%d (%a)")
-                        edit_grouped.setdefault(key, []).append(opt)
-
-                    for day, rows in edit_grouped.items():
-                        st.markdown(f"**{day}**")
-                        cols = st.columns(min(4, len(rows)))
-                        for idx, opt in enumerate(rows):
-                            col = cols[idx % len(cols)]
-                            with col:
-                                selected = opt["option_id"] in st.session_state[edit_sel_key]
-                                sdt = datetime.fromisoformat(opt["start_ts"])
-                                edt = datetime.fromisoformat(opt["end_ts"])
-                                label = f"{sdt.strftime('%H:%M')} - {edt.strftime('%H:%M')}"
-                                btn_type = "primary" if selected else "secondary"
-
-                                def toggle_edit_option(oid=opt["option_id"]):
-                                    current = set(st.session_state.get(edit_sel_key, []))
-                                    if oid in current:
-                                        current.remove(oid)
-                                    else:
-                                        current.add(oid)
-                                    st.session_state[edit_sel_key] = list(current)
-
-                                st.button(
-                                    label,
-                                    key=f"admin-edit-btn-{selected_voter}-{opt['option_id']}",
-                                    on_click=toggle_edit_option,
-                                    type=btn_type,
-                                    help=label,
-                                    use_container_width=True,
-                                )
-                    st.caption(t("selected_count", count=len(st.session_state[edit_sel_key])))
-                    if st.button(t("admin_edit_save"), type="primary"):
-                        chosen = set(st.session_state.get(edit_sel_key, []))
-                        stored_pw = existing_votes["voter_password"].dropna()
-                        stored_comment = existing_votes["comment"].dropna()
-                        voter_pw = stored_pw.iloc[0] if not stored_pw.empty else None
-                        comment = stored_comment.iloc[0] if not stored_comment.empty else ""
-                        for _, opt in options_df.iterrows():
-                            available = int(opt["option_id"] in chosen)
-                            conn.execute(
-                                """
-                                INSERT OR REPLACE INTO votes(
-                                    poll_id, voter_name, option_id, available, comment, voter_password
-                                ) VALUES (?, ?, ?, ?, ?, ?)
-                                """,
-                                (selected_poll, selected_voter, opt["option_id"], available, comment, voter_pw),
+                    st.markdown(f"**{t('finalize_section')}**")
+                    pw_check_final = None
+                    if poll_pw_required:
+                        pw_check_final = st.text_input(t("poll_password_prompt"), type="password", key=f"finalpw_{selected_poll}")
+                    with st.expander(t("solver_title")):
+                        required = st.multiselect(t("solver_required"), availability.voters, key=f"solver_required_{selected_poll}")
+                        length = int(
+                            st.number_input(t("solver_length"), min_value=1, max_value=12, value=1, key=f"solver_length_{selected_poll}")
+                        )
+
+                        def meeting_table(meetings):
+                            return pd.DataFrame(
+                                {
+                                    t("solver_col_slot"): [m.label for m in meetings],
+                                    t("solver_col_count"): [f"{len(m.attendees)}/{total_voters}" for m in meetings],
+                                    t("solver_col_missing"): [", ".join(m.missing_required) for m in meetings],
+                                }
                             )
-                        conn.commit()
-                        st.success(t("admin_edit_done"))
-                        st.rerun()
 
-                st.markdown(f"**{t('finalize_section')}**")
-                pw_check_final = None
-                if poll_pw_required:
-                    pw_check_final = st.text_input(t("poll_password_prompt"), type="password", key=f"finalpw_{selected_poll}")
-                option_counts = votes_df[votes_df["available"] == 1].groupby("option_id")["voter_name"].nunique()
-                option_counts = option_counts.reindex(options_df["option_id"]).fillna(0).astype(int)
-                finalize_options = []
-                for _, row in options_df.iterrows():
-                    oid = row["option_id"]
-                    label = slot_label(row["start_ts"], row["end_ts"])
-                    cnt = option_counts.get(oid, 0)
-                    tag = " ✅" if total_voters > 0 and cnt == total_voters else ""
-                    finalize_options.append((oid, f"{label} · {cnt}/{total_voters}{tag}"))
-                default_index = 0
-                if best_slot:
-                    best_id = max(summary_map.items(), key=lambda kv: kv[1])[0]
-                    for idx, (oid, _) in enumerate(finalize_options):
-                        if oid == best_id:
-                            default_index = idx
-                            break
-                chosen_oid = st.selectbox(
-                    t("finalize_slot"),
-                    finalize_options,
-                    format_func=lambda x: x[1],
-                    index=default_index,
-                    key=f"finalize_{selected_poll}",
-                )
-                if st.button(t("finalize_button")):
-                    if poll_pw_required and pw_check_final != poll_pw_required:
-                        st.error(t("access_needed"))
+                        suggestions = best_meetings(availability, slot_index, length, required)
+                        if not suggestions:
+                            st.info(t("solver_none"))
+                        else:
+                            st.dataframe(meeting_table(suggestions), hide_index=True, use_container_width=True)
+                            pick = st.selectbox(
+                                t("solver_pick"),
+                                range(len(suggestions)),
+                                format_func=lambda i: suggestions[i].label,
+                                key=f"solver_pick_{selected_poll}",
+                            )
+                            if st.button(t("solver_finalize"), key=f"solver_finalize_{selected_poll}"):
+                                if poll_pw_required and pw_check_final != poll_pw_required:
+                                    st.error(t("access_needed"))
+                                else:
+                                    meeting = suggestions[pick]
+                                    try:
+                                        repo.finalize_poll(selected_poll, meeting.start_ts, meeting.end_ts)
+                                    except ValueError:
+                                        st.error(t("finalize_stale"))
+                                    else:
+                                        st.rerun()
+
+                        st.markdown(f"**{t('solver_series')}**")
+                        col_k, col_cover, col_gap = st.columns(3)
+                        series_k = col_k.number_input(t("solver_series_k"), 1, 30, 4, key=f"solver_k_{selected_poll}")
+                        series_cover = col_cover.number_input(t("solver_series_cover"), 1, 30, 1, key=f"solver_cover_{selected_poll}")
+                        series_gap = col_gap.number_input(t("solver_series_gap"), 0, 60, 0, key=f"solver_gap_{selected_poll}")
+                        if st.button(t("solver_series_run"), key=f"solver_series_{selected_poll}"):
+                            plan = plan_series(
+                                availability,
+                                slot_index,
+                                int(series_k),
+                                int(series_cover),
+                                length,
+                                required,
+                                int(series_gap),
+                            )
+                            if not plan.meetings:
+                                st.info(t("solver_none"))
+                            else:
+                                st.dataframe(meeting_table(plan.meetings), hide_index=True, use_container_width=True)
+                            if plan.short:
+                                st.warning(t("solver_short", names=", ".join(sorted(plan.short))))
+                    option_counts = snapshot.tally.counts
+                    conflict_index = repo.conflict_index(int(slot_index.end_min.max(initial=0)))
+                    clashes = conflict_index.conflicts(slot_index.start_min, slot_index.end_min, exclude=selected_poll)
+                    hide_conflicts = st.checkbox(t("finalize_hide_conflicts"), key=f"finalize_hide_{selected_poll}")
+                    finalize_options = []
+                    for oid, label, clash in zip(slot_index.option_ids, slot_index.labels, clashes):
+                        if clash.finals and hide_conflicts:
+                            continue
+                        cnt = option_counts.get(oid, 0)
+                        tag = " ✅" if total_voters > 0 and cnt == total_voters else ""
+                        if clash.finals:
+                            tag += f" ⚠ {conflict_index.describe(clash.finals)}"
+                        finalize_options.append((oid, f"{label} · {cnt}/{total_voters}{tag}"))
+                    default_index = 0
+                    if best_slot:
+                        for idx, (oid, _) in enumerate(finalize_options):
+                            if oid == best_id:
+                                default_index = idx
+                                break
+                    if not finalize_options:
+                        st.info(t("finalize_all_conflict"))
                     else:
-                        oid = chosen_oid[0] if isinstance(chosen_oid, tuple) else chosen_oid
-                        row = options_df[options_df["option_id"] == oid].iloc[0]
-                        conn.execute(
-                            "UPDATE polls SET final_start_ts = ?, final_end_ts = ? WHERE poll_id = ?",
-                            (row["start_ts"], row["end_ts"], selected_poll),
-                    )
-                    conn.commit()
-                    st.success(t("finalized_label", label=slot_label(row["start_ts"], row["end_ts"])))
-                    st.session_state["finalized_slot"] = (row["start_ts"], row["end_ts"])
-                    st.rerun()
-                if final_slot or st.session_state.get("finalized_slot"):
-                    fs = st.session_state.get("finalized_slot")
-                    if fs:
-                        final_slot = (datetime.fromisoformat(fs[0]), datetime.fromisoformat(fs[1]))
+                        chosen_oid = st.selectbox(
+                            t("finalize_slot"),
+                            finalize_options,
+                            format_func=lambda x: x[1],
+                            index=default_index,
+                            key=f"finalize_{selected_poll}",
+                        )
+                        if st.button(t("finalize_button")):
+                            if poll_pw_required and pw_check_final != poll_pw_required:
+                                st.error(t("access_needed"))
+                            else:
+                                oid = chosen_oid[0] if isinstance(chosen_oid, tuple) else chosen_oid
+                                pos = slot_index.position[oid]
+                                try:
+                                    repo.finalize_poll(selected_poll, slot_index.start_ts[pos], slot_index.end_ts[pos])
+                                except ValueError:
+                                    st.error(t("finalize_stale"))
+                                else:
+                                    st.success(t("finalized_label", label=slot_index.labels[pos]))
+                                    st.rerun()
+                    # the rerun after finalizing reloads the snapshot (its revision moved), so this is
+                    # always the stored final time of the poll on screen
                     if final_slot:
                         label = f"{final_slot[0].strftime('%Y-%m-%d %H:%M')} - {final_slot[1].strftime('%H:%M')}"
                         st.info(t("finalized_label", label=label))
@@ -1041,21 +1228,75 @@ with col_right:
                                 f"{poll_meta['title']} 일정이 확정되었습니다.",
                                 f"시간: {label}",
                                 "장소/링크: ",
-                                f"참여자: {', '.join(sorted(votes_df['voter_name'].unique()))}",
+                                f"참여자: {', '.join(availability.voters)}",
                                 f"비고: {poll_meta['description']}",
                             ]
                         )
                         st.text_area(t("email_draft"), value=f"Subject: {email_subject}\n\n{email_body}", height=140)
-            with st.expander(t("export_title")):
-                export_df = votes_df if not votes_df.empty else pd.DataFrame()
-                csv_data = export_df.to_csv(index=False).encode("utf-8")
-                st.download_button(
-                    t("export_button"),
-                    data=csv_data,
-                    file_name=f"{selected_poll}_results.csv",
-                    mime="text/csv",
-                    use_container_width=True,
-                )
+                    with st.expander(t("syno_upload")):
+                        syno_url = st.text_input(t("syno_url"), key="syno_url")
+                        syno_user = st.text_input(t("syno_user"), key="syno_user")
+                        syno_pass = st.text_input(t("syno_pass"), type="password", key="syno_pass")
+                        syno_cal = st.text_input(t("syno_cal"), key="syno_cal")
+                        syno_ready = bool(syno_url and syno_user and syno_pass and syno_cal)
+                        job_key = f"syno_job_{selected_poll}"
+                        # both actions run on worker threads; this rerun continues immediately
+                        if final_slot and st.button(t("syno_upload"), key=f"syno_push_{selected_poll}"):
+                            if not syno_ready:
+                                st.error(t("syno_missing_fields"))
+                            else:
+                                st.session_state[job_key] = synology_client(syno_url, syno_user, syno_pass).push_event(
+                                    syno_cal,
+                                    poll_meta["title"] or selected_poll,
+                                    poll_meta["description"] or "",
+                                    final_slot[0],
+                                    final_slot[1],
+                                    snapshot.timezone,
+                                )
+                        if st.session_state.get(job_key) is not None:
+                            show_push(st.session_state[job_key])
+                        st.caption(t("syno_sync_help"))
+                        if st.button(t("syno_sync_all"), key="syno_sync_all"):
+                            if not syno_ready:
+                                st.error(t("syno_missing_fields"))
+                            else:
+                                client = synology_client(syno_url, syno_user, syno_pass)
+                                st.session_state["syno_sync_job"] = start_sync(repo, client, syno_cal)
+                        if st.session_state.get("syno_sync_job") is not None:
+                            show_push(
+                                st.session_state["syno_sync_job"],
+                                lambda report: t(
+                                    "syno_sync_done",
+                                    created=len(report.created),
+                                    updated=len(report.updated),
+                                    unchanged=report.unchanged,
+                                    failed=len(report.failed),
+                                ),
+                            )
+                with st.expander(t("export_title")):
+                    export_format = st.radio(
+                        t("export_format"),
+                        options=list(EXPORT_FORMATS),
+                        format_func=str.upper,
+                        horizontal=True,
+                        key=f"export_format_{selected_poll}",
+                    )
+                    export_all = st.checkbox(t("export_all"), key=f"export_all_{selected_poll}")
+                    extension, mime, exporter = EXPORT_FORMATS[export_format]
+                    export_polls = None if export_all else [selected_poll]
+                    st.download_button(
+                        t("export_button"),
+                        # deferred: rows are read only when the download is requested; Streamlit then holds the file in memory
+                        data=lambda: exporter(get_repository(), export_polls),
+                        file_name=f"{'all_polls' if export_all else selected_poll}_results.{extension}",
+                        mime=mime,
+                        use_container_width=True,
+                    )
 
-        else:
-            pass  # guest calendar export removed
+            else:
+                pass  # guest calendar export removed
+
+    if is_admin:
+        render_diagnostics()
+finally:
+    tracer.end()
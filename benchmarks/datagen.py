@@ -0,0 +1,98 @@
+"""Synthetic polls/slots/voters written into a scratch scheduler database."""
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from typing import List
+
+import numpy as np
+
+from scheduler_core import SlotRules, create_poll, generate_slot_arrays, get_conn, transaction
+
+SLOT_MINUTES = 15
+DAY_START = time(8, 0)
+DAY_END = time(20, 0)
+SLOTS_PER_DAY = (DAY_END.hour - DAY_START.hour) * 60 // SLOT_MINUTES
+
+
+@dataclass
+class Scenario:
+    name: str
+    polls: int
+    slots: int  # per poll
+    voters: int  # per poll
+    density: float = 0.3  # mean share of slots a voter marks available
+
+
+SCENARIOS = {
+    "small": Scenario("small", polls=3, slots=48, voters=10),
+    "medium": Scenario("medium", polls=10, slots=480, voters=50),
+    "large": Scenario("large", polls=5, slots=2_000, voters=200),
+    "xl": Scenario("xl", polls=2, slots=10_000, voters=500),
+}
+
+
+def slot_grid(n_slots: int, start_d: date = date(2026, 3, 2)):
+    days = math.ceil(n_slots / SLOTS_PER_DAY)
+    arrays = generate_slot_arrays(start_d, start_d + timedelta(days=days - 1), DAY_START, DAY_END, SLOT_MINUTES)
+    return type(arrays)(arrays.starts[:n_slots], arrays.ends[:n_slots])
+
+
+def availability(rng: np.random.Generator, voters: int, slots: int, density: float) -> np.ndarray:
+    """voters x slots 0/1 matrix; each voter has an own density and availability comes in runs."""
+    per_voter = rng.beta(2, 2 * (1 - density) / max(density, 1e-3), size=voters)
+    # smooth independent noise along the slot axis so free time clusters into blocks
+    noise = rng.random((voters, slots + 3))
+    smooth = (noise[:, :-3] + noise[:, 1:-2] + noise[:, 2:-1] + noise[:, 3:]) / 4
+    if not slots:
+        return np.zeros((voters, 0), dtype=np.int64)
+    rank = np.minimum(((1 - per_voter) * slots).astype(np.int64), slots - 1)
+    cutoff = np.take_along_axis(np.sort(smooth, axis=1), rank[:, None], axis=1)
+    return (smooth >= cutoff).astype(np.int64)
+
+
+def populate(db_path: str, scenario: Scenario, seed: int = 7) -> List[str]:
+    """Create ``scenario.polls`` polls with votes; returns their poll ids."""
+    rng = np.random.default_rng(seed)
+    conn = get_conn(db_path)
+    poll_ids = []
+    slots = slot_grid(scenario.slots)
+    for p in range(scenario.polls):
+        poll_id = f"bench-{scenario.name}-{p}"
+        first_day = slots.starts[0].astype("datetime64[D]").astype(date)
+        last_day = slots.starts[-1].astype("datetime64[D]").astype(date)
+        create_poll(
+            conn, poll_id, f"Benchmark {p}", "synthetic", first_day, last_day,
+            DAY_START, DAY_END, SLOT_MINUTES, None, slots, SlotRules(),
+        )
+        _bulk_votes(conn, poll_id, availability(rng, scenario.voters, scenario.slots, scenario.density))
+        poll_ids.append(poll_id)
+    conn.close()
+    return poll_ids
+
+
+def _bulk_votes(conn: sqlite3.Connection, poll_id: str, matrix: np.ndarray) -> None:
+    """Insert a whole availability matrix directly, then rebuild the poll's tallies."""
+    option_ids = [r[0] for r in conn.execute("SELECT option_id FROM options WHERE poll_id = ? ORDER BY start_ts", (poll_id,))]
+    names = [f"voter{v:04d}" for v in range(matrix.shape[0])]
+    with transaction(conn):
+        conn.executemany(
+            "INSERT INTO voters(poll_id, voter_name, voter_password, comment) VALUES (?, ?, NULL, NULL)",
+            [(poll_id, name) for name in names],
+        )
+        conn.executemany(
+            "INSERT INTO votes(poll_id, voter_name, option_id, available) VALUES (?, ?, ?, ?)",
+            (
+                (poll_id, names[v], option_ids[s], int(matrix[v, s]))
+                for v in range(matrix.shape[0])
+                for s in range(matrix.shape[1])
+            ),
+        )
+        conn.execute(
+            """
+            UPDATE option_tallies SET yes_count = (
+                SELECT COALESCE(SUM(available), 0) FROM votes WHERE votes.option_id = option_tallies.option_id
+            ) WHERE poll_id = ?
+            """,
+            (poll_id,),
+        )
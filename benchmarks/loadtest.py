@@ -0,0 +1,183 @@
+"""Simulate many guests loading, toggling and saving votes on one poll at the same time.
+
+    python -m benchmarks.loadtest --voters 50 --rounds 5 --spread 2
+    python -m benchmarks.loadtest --voters 50 --conn shared --out load.json
+
+Each guest is a thread that loads the poll snapshot, flips a few slots and saves, like a
+browser session rerunning app.py. ``--conn pool`` checks connections out of a
+``ConnectionPool`` as the app does; ``shared`` reuses one connection across every thread,
+the way the app worked before the pool.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time as clock
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.datagen import Scenario, populate
+from benchmarks.run import environment
+from scheduler_core import ConnectionPool, get_conn, hash_password, load_poll_snapshot, poll_revision, save_votes
+
+
+class Recorder:
+    """Thread-safe latency samples per operation plus error counts."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    def record(self, op: str, seconds: float) -> None:
+        with self._lock:
+            self.samples[op].append(seconds)
+
+    def error(self, op: str, exc: BaseException) -> None:
+        message = str(exc)
+        kind = "database is locked" if "locked" in message else f"{type(exc).__name__}: {message}"
+        with self._lock:
+            self.errors[f"{op}: {kind}"] += 1
+
+
+def _timed(recorder: Recorder, op: str, fn):
+    t0 = clock.perf_counter()
+    try:
+        result = fn()
+    except Exception as exc:  # every failure is data here
+        recorder.error(op, exc)
+        return None
+    recorder.record(op, clock.perf_counter() - t0)
+    return result
+
+
+def guest(
+    index: int,
+    conn_for,
+    poll_id: str,
+    rounds: int,
+    toggles: int,
+    spread: float,
+    with_password: bool,
+    recorder: Recorder,
+    start: threading.Event,
+    release=None,
+) -> None:
+    rng = random.Random(index)
+    name = f"guest{index:04d}"
+    start.wait()
+    clock.sleep(rng.uniform(0, spread))
+    conn = conn_for()
+    chosen = set()
+    for _ in range(rounds):
+        _timed(recorder, "poll_revision", lambda: poll_revision(conn, poll_id))
+        snapshot = _timed(recorder, "load_poll_snapshot", lambda: load_poll_snapshot(conn, poll_id))
+        if snapshot is None:
+            continue
+        option_ids = snapshot.slots.option_ids
+        chosen ^= set(rng.sample(list(option_ids), min(toggles, len(option_ids))))
+        password = _timed(recorder, "hash_password", lambda: hash_password(name)) if with_password else None
+        _timed(
+            recorder,
+            "save_votes",
+            lambda: save_votes(conn, poll_id, name, option_ids, chosen, voter_password=password),
+        )
+    if release is not None:
+        release()
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    arr = np.asarray(samples) * 1000
+    return {
+        "count": int(arr.size),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "max_ms": float(arr.max()),
+    }
+
+
+def run(args: argparse.Namespace, workdir: str) -> Dict[str, object]:
+    db_path = args.db or os.path.join(workdir, "load.db")
+    scenario = Scenario("load", polls=1, slots=args.slots, voters=args.existing_voters)
+    poll_id = populate(db_path, scenario)[0]
+
+    if args.conn == "shared":
+        shared = get_conn(db_path)
+        conn_for = lambda: shared  # noqa: E731
+        release = None
+    else:
+        pool = ConnectionPool(db_path, max_idle=args.voters)
+        conn_for, release = pool.connection, pool.release
+
+    recorder = Recorder()
+    start = threading.Event()
+    threads = [
+        threading.Thread(
+            target=guest,
+            args=(i, conn_for, poll_id, args.rounds, args.toggles, args.spread, args.with_password, recorder, start, release),
+            daemon=True,
+        )
+        for i in range(args.voters)
+    ]
+    for t in threads:
+        t.start()
+    t0 = clock.perf_counter()
+    start.set()
+    for t in threads:
+        t.join()
+    elapsed = clock.perf_counter() - t0
+
+    saves = len(recorder.samples.get("save_votes", []))
+    check = get_conn(db_path)
+    stored_guests = check.execute(
+        "SELECT COUNT(*) FROM voters WHERE poll_id = ? AND voter_name LIKE 'guest%'", (poll_id,)
+    ).fetchone()[0]
+    check.close()
+    return {
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "elapsed_s": elapsed,
+        "throughput": {
+            "saves_per_s": saves / elapsed if elapsed else 0.0,
+            "requests_per_s": sum(len(v) for v in recorder.samples.values()) / elapsed if elapsed else 0.0,
+        },
+        "latency": {op: percentiles(samples) for op, samples in sorted(recorder.samples.items())},
+        "errors": dict(recorder.errors),
+        "locked_errors": sum(n for key, n in recorder.errors.items() if "database is locked" in key),
+        "guests_saved": stored_guests,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=50, help="concurrent guests")
+    parser.add_argument("--rounds", type=int, default=3, help="load/toggle/save cycles per guest")
+    parser.add_argument("--toggles", type=int, default=3, help="slots flipped per round")
+    parser.add_argument("--spread", type=float, default=1.0, help="seconds over which guests arrive")
+    parser.add_argument("--slots", type=int, default=96)
+    parser.add_argument("--existing-voters", type=int, default=20, help="votes already on the poll")
+    parser.add_argument("--conn", choices=["pool", "shared"], default="pool")
+    parser.add_argument("--with-password", action="store_true", help="hash a participant password on every save")
+    parser.add_argument("--db", help="database file to use instead of a temp one (it gets a new poll)")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="scheduler-load-") as workdir:
+        report = run(args, workdir)
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Time scheduler_core's data paths against a synthetic database and print JSON.
+
+    python -m benchmarks.run --scenario medium --repeat 5 --out bench.json
+    python -m benchmarks.run --scenario medium --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time as clock
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datagen import DAY_END, DAY_START, SCENARIOS, SLOT_MINUTES, Scenario, populate, slot_grid
+from scheduler_core import (
+    AvailabilityMatrix,
+    PollTally,
+    SlotIndex,
+    SqliteRepository,
+    generate_slot_arrays,
+    generate_slots,
+    get_conn,
+    load_options_between,
+    load_poll_snapshot,
+    load_polls,
+    render_timeline_html,
+    save_votes,
+)
+from scheduler_export import iter_csv
+
+
+def timed(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        t0 = clock.perf_counter()
+        fn()
+        runs.append(clock.perf_counter() - t0)
+    return {
+        "runs": repeat,
+        "min_s": min(runs),
+        "median_s": statistics.median(runs),
+        "mean_s": statistics.fmean(runs),
+        "max_s": max(runs),
+    }
+
+
+def run_scenario(scenario: Scenario, repeat: int, workdir: str) -> Dict[str, object]:
+    db_path = os.path.join(workdir, f"{scenario.name}.db")
+    t0 = clock.perf_counter()
+    poll_ids = populate(db_path, scenario)
+    populate_s = clock.perf_counter() - t0
+    poll_id = poll_ids[0]
+    grid = slot_grid(scenario.slots)
+    first_day = grid.starts[0].astype("datetime64[D]").astype(object)
+    last_day = grid.starts[-1].astype("datetime64[D]").astype(object)
+    repo = SqliteRepository(db_path)
+    conn = repo.pool.connection()
+    snapshot = load_poll_snapshot(conn, poll_id)
+    option_ids = [int(x) for x in snapshot.options["option_id"]]
+    voter = "voter0000"
+    current = set(snapshot.availability.choices(voter))
+    toggled = current ^ set(option_ids[: max(1, len(option_ids) // 100)])
+    state = {"flip": False}
+
+    def fresh_schema() -> None:
+        path = os.path.join(workdir, "fresh.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        get_conn(path).close()
+
+    def toggle_votes() -> None:
+        # alternate between two states so every run writes the same number of rows
+        state["flip"] = not state["flip"]
+        save_votes(conn, poll_id, voter, option_ids, toggled if state["flip"] else current)
+
+    def rewrite_votes() -> None:
+        state["flip"] = not state["flip"]
+        save_votes(conn, poll_id, voter, option_ids, option_ids if state["flip"] else ())
+
+    votes = pd.read_sql("SELECT voter_name, option_id, available FROM votes WHERE poll_id = ?", conn, params=(poll_id,))
+    ten_voters = snapshot.availability.voters[:10]
+    week_start = int(snapshot.slots.start_min[0])
+
+    def filtered_tally_frame() -> None:
+        PollTally.from_votes(votes[votes["voter_name"].isin(ten_voters)])
+
+    def timeline() -> None:
+        render_timeline_html(snapshot.slots, snapshot.tally.counts, snapshot.tally.voters, "t", "p", "{count}")
+
+    def export() -> None:
+        for _ in iter_csv(repo, [poll_id]):
+            pass
+
+    cases = {
+        "generate_slot_arrays": lambda: generate_slot_arrays(first_day, last_day, DAY_START, DAY_END, SLOT_MINUTES),
+        "generate_slots": lambda: generate_slots(first_day, last_day, DAY_START, DAY_END, SLOT_MINUTES),
+        "init_schema_fresh": fresh_schema,
+        "get_conn_existing": lambda: get_conn(db_path).close(),
+        "load_polls": lambda: load_polls(conn),
+        "load_poll_snapshot": lambda: load_poll_snapshot(conn, poll_id),
+        "slot_index_from_options": lambda: SlotIndex.from_options(snapshot.options),
+        "options_first_week_all_polls": lambda: load_options_between(conn, week_start, week_start + 7 * 24 * 60),
+        "tally_from_votes": lambda: PollTally.from_votes(votes),
+        "tally_filtered_10_voters": filtered_tally_frame,
+        "availability_from_votes": lambda: AvailabilityMatrix.from_votes(votes, snapshot.slots),
+        "availability_tally": lambda: snapshot.availability.tally(),
+        "availability_filtered_10_voters": lambda: snapshot.availability.tally(ten_voters),
+        "option_tallies_read": lambda: conn.execute(
+            "SELECT option_id, yes_count FROM option_tallies WHERE poll_id = ?", (poll_id,)
+        ).fetchall(),
+        "render_timeline_html": timeline,
+        "save_votes_toggle_1pct": toggle_votes,
+        "save_votes_rewrite_all": rewrite_votes,
+        "export_csv": export,
+    }
+    results = {name: timed(fn, repeat) for name, fn in cases.items()}
+    repo.close()
+    return {
+        "scenario": vars(scenario),
+        "populate_s": populate_s,
+        "vote_rows": scenario.slots * scenario.voters * scenario.polls,
+        "votes_frame_bytes": int(votes.memory_usage(deep=True).sum()),
+        "availability_bytes": snapshot.availability.nbytes,
+        "db_bytes": os.path.getsize(db_path),
+        "results": results,
+    }
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    """One line per case: median now vs. baseline, as a ratio (>1 means slower)."""
+    lines = []
+    for name, scenario in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for case, stats in scenario["results"].items():
+            before = old["results"].get(case)
+            if before and before["median_s"] > 0:
+                ratio = stats["median_s"] / before["median_s"]
+                lines.append(f"{name:<8} {case:<28} {before['median_s']*1000:10.2f}ms -> {stats['median_s']*1000:10.2f}ms  x{ratio:.2f}")
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default: small, medium")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare medians against (printed to stderr)")
+    args = parser.parse_args(argv)
+
+    names = args.scenario or ["small", "medium"]
+    with tempfile.TemporaryDirectory(prefix="scheduler-bench-") as workdir:
+        report = {
+            "environment": environment(),
+            "scenarios": {name: run_scenario(SCENARIOS[name], args.repeat, workdir) for name in names},
+        }
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print("\n".join(compare(report, json.load(f))), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
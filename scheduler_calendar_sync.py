@@ -0,0 +1,154 @@
+"""Push every finalized poll to a Synology calendar, skipping events that are already there.
+
+Each pushed event is remembered in ``calendar_sync`` with a fingerprint of its title,
+description and time, so a rerun only touches polls that are new or changed since the
+last run. With nothing to do it makes no HTTP calls at all.
+
+    SYNOLOGY_PASSWORD=... python -m scheduler_calendar_sync --url https://nas:5001 --user lab --calendar 3
+"""
+import argparse
+import getpass
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from scheduler_core import DEFAULT_TIMEZONE, PollRepository, open_repository
+from synology_client import PushJob, SynologyClient, run_in_background
+
+SYNC_WORKERS = 4
+
+
+class SyncItem(NamedTuple):
+    poll_id: str
+    title: str
+    description: str
+    start: datetime  # wall-clock in ``timezone``
+    end: datetime
+    timezone: str
+    fingerprint: str
+    event_id: Optional[str]  # set when the event exists and only needs updating
+
+
+@dataclass
+class SyncReport:
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def event_fingerprint(title: str, description: str, start_ts: str, end_ts: str, timezone: str) -> str:
+    payload = json.dumps([title, description, start_ts, end_ts, timezone])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def plan_sync(repo: PollRepository, calendar_id: str) -> Tuple[List[SyncItem], int]:
+    """Finalized polls whose event is missing or stale, and how many are already current."""
+    synced = repo.load_calendar_sync(calendar_id)
+    pending, unchanged = [], 0
+    for row in repo.load_finalized_polls().itertuples(index=False):
+        title = row.title or row.poll_id
+        description = row.description or ""
+        timezone = row.timezone or DEFAULT_TIMEZONE
+        fingerprint = event_fingerprint(title, description, row.final_start_ts, row.final_end_ts, timezone)
+        event_id, previous = synced.get(row.poll_id, (None, None))
+        if previous == fingerprint:
+            unchanged += 1
+            continue
+        pending.append(
+            SyncItem(
+                row.poll_id,
+                title,
+                description,
+                datetime.fromisoformat(row.final_start_ts),
+                datetime.fromisoformat(row.final_end_ts),
+                timezone,
+                fingerprint,
+                event_id or None,
+            )
+        )
+    return pending, unchanged
+
+
+def _event_id(response: dict) -> str:
+    data = response.get("data") or {}
+    for key in ("evt_id", "event_id", "id"):
+        if data.get(key) is not None:
+            return str(data[key])
+    return ""
+
+
+def sync_finalized_polls(
+    repo: PollRepository, client: SynologyClient, calendar_id: str, max_workers: int = SYNC_WORKERS
+) -> SyncReport:
+    """Create or update the calendar event of every new or changed finalized poll."""
+    pending, unchanged = plan_sync(repo, calendar_id)
+    report = SyncReport(unchanged=unchanged)
+    if not pending:
+        return report
+    client.sid()  # log in once up front so the workers share one session
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending)), thread_name_prefix="calendar-sync") as pool:
+        futures = {
+            pool.submit(
+                client.create_event,
+                calendar_id,
+                item.title,
+                item.description,
+                item.start,
+                item.end,
+                item.event_id,
+                item.timezone,
+            ): item
+            for item in pending
+        }
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                response = future.result()
+            except Exception as exc:
+                report.failed[item.poll_id] = str(exc)
+                continue
+            # an update may echo nothing back, but a create we cannot address later is not synced
+            event_id = _event_id(response) or item.event_id
+            if not event_id:
+                report.failed[item.poll_id] = "calendar returned no event id"
+                continue
+            # record each success right away so a crash mid-run does not push it twice
+            repo.record_calendar_sync(calendar_id, [(item.poll_id, event_id, item.fingerprint)])
+            (report.updated if item.event_id else report.created).append(item.poll_id)
+    return report
+
+
+def start_sync(repo: PollRepository, client: SynologyClient, calendar_id: str) -> PushJob:
+    """:func:`sync_finalized_polls` off the calling thread; ``job.result`` is the report."""
+    return run_in_background(sync_finalized_polls, repo, client, calendar_id)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="e.g. https://your-nas:5001")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--calendar", required=True, help="calendar ID")
+    parser.add_argument("--db-url", help="defaults to $SCHEDULER_DB_URL, then scheduler.db")
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    args = parser.parse_args(argv)
+
+    password = os.environ.get("SYNOLOGY_PASSWORD") or getpass.getpass("Synology password: ")
+    repo = open_repository(args.db_url)
+    client = SynologyClient(args.url, args.user, password)
+    try:
+        report = sync_finalized_polls(repo, client, args.calendar, args.workers)
+    finally:
+        client.close()
+        repo.close()
+    print(json.dumps(asdict(report), indent=2, ensure_ascii=False))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Which other polls clash with a time range, across every poll.
+
+Two sorted arrays of ``[start, end)`` epoch-minute intervals: the final slots of finalized
+polls, and the candidate slots of polls still being voted on. Looking up a whole slot list
+is two vectorized binary searches on the start array plus one pass over the intervals that
+can reach each slot, so it never touches the polls table. The index covers a window from its
+build time up to ``until_min``; the repository rebuilds it for later windows and keeps it
+current as it finalizes, creates and deletes polls.
+"""
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class IntervalIndex:
+    """Half-open ``[start, end)`` intervals sorted by start, each tagged with an integer owner."""
+
+    def __init__(self):
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.ends = np.zeros(0, dtype=np.int64)
+        self.owners = np.zeros(0, dtype=np.int64)
+        # longest interval ever added; bounds how far before a range an overlapping start can be
+        self._max_len = 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, owner: int, starts: Sequence[int], ends: Sequence[int]) -> None:
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if not len(starts):
+            return
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        at = np.searchsorted(self.starts, starts, side="right")
+        self.starts = np.insert(self.starts, at, starts)
+        self.ends = np.insert(self.ends, at, ends)
+        self.owners = np.insert(self.owners, at, owner)
+        self._max_len = max(self._max_len, int((ends - starts).max()))
+
+    def remove(self, owner: int) -> None:
+        keep = self.owners != owner
+        if not keep.all():
+            self.starts, self.ends, self.owners = self.starts[keep], self.ends[keep], self.owners[keep]
+
+    def owners_overlapping(self, starts: Sequence[int], ends: Sequence[int]) -> List[np.ndarray]:
+        """Distinct owners of the intervals overlapping each ``[starts[i], ends[i])``."""
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        # intervals [lo[i], hi[i]) start early enough to reach query i and before it ends
+        lo = np.searchsorted(self.starts, starts - self._max_len, side="right")
+        hi = np.searchsorted(self.starts, ends, side="left")
+        counts = np.maximum(hi - lo, 0)
+        query = np.repeat(np.arange(len(starts)), counts)
+        candidate = np.arange(int(counts.sum())) + np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        hit = self.ends[candidate] > starts[query]
+        # distinct (query, owner) pairs packed into one sortable key, then split per query
+        width = int(self.owners.max(initial=0)) + 1
+        keys = np.unique(query[hit] * width + self.owners[candidate[hit]])
+        bounds = np.searchsorted(keys, np.arange(1, len(starts)) * width)
+        return np.split(keys % width, bounds) if len(starts) else []
+
+
+class SlotConflicts(NamedTuple):
+    finals: List[str]  # finalized polls whose final slot overlaps
+    candidates: List[str]  # open polls with an overlapping candidate slot
+
+
+class ConflictIndex:
+    """Final slots and open candidate slots of every poll, keyed by poll id.
+
+    Thread-safe; Streamlit sessions share one instance through the repository.
+    """
+
+    def __init__(self, until_min: int = 0):
+        self.until_min = until_min  # slots ending after this may miss conflicts; rebuild further out
+        self.finals = IntervalIndex()
+        self.options = IntervalIndex()
+        self.titles: Dict[str, str] = {}
+        self._codes: Dict[str, int] = {}
+        self._poll_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, rows: pd.DataFrame, until_min: int) -> "ConflictIndex":
+        """From ``load_conflict_window`` rows: ``poll_id``, ``title``, ``start_min``, ``end_min``, ``is_final``."""
+        index = cls(until_min)
+        index.titles = {pid: title or pid for pid, title in zip(rows["poll_id"], rows["title"])}
+        for (poll_id, is_final), group in rows.groupby(["poll_id", "is_final"], sort=False):
+            target = index.finals if is_final else index.options
+            target.add(index._code(poll_id), group["start_min"].to_numpy(), group["end_min"].to_numpy())
+        return index
+
+    def covers(self, until_min: int) -> bool:
+        return until_min <= self.until_min
+
+    def _code(self, poll_id: str) -> int:
+        code = self._codes.get(poll_id)
+        if code is None:
+            code = self._codes[poll_id] = len(self._poll_ids)
+            self._poll_ids.append(poll_id)
+        return code
+
+    def set_final(self, poll_id: str, start_min: int, end_min: int) -> None:
+        with self._lock:
+            code = self._code(poll_id)
+            self.finals.remove(code)
+            self.options.remove(code)
+            self.finals.add(code, [start_min], [end_min])
+
+    def set_options(self, poll_id: str, title: str, starts: Sequence[int], ends: Sequence[int]) -> None:
+        """A (re)created poll: new candidate slots and no final slot yet."""
+        with self._lock:
+            code = self._code(poll_id)
+            self.titles[poll_id] = title or poll_id
+            self.finals.remove(code)
+            self.options.remove(code)
+            self.options.add(code, starts, ends)
+
+    def drop_poll(self, poll_id: str) -> None:
+        with self._lock:
+            code = self._codes.get(poll_id)
+            if code is not None:
+                self.finals.remove(code)
+                self.options.remove(code)
+
+    def conflicts(
+        self, starts: Sequence[int], ends: Sequence[int], exclude: Optional[str] = None
+    ) -> List[SlotConflicts]:
+        """Other polls clashing with each slot; ``exclude`` is the poll being created or finalized."""
+        with self._lock:
+            finals = self.finals.owners_overlapping(starts, ends)
+            options = self.options.owners_overlapping(starts, ends)
+            skip = self._codes.get(exclude, -1)
+            names = self._poll_ids
+        return [
+            SlotConflicts([names[c] for c in f if c != skip], [names[c] for c in o if c != skip])
+            for f, o in zip(finals, options)
+        ]
+
+    def title(self, poll_id: str) -> str:
+        return self.titles.get(poll_id, poll_id)
+
+    def describe(self, poll_ids: Iterable[str]) -> str:
+        return ", ".join(self.title(pid) for pid in poll_ids)
@@ -1,14 +1,585 @@
+import base64
+import hashlib
+import hmac
+import html
+import json
+import os
+import re
 import sqlite3
-from datetime import date, datetime, time, timedelta
-from typing import Iterable, List, Tuple
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone as dt_timezone
+from functools import wraps
+from itertools import repeat
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+from scheduler_conflicts import ConflictIndex
+from scheduler_metrics import (
+    DB_LOCK_WAIT_SECONDS,
+    DB_LOCKED,
+    PASSWORD_HASH_SECONDS,
+    SAVE_SECONDS,
+    VOTE_ROWS_CHANGED,
+    VOTES_SAVED,
+    cache_lookup,
+)
+
 DB_PATH = "scheduler.db"
+PBKDF2_ITERATIONS = 200_000
+CREDENTIAL_TTL_SECONDS = 15 * 60
+BUSY_TIMEOUT_SECONDS = 5.0
+# slot times are wall-clock in their poll's timezone; polls created before v7 get this one
+DEFAULT_TIMEZONE = os.environ.get("SCHEDULER_TIMEZONE", "Asia/Seoul")
+POLL_PAGE_SIZE = 20
+# the in-process conflict index follows this process's writes; rebuilding picks up other replicas'
+CONFLICT_INDEX_TTL_SECONDS = 300
+# how far ahead the conflict index reaches at least; lookups further out widen it
+CONFLICT_WINDOW_MINUTES = 90 * 24 * 60
 
 
-def init_schema(conn: sqlite3.Connection) -> sqlite3.Connection:
-    """Create tables and migrate lightweight column additions."""
+@dataclass
+class Span:
+    """One timed block of a trace; ``start`` is seconds after the trace began."""
+
+    name: str
+    kind: str  # "span" or "sql"
+    start: float
+    duration: float
+    depth: int
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Trace:
+    """Spans recorded on one thread between :meth:`Tracer.begin` and :meth:`Tracer.end`."""
+
+    label: str
+    started_at: datetime
+    t0: float
+    spans: List[Span] = field(default_factory=list)
+    depth: int = 0
+    ended: Optional[float] = None
+    session: Optional[str] = None  # whoever started it, so a viewer can list only their own
+
+    @property
+    def duration(self) -> float:
+        """Wall time to :meth:`Tracer.end`, or to the last span if the run was cut short."""
+        if self.ended is not None:
+            return self.ended - self.t0
+        return max((sp.start + sp.duration for sp in self.spans), default=0.0)
+
+    def sorted_spans(self) -> List[Span]:
+        return sorted(self.spans, key=lambda sp: (sp.start, sp.depth))
+
+
+class _TraceLocal(threading.local):
+    trace: Optional[Trace] = None
+
+
+class Tracer:
+    """Per-thread span recorder keeping the last ``history`` traces and slow statements.
+
+    ``enabled`` is the server-wide default (``SCHEDULER_TRACE=1``); :meth:`begin` can override
+    it for one rerun, so a session can trace itself without affecting others. Outside a trace,
+    :func:`span`, :func:`traced` and the SQLite cursor hooks cost one attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, history: int = 20, slow_ms: float = 50.0, slow_history: int = 100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.traces: deque = deque(maxlen=history)
+        self.slow_queries: deque = deque(maxlen=slow_history)  # (when, trace label, Span)
+        self._local = _TraceLocal()
+
+    def current(self) -> Optional[Trace]:
+        return self._local.trace
+
+    def begin(self, label: str, enabled: Optional[bool] = None, session: Optional[str] = None) -> Optional[Trace]:
+        """Start a trace on this thread (replacing any unfinished one) and keep it in history.
+
+        ``enabled`` decides for this run only; ``None`` follows :attr:`enabled`. ``session`` tags
+        the trace for :meth:`session_traces`.
+        """
+        if not (self.enabled if enabled is None else enabled):
+            self._local.trace = None
+            return None
+        trace = Trace(label, datetime.now(), perf_counter(), session=session)
+        self._local.trace = trace
+        self.traces.append(trace)
+        return trace
+
+    def end(self) -> None:
+        trace, self._local.trace = self._local.trace, None
+        if trace is not None:
+            trace.ended = perf_counter()
+
+    def session_traces(self, session: str) -> List[Trace]:
+        """Kept traces started with ``session``, oldest first."""
+        return [tr for tr in list(self.traces) if tr.session == session]
+
+    @contextmanager
+    def _record(self, trace: Trace, name: str, kind: str, attrs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        depth, trace.depth = trace.depth, trace.depth + 1
+        t0 = perf_counter()
+        try:
+            yield attrs
+        finally:
+            trace.depth = depth
+            trace.spans.append(Span(name, kind, t0 - trace.t0, perf_counter() - t0, depth, attrs))
+
+
+tracer = Tracer(
+    enabled=os.environ.get("SCHEDULER_TRACE") == "1",
+    slow_ms=float(os.environ.get("SCHEDULER_SLOW_QUERY_MS", "50")),
+)
+_NO_SPAN = nullcontext({})
+
+
+def span(name: str, **attrs: Any):
+    """``with span("render"):`` times the block inside the current trace, if any."""
+    trace = tracer.current()
+    if trace is None:
+        return _NO_SPAN
+    return tracer._record(trace, name, "span", attrs)
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of :func:`span`, named after the function by default."""
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            trace = tracer.current()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with tracer._record(trace, label, "span", {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _param_shape(parameters: Any, many: bool = False) -> str:
+    """Describe bound parameters without their values (they may hold password hashes)."""
+    if many:
+        rows = parameters if isinstance(parameters, (list, tuple)) else list(parameters)
+        return f"{len(rows)} rows x {len(rows[0]) if rows else 0}"
+    if isinstance(parameters, dict):
+        return "named: " + ", ".join(sorted(parameters))
+    return f"{len(parameters)} params"
+
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Times ``execute``/``executemany`` plus the fetches that follow into the current trace.
+
+    Statements slower than ``tracer.slow_ms`` get their ``EXPLAIN QUERY PLAN`` attached and
+    land in ``tracer.slow_queries``.
+    """
+
+    _span: Optional[Span] = None
+    _params: Any = ()
+
+    def execute(self, sql: str, parameters: Any = ()) -> "TracingCursor":
+        trace = tracer.current()
+        if trace is None:
+            self._span = None
+            return super().execute(sql, parameters)
+        with tracer._record(trace, "sql", "sql", {"sql": sql, "params": _param_shape(parameters)}):
+            super().execute(sql, parameters)
+        self._span, self._params = trace.spans[-1], parameters
+        self._check_slow(trace)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "TracingCursor":
+        trace = tracer.current()
+        if trace is None:
+            self._span = None
+            return super().executemany(sql, seq_of_parameters)
+        rows = list(seq_of_parameters)
+        with tracer._record(trace, "sql", "sql", {"sql": sql, "params": _param_shape(rows, many=True)}):
+            super().executemany(sql, rows)
+        self._span, self._params = trace.spans[-1], None
+        self._check_slow(trace)
+        return self
+
+    def _fetch(self, fetch: Callable[[], Any]) -> Any:
+        if self._span is None:
+            return fetch()
+        t0 = perf_counter()
+        try:
+            return fetch()
+        finally:
+            self._span.duration += perf_counter() - t0
+            self._check_slow(tracer.current())
+
+    def fetchone(self) -> Any:
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        return self._fetch(lambda: super(TracingCursor, self).fetchmany(size))
+
+    def fetchall(self) -> List[Any]:
+        return self._fetch(super().fetchall)
+
+    def _check_slow(self, trace: Optional[Trace]) -> None:
+        sp = self._span
+        if sp is None or "slow" in sp.attrs or sp.duration * 1000 < tracer.slow_ms:
+            return
+        sp.attrs["slow"] = True
+        sql = sp.attrs["sql"]
+        if self._params is not None and sql.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                # a plain cursor, so the plan lookup is not traced itself
+                plan = sqlite3.Cursor(self.connection).execute(f"EXPLAIN QUERY PLAN {sql}", self._params).fetchall()
+                sp.attrs["plan"] = [row[-1] for row in plan]
+            except sqlite3.Error as exc:
+                sp.attrs["plan"] = [f"unavailable: {exc}"]
+        # the span itself, so time spent in later fetches still shows up
+        tracer.slow_queries.append((datetime.now(), trace.label if trace else "", sp))
+
+
+class TracingConnection(sqlite3.Connection):
+    """``sqlite3.connect(factory=...)`` target routing every statement through :class:`TracingCursor`."""
+
+    def cursor(self, factory: Callable[..., sqlite3.Cursor] = TracingCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class VoterRecord(NamedTuple):
+    voter_password: Optional[str]
+    comment: Optional[str]
+
+
+@dataclass
+class PollTally:
+    """Yes-counts and the names behind them, keyed by option_id."""
+
+    counts: Dict[int, int]
+    voters: Dict[int, List[str]]
+    total_voters: int
+
+    @classmethod
+    def from_votes(cls, votes: pd.DataFrame) -> "PollTally":
+        """Aggregate a (possibly filtered) votes frame; the full poll reads ``option_tallies``."""
+        yes = votes[votes["available"] == 1]
+        return cls(
+            counts={int(k): int(v) for k, v in yes.groupby("option_id").size().items()},
+            voters=yes.groupby("option_id")["voter_name"].apply(list).to_dict(),
+            total_voters=int(votes["voter_name"].nunique()),
+        )
+
+    def best_option(self) -> Optional[int]:
+        if not self.counts:
+            return None
+        return max(self.counts.items(), key=lambda kv: kv[1])[0]
+
+
+def to_epoch_minutes(wall: Any, timezone: str) -> np.ndarray:
+    """Wall-clock times in ``timezone`` -> int64 minutes since the Unix epoch (UTC).
+
+    Times skipped by a DST jump move forward; repeated ones resolve to standard time.
+    """
+    local = pd.DatetimeIndex(np.asarray(wall, dtype="datetime64[m]"))
+    utc = local.tz_localize(timezone, ambiguous=np.zeros(len(local), dtype=bool), nonexistent="shift_forward")
+    return utc.tz_convert(None).to_numpy(dtype="datetime64[m]").astype(np.int64)
+
+
+def from_epoch_minutes(minutes: Any, timezone: str) -> np.ndarray:
+    """Inverse of :func:`to_epoch_minutes`: naive ``datetime64[m]`` wall-clock times."""
+    utc = pd.DatetimeIndex(np.asarray(minutes, dtype=np.int64).astype("datetime64[m]")).tz_localize("UTC")
+    return utc.tz_convert(timezone).tz_localize(None).to_numpy(dtype="datetime64[m]")
+
+
+@dataclass
+class SlotIndex:
+    """Parsed, labelled view of a poll's options in ``start_ts`` order, built once per snapshot."""
+
+    option_ids: List[int]
+    start_ts: List[str]
+    end_ts: List[str]
+    start_min: np.ndarray  # int64 epoch minutes (UTC)
+    end_min: np.ndarray
+    starts: np.ndarray  # datetime64[m], wall-clock in the poll's timezone
+    ends: np.ndarray  # datetime64[m]
+    time_labels: List[str]  # "09:00 - 10:00"
+    labels: List[str]  # slot_label(): "01/05 (Mon) 09:00 - 10:00"
+    days: Dict[str, List[int]]  # "2026-01-05 (Mon)" -> positions
+    position: Dict[int, int]  # option_id -> position
+
+    @classmethod
+    def from_options(cls, options: pd.DataFrame, timezone: str = DEFAULT_TIMEZONE) -> "SlotIndex":
+        """Build from ``options`` rows carrying ``start_min``/``end_min``; no timestamp parsing."""
+        start_min = options["start_min"].to_numpy(dtype=np.int64)
+        end_min = options["end_min"].to_numpy(dtype=np.int64)
+        start = pd.Series(from_epoch_minutes(start_min, timezone))
+        end = pd.Series(from_epoch_minutes(end_min, timezone))
+        option_ids = [int(oid) for oid in options["option_id"]]
+        time_labels = [
+            f"{s} - {e}" for s, e in zip(start.dt.strftime("%H:%M").tolist(), end.dt.strftime("%H:%M").tolist())
+        ]
+        labels = [f"{d} {tl}" for d, tl in zip(start.dt.strftime("%m/%d (%a)").tolist(), time_labels)]
+        days: Dict[str, List[int]] = {}
+        for pos, day in enumerate(start.dt.strftime("%Y-%m-%d (%a)")):
+            days.setdefault(day, []).append(pos)
+        return cls(
+            option_ids=option_ids,
+            start_ts=options["start_ts"].tolist(),
+            end_ts=options["end_ts"].tolist(),
+            start_min=start_min,
+            end_min=end_min,
+            starts=start.to_numpy(dtype="datetime64[m]"),
+            ends=end.to_numpy(dtype="datetime64[m]"),
+            time_labels=time_labels,
+            labels=labels,
+            days=days,
+            position={oid: pos for pos, oid in enumerate(option_ids)},
+        )
+
+    def __len__(self) -> int:
+        return len(self.option_ids)
+
+    def bounds(self, option_id: int) -> Tuple[datetime, datetime]:
+        pos = self.position[option_id]
+        return self.starts[pos].astype(datetime), self.ends[pos].astype(datetime)
+
+    def grid(self) -> Tuple[List[str], List[str], List[List[int]]]:
+        """Day columns, time-label rows and a row x day matrix of positions (-1 for no slot).
+
+        Rows are keyed by time label and by how often that label already occurred on the day,
+        so two slots sharing a label (a custom slot list, or an hour repeated by a DST change)
+        get rows of their own instead of overwriting each other. Rows are ordered by their
+        earliest start, counted in elapsed minutes from the day's first slot so the second pass
+        through a repeated hour sorts after the first.
+        """
+        wall = (self.starts - self.starts.astype("datetime64[D]")).astype(np.int64)
+        keyed: Dict[Tuple[str, int], Dict[int, int]] = {}
+        first_start: Dict[Tuple[str, int], int] = {}
+        for col, positions in enumerate(self.days.values()):
+            seen: Dict[str, int] = {}
+            day_start = positions[0]
+            for pos in positions:
+                label = self.time_labels[pos]
+                repeat_no = seen[label] = seen.get(label, -1) + 1
+                key = (label, repeat_no)
+                keyed.setdefault(key, {})[col] = pos
+                offset = int(wall[day_start] + self.start_min[pos] - self.start_min[day_start])
+                first_start[key] = min(first_start.get(key, offset), offset)
+        rows = sorted(keyed, key=lambda key: (first_start[key], key[1], key[0]))
+        times = [label if repeat_no == 0 else f"{label} ({repeat_no + 1})" for label, repeat_no in rows]
+        cells = [[keyed[row].get(col, -1) for col in range(len(self.days))] for row in rows]
+        return list(self.days), times, cells
+
+
+def slot_runs(positions: Iterable[int]) -> List[List[int]]:
+    """Sorted positions as ``[[start, length], ...]``, the slot grid's wire format."""
+    runs: List[List[int]] = []
+    for pos in sorted(positions):
+        if runs and runs[-1][0] + runs[-1][1] == pos:
+            runs[-1][1] += 1
+        else:
+            runs.append([pos, 1])
+    return runs
+
+
+def run_positions(runs: Sequence[Sequence[int]]) -> List[int]:
+    """Inverse of :func:`slot_runs`."""
+    return [pos for start, length in runs for pos in range(int(start), int(start) + int(length))]
+
+
+# numpy < 2 has no bitwise_count; a byte lookup table does the same job
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """Set bits per row of a packed uint8 array."""
+    counts = np.bitwise_count(bits) if hasattr(np, "bitwise_count") else _POPCOUNT8[bits]
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+@dataclass
+class AvailabilityMatrix:
+    """A poll's yes-votes as packed bits, options in ``SlotIndex`` order and voters by name.
+
+    ``rows`` is one bitset per voter over option positions, ``columns`` the same bits one
+    per option over voters, so a voter's choices, per-option tallies and "who is free at
+    all of these" are each a popcount or a bitwise AND.
+    """
+
+    voters: List[str]
+    option_ids: List[int]
+    rows: np.ndarray  # (voters, ceil(options / 8)) uint8
+    columns: np.ndarray  # (options, ceil(voters / 8)) uint8
+
+    @classmethod
+    def from_dense(cls, voters: Sequence[str], option_ids: Sequence[int], available: np.ndarray) -> "AvailabilityMatrix":
+        dense = np.asarray(available, dtype=bool).reshape(len(voters), len(option_ids))
+        return cls(list(voters), list(option_ids), np.packbits(dense, axis=1), np.packbits(dense.T, axis=1))
+
+    @classmethod
+    def from_votes(
+        cls, votes: pd.DataFrame, slots: "SlotIndex", voters: Optional[Iterable[str]] = None
+    ) -> "AvailabilityMatrix":
+        """Pack ``voter_name``/``option_id`` rows (yes-votes, or any rows with ``available``).
+
+        ``voters`` defaults to the names in ``votes``; pass it to keep voters without a yes.
+        Votes for options outside ``slots`` are ignored.
+        """
+        if "available" in votes.columns:
+            votes = votes[votes["available"] == 1]
+        names = sorted(set(votes["voter_name"]) if voters is None else set(voters))
+        dense = np.zeros((len(names), len(slots)), dtype=bool)
+        if len(votes) and names:
+            row = pd.Index(names).get_indexer(votes["voter_name"])
+            pos = pd.Index(slots.option_ids).get_indexer(votes["option_id"])
+            keep = (row >= 0) & (pos >= 0)
+            dense[row[keep], pos[keep]] = True
+        return cls.from_dense(names, slots.option_ids, dense)
+
+    def __len__(self) -> int:
+        return len(self.voters)
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes + self.columns.nbytes
+
+    def mask(self, names: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Packed voter bitset: everyone when ``names`` is None, unknown names ignored."""
+        selected = np.ones(len(self.voters), dtype=bool)
+        if names is not None:
+            selected[:] = False
+            index = pd.Index(self.voters).get_indexer(list(names))
+            selected[index[index >= 0]] = True
+        return np.packbits(selected)
+
+    def _names(self, bits: np.ndarray) -> List[str]:
+        return [self.voters[i] for i in np.flatnonzero(np.unpackbits(bits, count=len(self.voters)))]
+
+    def counts(self, names: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Yes-count per option position, among ``names`` if given."""
+        if names is None:
+            return popcount(self.columns)
+        return popcount(self.columns & self.mask(names))
+
+    def choices(self, voter_name: str) -> List[int]:
+        """option_ids the voter marked available."""
+        try:
+            row = self.rows[self.voters.index(voter_name)]
+        except ValueError:
+            return []
+        return [self.option_ids[p] for p in np.flatnonzero(np.unpackbits(row, count=len(self.option_ids)))]
+
+    def free_at(self, option_ids: Iterable[int], names: Optional[Iterable[str]] = None) -> List[str]:
+        """Voters (among ``names``) available at every one of ``option_ids``."""
+        pos = pd.Index(self.option_ids).get_indexer(list(option_ids))
+        if (pos < 0).any():
+            return []
+        bits = self.mask(names)
+        for p in pos:
+            bits = bits & self.columns[p]
+        return self._names(bits)
+
+    def option_voters(self, names: Optional[Iterable[str]] = None) -> Dict[int, List[str]]:
+        """option_id -> names available there (among ``names``), options with nobody left out."""
+        columns = self.columns if names is None else self.columns & self.mask(names)
+        opt, who = np.nonzero(np.unpackbits(columns, axis=1, count=len(self.voters)))
+        if not len(opt):
+            return {}
+        cuts = np.flatnonzero(np.diff(opt)) + 1
+        return {
+            self.option_ids[int(group[0])]: [self.voters[i] for i in members]
+            for group, members in zip(np.split(opt, cuts), np.split(who, cuts))
+        }
+
+    @traced("AvailabilityMatrix.tally")
+    def tally(self, names: Optional[Iterable[str]] = None) -> "PollTally":
+        """Same shape as :meth:`PollTally.from_votes`, filtered with a bitwise AND."""
+        names = None if names is None else list(names)
+        counts = self.counts(names)
+        return PollTally(
+            counts={self.option_ids[p]: int(counts[p]) for p in np.flatnonzero(counts)},
+            voters=self.option_voters(names),
+            total_voters=len(self.voters) if names is None else len(set(names) & set(self.voters)),
+        )
+
+
+@dataclass
+class PollSnapshot:
+    """Everything the results/voting view reads for one poll, as of ``revision``."""
+
+    poll_id: str
+    revision: int
+    meta: Dict[str, Any]
+    options: pd.DataFrame
+    availability: AvailabilityMatrix
+    tally: PollTally
+    slots: SlotIndex
+
+    @classmethod
+    @traced("PollSnapshot.from_frames")
+    def from_frames(
+        cls,
+        poll_id: str,
+        revision: int,
+        meta: pd.DataFrame,
+        options: pd.DataFrame,
+        voters: Sequence[str],
+        yes_votes: pd.DataFrame,
+        counts: Dict[int, int],
+    ) -> "PollSnapshot":
+        """Assemble a snapshot from the backend's query results (``meta`` is the one polls row).
+
+        ``voters`` lists everyone who answered and ``yes_votes`` holds their ``voter_name``,
+        ``option_id`` pairs with ``available = 1``.
+        """
+        record = meta.astype(object).where(meta.notna(), None).iloc[0].to_dict()
+        slots = SlotIndex.from_options(options, record.get("timezone") or DEFAULT_TIMEZONE)
+        availability = AvailabilityMatrix.from_votes(yes_votes, slots, voters)
+        tally = PollTally(counts, availability.option_voters(), len(availability))
+        return cls(poll_id, revision, record, options, availability, tally, slots)
+
+    @property
+    def timezone(self) -> str:
+        return self.meta.get("timezone") or DEFAULT_TIMEZONE
+
+    @property
+    def final_slot(self) -> Optional[Tuple[datetime, datetime]]:
+        start, end = self.meta.get("final_start_min"), self.meta.get("final_end_min")
+        if start is None or end is None:
+            return None
+        local = from_epoch_minutes([int(start), int(end)], self.timezone)
+        return local[0].astype(datetime), local[1].astype(datetime)
+
+
+def _column_names(conn: sqlite3.Connection, table: str) -> Set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    if column not in _column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _migrate_base_schema(conn: sqlite3.Connection) -> None:
+    """v1: core tables, columns added after the first release, per-poll indexes."""
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS polls(
@@ -51,42 +622,463 @@ def init_schema(conn: sqlite3.Connection) -> sqlite3.Connection:
         )
         """
     )
-    # graceful migrations if columns were missing
-    try:
-        conn.execute("ALTER TABLE polls ADD COLUMN poll_password TEXT")
-    except Exception:
-        pass
-    for col in ("final_start_ts", "final_end_ts"):
-        try:
-            conn.execute(f"ALTER TABLE polls ADD COLUMN {col} TEXT")
-        except Exception:
-            pass
+    # databases created before these columns existed
+    _add_column(conn, "polls", "poll_password", "TEXT")
+    _add_column(conn, "polls", "final_start_ts", "TEXT")
+    _add_column(conn, "polls", "final_end_ts", "TEXT")
+    _add_column(conn, "votes", "voter_password", "TEXT")
+    # per-poll lookups; votes(poll_id, voter_name) is already covered by the UNIQUE index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_options_poll_start ON options(poll_id, start_ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_option ON votes(option_id)")
+
+
+def _migrate_voters(conn: sqlite3.Connection) -> None:
+    """v2: keep each voter's credential and comment once in ``voters`` instead of on every vote row."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS voters(
+            poll_id TEXT,
+            voter_name TEXT,
+            voter_password TEXT,
+            comment TEXT,
+            PRIMARY KEY(poll_id, voter_name)
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO voters(poll_id, voter_name, voter_password, comment)
+        SELECT poll_id, voter_name, MAX(voter_password), MAX(comment)
+        FROM votes
+        GROUP BY poll_id, voter_name
+        """
+    )
+    # SQLite cannot drop columns portably, so rebuild votes without the per-row copies
+    conn.execute(
+        """
+        CREATE TABLE votes_new(
+            vote_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT,
+            voter_name TEXT,
+            option_id INTEGER,
+            available INTEGER,
+            UNIQUE(poll_id, voter_name, option_id)
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO votes_new(vote_id, poll_id, voter_name, option_id, available)
+        SELECT vote_id, poll_id, voter_name, option_id, available FROM votes
+        """
+    )
+    conn.execute("DROP TABLE votes")
+    conn.execute("ALTER TABLE votes_new RENAME TO votes")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_option ON votes(option_id)")
+
+
+def _migrate_poll_revisions(conn: sqlite3.Connection) -> None:
+    """v3: per-poll revision counters used as cache keys; rows outlive their poll."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS poll_revisions(
+            poll_id TEXT PRIMARY KEY,
+            revision INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO poll_revisions(poll_id, revision) SELECT poll_id, 1 FROM polls")
+
+
+def _migrate_option_tallies(conn: sqlite3.Connection) -> None:
+    """v4: materialized yes-counts per option, maintained by the vote write path."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS option_tallies(
+            option_id INTEGER PRIMARY KEY,
+            poll_id TEXT,
+            yes_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_option_tallies_poll ON option_tallies(poll_id)")
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO option_tallies(option_id, poll_id, yes_count)
+        SELECT o.option_id, o.poll_id, COALESCE(SUM(v.available), 0)
+        FROM options o
+        LEFT JOIN votes v ON v.option_id = o.option_id
+        GROUP BY o.option_id
+        """
+    )
+
+
+def _migrate_slot_rules(conn: sqlite3.Connection) -> None:
+    """v5: remember the weekday/exclusion/break rules a poll was generated with."""
+    _add_column(conn, "polls", "slot_rules", "TEXT")
+
+
+def _migrate_calendar_sync(conn: sqlite3.Connection) -> None:
+    """v6: calendar events already pushed per (poll, calendar), for idempotent bulk sync."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS calendar_sync(
+            poll_id TEXT,
+            calendar_id TEXT,
+            event_id TEXT,
+            fingerprint TEXT,
+            synced_at TEXT,
+            PRIMARY KEY(poll_id, calendar_id)
+        )
+        """
+    )
+
+
+def _migrate_epoch_minutes(conn: sqlite3.Connection) -> None:
+    """v7: integer epoch-minute copies of slot and final times, plus each poll's timezone."""
+    _add_column(conn, "polls", "timezone", "TEXT")
+    _add_column(conn, "polls", "final_start_min", "INTEGER")
+    _add_column(conn, "polls", "final_end_min", "INTEGER")
+    _add_column(conn, "options", "start_min", "INTEGER")
+    _add_column(conn, "options", "end_min", "INTEGER")
+    conn.execute("UPDATE polls SET timezone = ? WHERE timezone IS NULL", (DEFAULT_TIMEZONE,))
+    options = pd.read_sql(
+        """
+        SELECT o.option_id, o.start_ts, o.end_ts, COALESCE(p.timezone, ?) AS timezone
+        FROM options o LEFT JOIN polls p ON p.poll_id = o.poll_id
+        """,
+        conn,
+        params=(DEFAULT_TIMEZONE,),
+    )
+    for tz, group in options.groupby("timezone"):
+        starts = to_epoch_minutes(pd.to_datetime(group["start_ts"], format="ISO8601"), tz)
+        ends = to_epoch_minutes(pd.to_datetime(group["end_ts"], format="ISO8601"), tz)
+        conn.executemany(
+            "UPDATE options SET start_min = ?, end_min = ? WHERE option_id = ?",
+            zip(starts.tolist(), ends.tolist(), group["option_id"].tolist()),
+        )
+    finals = pd.read_sql(
+        "SELECT poll_id, final_start_ts, final_end_ts, timezone FROM polls WHERE final_start_ts IS NOT NULL",
+        conn,
+    )
+    for tz, group in finals.groupby("timezone"):
+        starts = to_epoch_minutes(pd.to_datetime(group["final_start_ts"], format="ISO8601"), tz)
+        ends = to_epoch_minutes(pd.to_datetime(group["final_end_ts"], format="ISO8601"), tz)
+        conn.executemany(
+            "UPDATE polls SET final_start_min = ?, final_end_min = ? WHERE poll_id = ?",
+            zip(starts.tolist(), ends.tolist(), group["poll_id"].tolist()),
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_options_poll_start_min ON options(poll_id, start_min)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_options_start_min ON options(start_min)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_polls_final_start_min ON polls(final_start_min)")
+
+
+def _fts5_available() -> bool:
     try:
-        conn.execute("ALTER TABLE votes ADD COLUMN voter_password TEXT")
-    except Exception:
-        pass
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+# builds without FTS5 fall back to LIKE over title/description
+HAS_FTS5 = _fts5_available()
+
+
+def _migrate_poll_catalog(conn: sqlite3.Connection) -> None:
+    """v8: archived state, keyset indexes on created_at and a full-text index of titles/descriptions."""
+    _add_column(conn, "polls", "archived_at", "TEXT")
+    # keyset pagination needs a total order; NULL created_at only exists in very old rows
+    conn.execute("UPDATE polls SET created_at = COALESCE(start_date, '') WHERE created_at IS NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_polls_created ON polls(created_at, poll_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_polls_live ON polls(created_at, poll_id) WHERE archived_at IS NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_polls_unarchived_end ON polls(final_end_min) WHERE archived_at IS NULL")
+    if HAS_FTS5:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS polls_fts USING fts5(poll_id UNINDEXED, title, description)")
+        conn.execute(
+            "INSERT INTO polls_fts(poll_id, title, description) "
+            "SELECT poll_id, COALESCE(title, ''), COALESCE(description, '') FROM polls"
+        )
+
+
+# Ordered schema steps; a database at PRAGMA user_version N has run MIGRATIONS[:N].
+# Append new steps, never reorder or edit shipped ones.
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _migrate_base_schema,
+    _migrate_voters,
+    _migrate_poll_revisions,
+    _migrate_option_tallies,
+    _migrate_slot_rules,
+    _migrate_calendar_sync,
+    _migrate_epoch_minutes,
+    _migrate_poll_catalog,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Run pending migrations in one write transaction and return the resulting version."""
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+    with transaction(conn):
+        # another worker may have migrated while we waited for the write lock
+        version = schema_version(conn)
+        for step in MIGRATIONS[version:]:
+            step(conn)
+            version += 1
+            conn.execute(f"PRAGMA user_version = {version}")
+    return version
+
+
+def init_schema(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Bring the schema up to date; a current database costs a single pragma read."""
+    migrate(conn)
     return conn
 
 
-def get_conn(db_path: str = DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    return init_schema(conn)
+def configure_conn(conn: sqlite3.Connection, busy_timeout: float = BUSY_TIMEOUT_SECONDS) -> sqlite3.Connection:
+    """Switch to WAL so readers never block on a writer, and relax fsyncs accordingly."""
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -16000")  # KiB, ~16 MB page cache
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+    return conn
+
+
+def get_conn(db_path: str = DB_PATH, busy_timeout: float = BUSY_TIMEOUT_SECONDS) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=busy_timeout, check_same_thread=False, factory=TracingConnection)
+    return init_schema(configure_conn(conn, busy_timeout))
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT``, rolled back on error.
+
+    The write lock is taken up front, so reads inside the block see the state that gets
+    written. Nested use joins the transaction already open on ``conn``.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    t0 = perf_counter()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError as exc:
+        if "locked" in str(exc):
+            DB_LOCKED.inc()
+        raise
+    DB_LOCK_WAIT_SECONDS.observe(perf_counter() - t0)
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class ConnectionPool:
+    """One connection per thread, recycled once the owning thread has exited.
+
+    Streamlit runs every rerun of every session on its own thread, so sessions never share
+    a connection: reads proceed in parallel under WAL and each writer's transaction stays
+    its own. Connections of finished threads go back to an idle list (at most ``max_idle``
+    kept open) for the next thread to pick up.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_idle: int = 8, busy_timeout: float = BUSY_TIMEOUT_SECONDS):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._owners: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._idle: List[sqlite3.Connection] = []
+        self._closed = False
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection; opened (and migrated) on first use."""
+        thread = threading.current_thread()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("connection pool is closed")
+            conn = self._owners.get(thread)
+            if conn is not None:
+                return conn
+            self._reap()
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = get_conn(self.db_path, self.busy_timeout)
+        with self._lock:
+            self._owners[thread] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with transaction(self.connection()) as conn:
+            yield conn
+
+    def release(self) -> None:
+        """Hand the calling thread's connection back before the thread exits."""
+        with self._lock:
+            conn = self._owners.pop(threading.current_thread(), None)
+            if conn is not None:
+                self._recycle(conn)
+
+    def _reap(self) -> None:
+        for thread in [t for t in self._owners if not t.is_alive()]:
+            self._recycle(self._owners.pop(thread))
+
+    def _recycle(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        if len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_use": len(self._owners), "idle": len(self._idle)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for conn in [*self._owners.values(), *self._idle]:
+                conn.close()
+            self._owners.clear()
+            self._idle.clear()
+
+
+@dataclass
+class SlotRules:
+    """Optional constraints for :func:`generate_slot_arrays`; the defaults reproduce the plain grid."""
+
+    weekdays: Optional[Sequence[int]] = None  # 0=Mon .. 6=Sun; None keeps every day
+    exclude_dates: Sequence[date] = ()
+    breaks: Sequence[Tuple[time, time]] = ()  # e.g. lunch; slotting restarts after each break
+    day_windows: Dict[int, Tuple[time, time]] = field(default_factory=dict)  # weekday -> own start/end
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "weekdays": list(self.weekdays) if self.weekdays is not None else None,
+                "exclude_dates": [d.isoformat() for d in self.exclude_dates],
+                "breaks": [[b.isoformat(), e.isoformat()] for b, e in self.breaks],
+                "day_windows": {str(wd): [b.isoformat(), e.isoformat()] for wd, (b, e) in self.day_windows.items()},
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> "SlotRules":
+        if not raw:
+            return cls()
+        data = json.loads(raw)
+        return cls(
+            weekdays=data.get("weekdays"),
+            exclude_dates=[date.fromisoformat(d) for d in data.get("exclude_dates", [])],
+            breaks=[(time.fromisoformat(b), time.fromisoformat(e)) for b, e in data.get("breaks", [])],
+            day_windows={
+                int(wd): (time.fromisoformat(b), time.fromisoformat(e))
+                for wd, (b, e) in data.get("day_windows", {}).items()
+            },
+        )
+
+
+class SlotArrays(NamedTuple):
+    """Generated slots as parallel ``datetime64[m]`` arrays."""
+
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def iso(self) -> Tuple[List[str], List[str]]:
+        return (
+            np.datetime_as_string(self.starts, unit="s").tolist(),
+            np.datetime_as_string(self.ends, unit="s").tolist(),
+        )
+
+    def minutes(self, timezone: str) -> Tuple[np.ndarray, np.ndarray]:
+        return to_epoch_minutes(self.starts, timezone), to_epoch_minutes(self.ends, timezone)
+
+    @classmethod
+    def from_pairs(cls, slots: Iterable[Tuple[datetime, datetime]]) -> "SlotArrays":
+        pairs = list(slots)
+        return cls(
+            np.array([start for start, _ in pairs], dtype="datetime64[m]"),
+            np.array([end for _, end in pairs], dtype="datetime64[m]"),
+        )
+
+
+def _minute_of_day(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def generate_slot_arrays(
+    start_d: date,
+    end_d: date,
+    start_t: time,
+    end_t: time,
+    minutes: int,
+    rules: Optional[SlotRules] = None,
+) -> SlotArrays:
+    """Vectorized slot grid over ``[start_d, end_d]``: one window per day, split around breaks.
+
+    Each window is cut into ``minutes``-long slots from its start; the last slot of a window is
+    shortened to fit, matching :func:`generate_slots`.
+    """
+    rules = rules or SlotRules()
+    days = np.arange(np.datetime64(start_d, "D"), np.datetime64(end_d, "D") + 1)
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    keep = np.ones(len(days), dtype=bool)
+    if rules.weekdays is not None:
+        keep &= np.isin(weekday, list(rules.weekdays))
+    if rules.exclude_dates:
+        keep &= ~np.isin(days, np.array(list(rules.exclude_dates), dtype="datetime64[D]"))
+    days, weekday = days[keep], weekday[keep]
+
+    win_start = np.full(len(days), _minute_of_day(start_t), dtype=np.int64)
+    win_end = np.full(len(days), _minute_of_day(end_t), dtype=np.int64)
+    for wd, (wd_start, wd_end) in rules.day_windows.items():
+        win_start[weekday == wd] = _minute_of_day(wd_start)
+        win_end[weekday == wd] = _minute_of_day(wd_end)
+
+    # segment the window around breaks: [start, b1), [b1_end, b2), ..., [bk_end, end)
+    breaks = sorted((_minute_of_day(b), _minute_of_day(e)) for b, e in rules.breaks)
+    seg_start = np.column_stack([win_start] + [np.full(len(days), e) for _, e in breaks])
+    seg_end = np.column_stack([np.full(len(days), b) for b, _ in breaks] + [win_end])
+    seg_start = np.clip(seg_start, win_start[:, None], win_end[:, None])
+    seg_end = np.clip(seg_end, win_start[:, None], win_end[:, None])
+    valid = seg_end > seg_start
+    seg_day = np.broadcast_to(np.arange(len(days))[:, None], seg_start.shape)[valid]
+    seg_start, seg_end = seg_start[valid], seg_end[valid]
+
+    per_segment = -(-(seg_end - seg_start) // minutes)  # ceil division
+    total = int(per_segment.sum())
+    seg_of_slot = np.repeat(np.arange(len(seg_start)), per_segment)
+    step = np.arange(total) - np.repeat(np.cumsum(per_segment) - per_segment, per_segment)
+    offset = seg_start[seg_of_slot] + step * minutes
+    slot_end = np.minimum(offset + minutes, seg_end[seg_of_slot])
+    base = days[seg_day[seg_of_slot]].astype("datetime64[m]")
+    return SlotArrays(base + offset.astype("timedelta64[m]"), base + slot_end.astype("timedelta64[m]"))
 
 
 def generate_slots(
-    start_d: date, end_d: date, start_t: time, end_t: time, minutes: int
+    start_d: date,
+    end_d: date,
+    start_t: time,
+    end_t: time,
+    minutes: int,
+    rules: Optional[SlotRules] = None,
 ) -> List[Tuple[datetime, datetime]]:
-    slots: List[Tuple[datetime, datetime]] = []
-    current_day = start_d
-    while current_day <= end_d:
-        cursor = datetime.combine(current_day, start_t)
-        end_dt = datetime.combine(current_day, end_t)
-        while cursor < end_dt:
-            slot_end = min(cursor + timedelta(minutes=minutes), end_dt)
-            slots.append((cursor, slot_end))
-            cursor = slot_end
-        current_day += timedelta(days=1)
-    return slots
+    arrays = generate_slot_arrays(start_d, end_d, start_t, end_t, minutes, rules)
+    return list(zip(arrays.starts.astype(datetime).tolist(), arrays.ends.astype(datetime).tolist()))
 
 
 def slot_label(start_ts: str, end_ts: str) -> str:
@@ -96,6 +1088,935 @@ def slot_label(start_ts: str, end_ts: str) -> str:
     return f"{day_label} {start.strftime('%H:%M')} - {end.strftime('%H:%M')}"
 
 
+TIMELINE_PALETTE = ["#1e293b", "#0ea5e9", "#0ea5e9", "#0284c7", "#0369a1", "#075985"]
+TIMELINE_TOOLTIP_VOTERS = 15
+
+
+@traced()
+def render_timeline_html(
+    slots: SlotIndex,
+    counts: Dict[int, int],
+    voters: Dict[int, List[str]],
+    title: str,
+    people_suffix: str,
+    slots_badge: str,
+) -> str:
+    """Build the per-day timeline card in one pass; ``slots_badge`` is formatted with ``count``."""
+    if not len(slots):
+        return ""
+    minutes = np.maximum(1, (slots.ends - slots.starts).astype(np.int64))
+    count_arr = np.array([counts.get(oid, 0) for oid in slots.option_ids], dtype=np.int64)
+    max_count = max(counts.values()) if counts else 0
+    if max_count > 0:
+        buckets = np.minimum(len(TIMELINE_PALETTE) - 1, (count_arr / max_count * (len(TIMELINE_PALETTE) - 1)).astype(int))
+    else:
+        buckets = np.zeros(len(slots), dtype=int)
+
+    rows = []
+    for day, positions in slots.days.items():
+        pos = np.asarray(positions)
+        day_minutes = max(1, int((slots.ends[pos].max() - slots.starts[pos].min()).astype(np.int64)))
+        widths = (minutes[pos] / day_minutes * 100).tolist()
+        segments = []
+        for p, width in zip(positions, widths):
+            oid = slots.option_ids[p]
+            start_s = slots.time_labels[p][:5]
+            tooltip = f"{slots.time_labels[p]}\n{count_arr[p]} {people_suffix}"
+            names = voters.get(oid)
+            if names:
+                tooltip += "\n" + "\n".join(names[:TIMELINE_TOOLTIP_VOTERS])
+            tip = html.escape(tooltip, quote=True)
+            segments.append(
+                f"<div class='timeline-segment' style='width:{width:.2f}%;background:{TIMELINE_PALETTE[buckets[p]]}' "
+                f"data-tip='{tip}' title='{tip}'>{start_s}</div>"
+            )
+        rows.append(
+            f"<div class='timeline-row'><div class='timeline-label'>{day}"
+            f"<span class='timeline-badge'>{slots_badge.format(count=len(positions))}</span></div>"
+            f"<div class='timeline-bar'>{''.join(segments)}</div></div>"
+        )
+    return f"<div class='timeline-card'><div class='timeline-title'>{title}</div>{''.join(rows)}</div>"
+
+
 def load_polls(conn: sqlite3.Connection) -> pd.DataFrame:
     return pd.read_sql("SELECT poll_id, title FROM polls ORDER BY created_at DESC", conn)
 
+
+ACTIVE_POLLS_SQL = "SELECT COUNT(*) FROM polls WHERE final_start_min IS NULL AND archived_at IS NULL"
+
+
+def count_active_polls(conn: sqlite3.Connection) -> int:
+    return conn.execute(ACTIVE_POLLS_SQL).fetchone()[0]
+
+
+class PollCursor(NamedTuple):
+    """Keyset position: the last row of a page, in ``created_at DESC, poll_id DESC`` order."""
+
+    created_at: str
+    poll_id: str
+
+
+class PollPage(NamedTuple):
+    polls: pd.DataFrame  # poll_id, title, created_at, final_start_ts, final_end_ts, archived_at
+    next_cursor: Optional[PollCursor]  # None on the last page
+
+
+def now_minutes() -> int:
+    return int(datetime.now(dt_timezone.utc).timestamp() // 60)
+
+
+def utc_now_iso() -> str:
+    """Current time for ``created_at``-style audit columns, with an explicit ``+00:00``."""
+    return datetime.now(dt_timezone.utc).isoformat()
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Words of a search box entry; punctuation never reaches the query syntax."""
+    return re.findall(r"\w+", query or "")
+
+
+def catalog_sql(
+    search: Optional[Tuple[str, Any]],
+    archived: bool,
+    cursor: Optional[PollCursor],
+    limit: int,
+    now_min: int,
+    placeholder: str = "?",
+) -> Tuple[str, List[Any]]:
+    """One catalog page for either backend; ``search`` is a backend-specific (predicate, param).
+
+    Finalized polls whose final slot has ended count as archived even before
+    :func:`archive_finished_polls` stamps them, so the default list never shows them.
+    """
+    p = placeholder
+    if archived:
+        where = [f"(archived_at IS NOT NULL OR final_end_min < {p})"]
+    else:
+        # archived_at IS NULL lets the planner walk the partial idx_polls_live
+        where = ["archived_at IS NULL", f"(final_end_min IS NULL OR final_end_min >= {p})"]
+    params: List[Any] = [int(now_min)]
+    if search is not None:
+        where.append(search[0])
+        params.append(search[1])
+    if cursor is not None:
+        where.append(f"(created_at, poll_id) < ({p}, {p})")
+        params.extend(cursor)
+    sql = f"""
+        SELECT poll_id, title, created_at, final_start_ts, final_end_ts, archived_at FROM polls
+        WHERE {" AND ".join(where)}
+        ORDER BY created_at DESC, poll_id DESC
+        LIMIT {p}
+    """
+    return sql, params + [int(limit) + 1]
+
+
+def poll_page(rows: pd.DataFrame, limit: int) -> PollPage:
+    """Trim the look-ahead row fetched by :func:`catalog_sql` into a next-page cursor."""
+    if len(rows) <= limit:
+        return PollPage(rows.reset_index(drop=True), None)
+    page = rows.iloc[:limit].reset_index(drop=True)
+    last = page.iloc[-1]
+    return PollPage(page, PollCursor(last["created_at"], last["poll_id"]))
+
+
+def _fts_query(terms: Sequence[str]) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+@traced()
+def load_poll_page(
+    conn: sqlite3.Connection,
+    query: Optional[str] = None,
+    archived: bool = False,
+    cursor: Optional[PollCursor] = None,
+    limit: int = POLL_PAGE_SIZE,
+) -> PollPage:
+    """Newest-first page of live (or archived) polls, optionally narrowed by a title/description search."""
+    terms = search_terms(query)
+    search = None
+    if terms and HAS_FTS5:
+        search = ("poll_id IN (SELECT poll_id FROM polls_fts WHERE polls_fts MATCH ?)", _fts_query(terms))
+    elif terms:
+        search = ("(title || ' ' || COALESCE(description, '')) LIKE ?", "%" + "%".join(terms) + "%")
+    sql, params = catalog_sql(search, archived, cursor, limit, now_minutes())
+    return poll_page(pd.read_sql(sql, conn, params=params), limit)
+
+
+def _index_poll_text(conn: sqlite3.Connection, poll_id: str, title: Optional[str], description: Optional[str]) -> None:
+    if not HAS_FTS5:
+        return
+    conn.execute("DELETE FROM polls_fts WHERE poll_id = ?", (poll_id,))
+    if title is not None:
+        conn.execute(
+            "INSERT INTO polls_fts(poll_id, title, description) VALUES (?, ?, ?)", (poll_id, title, description or "")
+        )
+
+
+def archive_finished_polls(conn: sqlite3.Connection, now_min: Optional[int] = None) -> List[str]:
+    """Stamp ``archived_at`` on finalized polls whose final slot has ended; returns their ids."""
+    now_min = now_minutes() if now_min is None else now_min
+    with transaction(conn):
+        ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT poll_id FROM polls WHERE archived_at IS NULL AND final_end_min < ?", (now_min,)
+            )
+        ]
+        if ids:
+            conn.execute(
+                "UPDATE polls SET archived_at = ? WHERE archived_at IS NULL AND final_end_min < ?",
+                (utc_now_iso(), now_min),
+            )
+            for poll_id in ids:
+                _bump_revision(conn, poll_id)
+    return ids
+
+
+def _bump_revision(conn: sqlite3.Connection, poll_id: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO poll_revisions(poll_id, revision) VALUES (?, 1)
+        ON CONFLICT(poll_id) DO UPDATE SET revision = revision + 1
+        """,
+        (poll_id,),
+    )
+
+
+def poll_revision(conn: sqlite3.Connection, poll_id: str) -> int:
+    """Counter bumped by every write to a poll; pair it with ``poll_id`` as a cache key."""
+    row = conn.execute("SELECT revision FROM poll_revisions WHERE poll_id = ?", (poll_id,)).fetchone()
+    return row[0] if row else 0
+
+
+@traced()
+def load_poll_snapshot(conn: sqlite3.Connection, poll_id: str) -> Optional[PollSnapshot]:
+    # read the revision first so the data is at least as new as the key it is cached under
+    revision = poll_revision(conn, poll_id)
+    meta = pd.read_sql("SELECT * FROM polls WHERE poll_id = ?", conn, params=(poll_id,))
+    if meta.empty:
+        return None
+    options = pd.read_sql(
+        "SELECT option_id, start_ts, end_ts, start_min, end_min FROM options WHERE poll_id = ? ORDER BY start_min",
+        conn,
+        params=(poll_id,),
+    )
+    voters = [row[0] for row in conn.execute("SELECT voter_name FROM voters WHERE poll_id = ?", (poll_id,))]
+    yes_votes = pd.read_sql(
+        "SELECT voter_name, option_id FROM votes WHERE poll_id = ? AND available = 1", conn, params=(poll_id,)
+    )
+    counts = dict(
+        conn.execute("SELECT option_id, yes_count FROM option_tallies WHERE poll_id = ?", (poll_id,)).fetchall()
+    )
+    return PollSnapshot.from_frames(poll_id, revision, meta, options, voters, yes_votes, counts)
+
+
+def insert_options(
+    conn: sqlite3.Connection,
+    poll_id: str,
+    slots: Union[SlotArrays, Iterable[Tuple[datetime, datetime]]],
+    timezone: str = DEFAULT_TIMEZONE,
+) -> int:
+    """Insert generated slots with a single executemany; the caller owns the transaction."""
+    if not isinstance(slots, SlotArrays):
+        slots = SlotArrays.from_pairs(slots)
+    starts, ends = slots.iso()
+    start_min, end_min = slots.minutes(timezone)
+    rows = list(zip(repeat(poll_id), starts, ends, start_min.tolist(), end_min.tolist()))
+    conn.executemany("INSERT INTO options(poll_id, start_ts, end_ts, start_min, end_min) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.execute(
+        "INSERT OR IGNORE INTO option_tallies(option_id, poll_id) SELECT option_id, poll_id FROM options WHERE poll_id = ?",
+        (poll_id,),
+    )
+    return len(rows)
+
+
+def create_poll(
+    conn: sqlite3.Connection,
+    poll_id: str,
+    title: str,
+    description: str,
+    start_d: date,
+    end_d: date,
+    start_t: time,
+    end_t: time,
+    slot_minutes: int,
+    poll_password: Optional[str],
+    slots: Union[SlotArrays, Iterable[Tuple[datetime, datetime]]],
+    slot_rules: Optional[SlotRules] = None,
+    timezone: str = DEFAULT_TIMEZONE,
+) -> int:
+    """Create or overwrite a poll and its slots atomically. Existing votes are discarded."""
+    with transaction(conn):
+        conn.execute("DELETE FROM votes WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM voters WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM option_tallies WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM options WHERE poll_id = ?", (poll_id,))
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO polls(
+                poll_id, title, description, start_date, end_date,
+                start_time, end_time, slot_minutes, poll_password, slot_rules, created_at, timezone
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                poll_id,
+                title,
+                description,
+                start_d.isoformat(),
+                end_d.isoformat(),
+                start_t.isoformat(),
+                end_t.isoformat(),
+                int(slot_minutes),
+                poll_password or None,
+                slot_rules.to_json() if slot_rules else None,
+                utc_now_iso(),
+                timezone,
+            ),
+        )
+        _index_poll_text(conn, poll_id, title, description)
+        _bump_revision(conn, poll_id)
+        return insert_options(conn, poll_id, slots, timezone)
+
+
+def delete_poll(conn: sqlite3.Connection, poll_id: str) -> None:
+    with transaction(conn):
+        conn.execute("DELETE FROM votes WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM voters WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM option_tallies WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM options WHERE poll_id = ?", (poll_id,))
+        conn.execute("DELETE FROM polls WHERE poll_id = ?", (poll_id,))
+        _index_poll_text(conn, poll_id, None, None)
+        _bump_revision(conn, poll_id)
+
+
+def remove_options(conn: sqlite3.Connection, poll_id: str, option_ids: Iterable[int]) -> None:
+    """Drop slots and their votes, clearing the final time if any of them overlaps it.
+
+    A multi-slot meeting is finalized as one span, so removing any slot inside it clears it.
+    """
+    ids = [int(oid) for oid in option_ids]
+    if not ids:
+        return
+    placeholders = ",".join("?" for _ in ids)
+    with transaction(conn):
+        conn.execute(
+            f"""
+            UPDATE polls
+            SET final_start_ts = NULL, final_end_ts = NULL, final_start_min = NULL, final_end_min = NULL,
+                archived_at = NULL
+            WHERE poll_id = ? AND EXISTS (
+                SELECT 1 FROM options o
+                WHERE o.poll_id = polls.poll_id AND o.option_id IN ({placeholders})
+                  AND o.start_min < polls.final_end_min AND o.end_min > polls.final_start_min
+            )
+            """,
+            (poll_id, *ids),
+        )
+        conn.execute(f"DELETE FROM votes WHERE poll_id = ? AND option_id IN ({placeholders})", (poll_id, *ids))
+        conn.execute(f"DELETE FROM option_tallies WHERE poll_id = ? AND option_id IN ({placeholders})", (poll_id, *ids))
+        conn.execute(f"DELETE FROM options WHERE poll_id = ? AND option_id IN ({placeholders})", (poll_id, *ids))
+        _bump_revision(conn, poll_id)
+
+
+def poll_timezone(conn: sqlite3.Connection, poll_id: str) -> str:
+    row = conn.execute("SELECT timezone FROM polls WHERE poll_id = ?", (poll_id,)).fetchone()
+    return (row[0] if row else None) or DEFAULT_TIMEZONE
+
+
+def final_minutes(start_ts: str, end_ts: str, timezone: str) -> Tuple[int, int]:
+    start_min, end_min = to_epoch_minutes(np.array([start_ts, end_ts], dtype="datetime64[s]"), timezone).tolist()
+    return start_min, end_min
+
+
+# the options inside a proposed final window; it is valid when they tile it end to end
+FINAL_WINDOW_SQL = """
+    SELECT MIN(start_min), MAX(end_min), SUM(end_min - start_min) FROM options
+    WHERE poll_id = {p} AND start_min >= {p} AND end_min <= {p}
+"""
+
+
+def check_final_window(covered: Tuple[Any, ...], start_min: int, end_min: int) -> None:
+    """Reject a final window that is not made of the poll's current options, e.g. after a
+    concurrent edit removed one of its slots."""
+    if start_min >= end_min or tuple(covered) != (start_min, end_min, end_min - start_min):
+        raise ValueError("final time no longer matches the poll's slots")
+
+
+def finalize_poll(conn: sqlite3.Connection, poll_id: str, start_ts: str, end_ts: str) -> Tuple[int, int]:
+    """Set the final slot; returns it in epoch minutes.
+
+    Raises ``ValueError`` unless the window is covered by the poll's options without gaps.
+    """
+    with transaction(conn):
+        start_min, end_min = final_minutes(start_ts, end_ts, poll_timezone(conn, poll_id))
+        covered = conn.execute(FINAL_WINDOW_SQL.format(p="?"), (poll_id, start_min, end_min)).fetchone()
+        check_final_window(covered, start_min, end_min)
+        conn.execute(
+            """
+            UPDATE polls SET final_start_ts = ?, final_end_ts = ?, final_start_min = ?, final_end_min = ?,
+                archived_at = NULL
+            WHERE poll_id = ?
+            """,
+            (start_ts, end_ts, start_min, end_min, poll_id),
+        )
+        _bump_revision(conn, poll_id)
+    return start_min, end_min
+
+
+def load_finalized_polls(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql(
+        """
+        SELECT poll_id, title, description, final_start_ts, final_end_ts, final_start_min, final_end_min, timezone
+        FROM polls
+        WHERE final_start_min IS NOT NULL AND final_end_min IS NOT NULL
+        ORDER BY final_start_min
+        """,
+        conn,
+    )
+
+
+# final slots of live polls and candidate slots of undecided ones in one window; both halves are
+# range scans (idx_polls_unarchived_end, idx_options_start_min). Archived polls ended before now.
+CONFLICT_WINDOW_SQL = """
+    SELECT poll_id, title, final_start_min AS start_min, final_end_min AS end_min, 1 AS is_final
+    FROM polls
+    WHERE archived_at IS NULL AND final_end_min > {p} AND final_start_min < {p}
+    UNION ALL
+    SELECT o.poll_id, p.title, o.start_min, o.end_min, 0 AS is_final
+    FROM options o JOIN polls p ON p.poll_id = o.poll_id
+    WHERE o.start_min >= {p} AND o.start_min < {p} AND p.final_start_min IS NULL
+"""
+
+
+def load_conflict_window(conn: sqlite3.Connection, start_min: int, end_min: int) -> pd.DataFrame:
+    """Rows for :meth:`ConflictIndex.build` between ``start_min`` and ``end_min``."""
+    window = (int(start_min), int(end_min))
+    return pd.read_sql(CONFLICT_WINDOW_SQL.format(p="?"), conn, params=window + window)
+
+
+OPTION_RANGE_SQL = """
+    SELECT poll_id, option_id, start_ts, end_ts, start_min, end_min FROM options
+    WHERE start_min >= {p} AND start_min < {p}
+    ORDER BY start_min
+"""
+
+
+def load_options_between(conn: sqlite3.Connection, start_min: int, end_min: int) -> pd.DataFrame:
+    """Slots across all polls starting in ``[start_min, end_min)``, a range scan on idx_options_start_min."""
+    return pd.read_sql(OPTION_RANGE_SQL.format(p="?"), conn, params=(int(start_min), int(end_min)))
+
+
+def load_calendar_sync(conn: sqlite3.Connection, calendar_id: str) -> Dict[str, Tuple[str, str]]:
+    """poll_id -> (event_id, fingerprint) of what was last pushed to ``calendar_id``."""
+    rows = conn.execute(
+        "SELECT poll_id, event_id, fingerprint FROM calendar_sync WHERE calendar_id = ?", (calendar_id,)
+    )
+    return {poll_id: (event_id, fingerprint) for poll_id, event_id, fingerprint in rows}
+
+
+def record_calendar_sync(
+    conn: sqlite3.Connection, calendar_id: str, rows: Iterable[Tuple[str, str, str]]
+) -> None:
+    """Upsert ``(poll_id, event_id, fingerprint)`` rows for ``calendar_id``."""
+    now = utc_now_iso()
+    with transaction(conn):
+        conn.executemany(
+            """
+            INSERT INTO calendar_sync(poll_id, calendar_id, event_id, fingerprint, synced_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(poll_id, calendar_id) DO UPDATE SET
+                event_id = excluded.event_id, fingerprint = excluded.fingerprint, synced_at = excluded.synced_at
+            """,
+            [(poll_id, calendar_id, event_id, fingerprint, now) for poll_id, event_id, fingerprint in rows],
+        )
+
+
+RESULT_COLUMNS = ["voter_name", "option_id", "available", "start_ts", "end_ts"]
+
+
+def result_columns(poll_ids: Optional[Sequence[str]]) -> List[str]:
+    """Single-poll exports omit the poll_id column; multi-poll exports lead with it."""
+    return RESULT_COLUMNS if poll_ids is not None and len(poll_ids) == 1 else ["poll_id", *RESULT_COLUMNS]
+
+
+def results_sql(poll_ids: Optional[Sequence[str]], placeholder: str = "?") -> Tuple[str, List[str]]:
+    """SELECT over vote rows joined to their slots, ordered for export."""
+    columns = result_columns(poll_ids)
+    select = ", ".join(f"o.{c}" if c in ("start_ts", "end_ts") else f"v.{c}" for c in columns)
+    sql = f"SELECT {select} FROM votes v JOIN options o ON v.option_id = o.option_id"
+    if poll_ids is not None:
+        sql += f" WHERE v.poll_id IN ({','.join(placeholder for _ in poll_ids)})"
+    return sql + " ORDER BY v.poll_id, o.start_ts, v.voter_name", columns
+
+
+def load_voter(conn: sqlite3.Connection, poll_id: str, voter_name: str) -> Optional[VoterRecord]:
+    row = conn.execute(
+        "SELECT voter_password, comment FROM voters WHERE poll_id = ? AND voter_name = ?",
+        (poll_id, voter_name),
+    ).fetchone()
+    return VoterRecord(*row) if row else None
+
+
+def load_voter_choices(conn: sqlite3.Connection, poll_id: str, voter_name: str) -> List[int]:
+    rows = conn.execute(
+        "SELECT option_id FROM votes WHERE poll_id = ? AND voter_name = ? AND available = 1",
+        (poll_id, voter_name),
+    )
+    return [row[0] for row in rows]
+
+
+def set_voter_password(conn: sqlite3.Connection, poll_id: str, voter_name: str, password_hash: str) -> None:
+    with transaction(conn):
+        conn.execute(
+            "UPDATE voters SET voter_password = ? WHERE poll_id = ? AND voter_name = ?",
+            (password_hash, poll_id, voter_name),
+        )
+
+
+def diff_votes(
+    option_ids: Sequence[int], chosen: Iterable[int], existing: pd.DataFrame
+) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    """Compare a voter's picks with their stored ``option_id``/``stored`` rows.
+
+    Returns the ``(option_id, available)`` rows that differ and the non-zero
+    ``(delta, option_id)`` adjustments for ``option_tallies``.
+    """
+    desired = pd.DataFrame({"option_id": pd.Series(option_ids, dtype="int64")})
+    desired["available"] = desired["option_id"].isin(set(chosen)).astype("int64")
+    merged = desired.merge(existing, on="option_id", how="left")
+    changed = merged[merged["stored"].ne(merged["available"])]
+    deltas = changed["available"] - changed["stored"].fillna(0).astype("int64")
+    tally_rows = [(int(d), int(oid)) for d, oid in zip(deltas, changed["option_id"]) if d]
+    return list(zip(changed["option_id"].tolist(), changed["available"].tolist())), tally_rows
+
+
+def merge_voter_record(
+    record: Optional[VoterRecord], comment: Optional[str], voter_password: Optional[str]
+) -> VoterRecord:
+    """``None`` keeps the stored value."""
+    return VoterRecord(
+        voter_password if voter_password is not None else (record.voter_password if record else None),
+        comment if comment is not None else (record.comment if record else None),
+    )
+
+
+@traced()
+def save_votes(
+    conn: sqlite3.Connection,
+    poll_id: str,
+    voter_name: str,
+    option_ids: Sequence[int],
+    chosen: Iterable[int],
+    comment: Optional[str] = None,
+    voter_password: Optional[str] = None,
+) -> int:
+    """Store one voter's availability over ``option_ids`` in a single transaction.
+
+    Only rows whose ``available`` value differs from what is stored are written. ``comment``
+    and ``voter_password`` of ``None`` keep the stored values. Returns the number of vote rows
+    upserted.
+    """
+    # diff against the stored rows under the write lock so concurrent saves cannot skew tallies
+    with SAVE_SECONDS.time(), transaction(conn):
+        existing = pd.read_sql(
+            "SELECT option_id, available AS stored FROM votes WHERE poll_id = ? AND voter_name = ?",
+            conn,
+            params=(poll_id, voter_name),
+        )
+        changes, tally_rows = diff_votes(option_ids, chosen, existing)
+        rows = [(poll_id, voter_name, oid, available) for oid, available in changes]
+        record = load_voter(conn, poll_id, voter_name)
+        new_record = merge_voter_record(record, comment, voter_password)
+        if not rows and record == new_record:
+            return 0
+        if record != new_record:
+            conn.execute(
+                """
+                INSERT INTO voters(poll_id, voter_name, voter_password, comment) VALUES (?, ?, ?, ?)
+                ON CONFLICT(poll_id, voter_name) DO UPDATE SET
+                    voter_password = excluded.voter_password, comment = excluded.comment
+                """,
+                (poll_id, voter_name, *new_record),
+            )
+        conn.executemany(
+            """
+            INSERT INTO votes(poll_id, voter_name, option_id, available) VALUES (?, ?, ?, ?)
+            ON CONFLICT(poll_id, voter_name, option_id) DO UPDATE SET available = excluded.available
+            """,
+            rows,
+        )
+        conn.executemany("UPDATE option_tallies SET yes_count = yes_count + ? WHERE option_id = ?", tally_rows)
+        _bump_revision(conn, poll_id)
+    VOTES_SAVED.inc()
+    VOTE_ROWS_CHANGED.inc(len(rows))
+    return len(rows)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    with PASSWORD_HASH_SECONDS.time():
+        # pbkdf2_hmac releases the GIL, so other sessions keep running while this one hashes
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password(password: str) -> str:
+    salt = os.urandom(16)
+    iterations = PBKDF2_ITERATIONS
+    dk = _pbkdf2(password, salt, iterations)
+    return f"pbkdf2${iterations}${base64.b64encode(salt).decode('ascii')}${base64.b64encode(dk).decode('ascii')}"
+
+
+@traced()
+def check_password(password: str, stored: str) -> Tuple[bool, bool]:
+    """Return ``(matches, needs_upgrade)``; plaintext legacy values need re-hashing."""
+    if stored.startswith("pbkdf2$"):
+        try:
+            _, iter_s, salt_b64, dk_b64 = stored.split("$", 3)
+            iterations = int(iter_s)
+            salt = base64.b64decode(salt_b64)
+            dk_expected = base64.b64decode(dk_b64)
+        except Exception:
+            return False, False
+        dk = _pbkdf2(password, salt, iterations)
+        return hmac.compare_digest(dk, dk_expected), False
+    return password == stored, True
+
+
+class CredentialCache:
+    """Per-session memory of successful voter logins so PBKDF2 runs once per TTL.
+
+    Entries are keyed on the stored hash, so a password change invalidates them. The typed
+    password is kept only as an HMAC under a random per-cache key.
+    """
+
+    def __init__(self, ttl: float = CREDENTIAL_TTL_SECONDS):
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries: Dict[Tuple[str, str, str], Tuple[bytes, float]] = {}
+
+    def _fingerprint(self, password: str) -> bytes:
+        return hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+
+    def lookup(self, poll_id: str, voter_name: str, stored: str, password: str) -> bool:
+        entry = self._entries.get((poll_id, voter_name, stored))
+        if entry is None:
+            return False
+        fingerprint, expires_at = entry
+        if expires_at <= monotonic():
+            del self._entries[(poll_id, voter_name, stored)]
+            return False
+        return hmac.compare_digest(fingerprint, self._fingerprint(password))
+
+    def remember(self, poll_id: str, voter_name: str, stored: str, password: str) -> None:
+        now = monotonic()
+        # drop expired entries and any superseded hash for this voter
+        self._entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if entry[1] > now and key[:2] != (poll_id, voter_name)
+        }
+        self._entries[(poll_id, voter_name, stored)] = (self._fingerprint(password), now + self.ttl)
+
+    def verify(self, poll_id: str, voter_name: str, stored: str, password: str) -> Tuple[bool, bool]:
+        """Like :func:`check_password`, skipping PBKDF2 for a recently verified login."""
+        hit = self.lookup(poll_id, voter_name, stored, password)
+        cache_lookup("credentials", hit)
+        if hit:
+            return True, False
+        ok, needs_upgrade = check_password(password, stored)
+        if ok and not needs_upgrade:
+            self.remember(poll_id, voter_name, stored, password)
+        return ok, needs_upgrade
+
+
+class PollRepository(ABC):
+    """Storage backend for polls, options, voters, votes and tallies.
+
+    The app talks only to this interface; :class:`SqliteRepository` is the default and
+    ``scheduler_postgres.PostgresRepository`` lets several app replicas share one database.
+    Every write method is a single transaction.
+    """
+
+    def __init__(self) -> None:
+        self._conflicts: Optional[ConflictIndex] = None
+        self._conflicts_built = 0.0
+        # held while building and while patching, so a write landing mid-build patches the new index
+        self._conflicts_lock = threading.Lock()
+
+    @abstractmethod
+    def load_polls(self) -> pd.DataFrame: ...
+
+    @abstractmethod
+    def load_poll_page(
+        self,
+        query: Optional[str] = None,
+        archived: bool = False,
+        cursor: Optional[PollCursor] = None,
+        limit: int = POLL_PAGE_SIZE,
+    ) -> PollPage:
+        """Newest-first catalog page; pass the previous page's ``next_cursor`` to continue."""
+
+    @abstractmethod
+    def archive_finished_polls(self) -> List[str]:
+        """Archive finalized polls whose final slot has ended and return their ids."""
+
+    @abstractmethod
+    def poll_revision(self, poll_id: str) -> int: ...
+
+    @abstractmethod
+    def load_poll_snapshot(self, poll_id: str) -> Optional[PollSnapshot]: ...
+
+    @abstractmethod
+    def create_poll(
+        self,
+        poll_id: str,
+        title: str,
+        description: str,
+        start_d: date,
+        end_d: date,
+        start_t: time,
+        end_t: time,
+        slot_minutes: int,
+        poll_password: Optional[str],
+        slots: Union[SlotArrays, Iterable[Tuple[datetime, datetime]]],
+        slot_rules: Optional[SlotRules] = None,
+        timezone: str = DEFAULT_TIMEZONE,
+    ) -> int: ...
+
+    @abstractmethod
+    def delete_poll(self, poll_id: str) -> None: ...
+
+    @abstractmethod
+    def remove_options(self, poll_id: str, option_ids: Iterable[int]) -> None: ...
+
+    @abstractmethod
+    def finalize_poll(self, poll_id: str, start_ts: str, end_ts: str) -> None: ...
+
+    @abstractmethod
+    def load_voter(self, poll_id: str, voter_name: str) -> Optional[VoterRecord]: ...
+
+    @abstractmethod
+    def load_voter_choices(self, poll_id: str, voter_name: str) -> List[int]: ...
+
+    @abstractmethod
+    def set_voter_password(self, poll_id: str, voter_name: str, password_hash: str) -> None: ...
+
+    @abstractmethod
+    def save_votes(
+        self,
+        poll_id: str,
+        voter_name: str,
+        option_ids: Sequence[int],
+        chosen: Iterable[int],
+        comment: Optional[str] = None,
+        voter_password: Optional[str] = None,
+    ) -> int: ...
+
+    @abstractmethod
+    def result_chunks(
+        self, poll_ids: Optional[Sequence[str]], chunk_rows: int
+    ) -> Tuple[List[str], Iterator[List[Tuple[Any, ...]]]]:
+        """Export columns and an iterator of row batches; ``None`` selects every poll."""
+
+    @abstractmethod
+    def load_finalized_polls(self) -> pd.DataFrame:
+        """Every finalized poll with its final slot (ISO and epoch minutes) and timezone."""
+
+    @abstractmethod
+    def count_active_polls(self) -> int:
+        """Polls still collecting votes (neither finalized nor archived); one COUNT, no frames."""
+
+    @abstractmethod
+    def load_options_between(self, start_min: int, end_min: int) -> pd.DataFrame:
+        """Options of every poll starting in ``[start_min, end_min)`` epoch minutes."""
+
+    @abstractmethod
+    def load_conflict_window(self, start_min: int, end_min: int) -> pd.DataFrame:
+        """Final slots of live polls ending after ``start_min`` and candidate slots of undecided
+        polls starting in ``[start_min, end_min)``, as ``poll_id``, ``title``, ``start_min``,
+        ``end_min``, ``is_final`` rows."""
+
+    @abstractmethod
+    def load_calendar_sync(self, calendar_id: str) -> Dict[str, Tuple[str, str]]: ...
+
+    @abstractmethod
+    def record_calendar_sync(self, calendar_id: str, rows: Iterable[Tuple[str, str, str]]) -> None: ...
+
+    def conflict_index(self, until_min: int) -> ConflictIndex:
+        """Final and candidate slots of every poll from now up to at least ``until_min``.
+
+        Built on first use from one windowed query; slots that have already started are not
+        indexed. Writes through this repository update it in place; it is rebuilt every
+        ``CONFLICT_INDEX_TTL_SECONDS`` so writes from other processes show up too, and when a
+        lookup reaches past its window.
+        """
+        with self._conflicts_lock:
+            index = self._conflicts
+            if (
+                index is None
+                or not index.covers(until_min)
+                or monotonic() - self._conflicts_built > CONFLICT_INDEX_TTL_SECONDS
+            ):
+                now_min = now_minutes()
+                until_min = max(int(until_min), now_min + CONFLICT_WINDOW_MINUTES, index.until_min if index else 0)
+                self._conflicts = ConflictIndex.build(self.load_conflict_window(now_min, until_min), until_min)
+                self._conflicts_built = monotonic()
+            return self._conflicts
+
+    # called after the write commits: a build already running either saw it or is patched next
+    def _index_options(self, poll_id: str, title: str, slots: SlotArrays, timezone: str) -> None:
+        starts, ends = slots.minutes(timezone)
+        with self._conflicts_lock:
+            if self._conflicts is not None:
+                self._conflicts.set_options(poll_id, title, starts, ends)
+
+    def _index_final(self, poll_id: str, start_min: int, end_min: int) -> None:
+        with self._conflicts_lock:
+            if self._conflicts is not None:
+                self._conflicts.set_final(poll_id, start_min, end_min)
+
+    def _index_drop(self, poll_id: str) -> None:
+        with self._conflicts_lock:
+            if self._conflicts is not None:
+                self._conflicts.drop_poll(poll_id)
+
+    def _index_stale(self) -> None:
+        """For rarer edits (dropping slots may also clear a final slot): rebuild on next use."""
+        with self._conflicts_lock:
+            self._conflicts = None
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteRepository(PollRepository):
+    """The module-level SQLite functions behind a :class:`ConnectionPool`."""
+
+    def __init__(self, db_path: str = DB_PATH, pool: Optional[ConnectionPool] = None):
+        super().__init__()
+        self.pool = pool or ConnectionPool(db_path)
+
+    def load_polls(self) -> pd.DataFrame:
+        return load_polls(self.pool.connection())
+
+    def load_poll_page(
+        self,
+        query: Optional[str] = None,
+        archived: bool = False,
+        cursor: Optional[PollCursor] = None,
+        limit: int = POLL_PAGE_SIZE,
+    ) -> PollPage:
+        return load_poll_page(self.pool.connection(), query, archived, cursor, limit)
+
+    def archive_finished_polls(self) -> List[str]:
+        with self.pool.transaction() as conn:
+            return archive_finished_polls(conn)
+
+    def poll_revision(self, poll_id: str) -> int:
+        return poll_revision(self.pool.connection(), poll_id)
+
+    def load_poll_snapshot(self, poll_id: str) -> Optional[PollSnapshot]:
+        return load_poll_snapshot(self.pool.connection(), poll_id)
+
+    def create_poll(
+        self,
+        poll_id: str,
+        title: str,
+        description: str,
+        start_d: date,
+        end_d: date,
+        start_t: time,
+        end_t: time,
+        slot_minutes: int,
+        poll_password: Optional[str],
+        slots: Union[SlotArrays, Iterable[Tuple[datetime, datetime]]],
+        slot_rules: Optional[SlotRules] = None,
+        timezone: str = DEFAULT_TIMEZONE,
+    ) -> int:
+        if not isinstance(slots, SlotArrays):
+            slots = SlotArrays.from_pairs(slots)
+        with self.pool.transaction() as conn:
+            count = create_poll(
+                conn, poll_id, title, description, start_d, end_d, start_t, end_t,
+                slot_minutes, poll_password, slots, slot_rules, timezone,
+            )
+        self._index_options(poll_id, title, slots, timezone)
+        return count
+
+    def delete_poll(self, poll_id: str) -> None:
+        with self.pool.transaction() as conn:
+            delete_poll(conn, poll_id)
+        self._index_drop(poll_id)
+
+    def remove_options(self, poll_id: str, option_ids: Iterable[int]) -> None:
+        with self.pool.transaction() as conn:
+            remove_options(conn, poll_id, option_ids)
+        self._index_stale()
+
+    def finalize_poll(self, poll_id: str, start_ts: str, end_ts: str) -> None:
+        with self.pool.transaction() as conn:
+            start_min, end_min = finalize_poll(conn, poll_id, start_ts, end_ts)
+        self._index_final(poll_id, start_min, end_min)
+
+    def load_voter(self, poll_id: str, voter_name: str) -> Optional[VoterRecord]:
+        return load_voter(self.pool.connection(), poll_id, voter_name)
+
+    def load_voter_choices(self, poll_id: str, voter_name: str) -> List[int]:
+        return load_voter_choices(self.pool.connection(), poll_id, voter_name)
+
+    def set_voter_password(self, poll_id: str, voter_name: str, password_hash: str) -> None:
+        with self.pool.transaction() as conn:
+            set_voter_password(conn, poll_id, voter_name, password_hash)
+
+    def save_votes(
+        self,
+        poll_id: str,
+        voter_name: str,
+        option_ids: Sequence[int],
+        chosen: Iterable[int],
+        comment: Optional[str] = None,
+        voter_password: Optional[str] = None,
+    ) -> int:
+        with self.pool.transaction() as conn:
+            return save_votes(conn, poll_id, voter_name, option_ids, chosen, comment, voter_password)
+
+    def result_chunks(
+        self, poll_ids: Optional[Sequence[str]], chunk_rows: int
+    ) -> Tuple[List[str], Iterator[List[Tuple[Any, ...]]]]:
+        sql, columns = results_sql(poll_ids)
+        cursor = self.pool.connection().execute(sql, tuple(poll_ids or ()))
+        return columns, iter(lambda: cursor.fetchmany(chunk_rows), [])
+
+    def load_finalized_polls(self) -> pd.DataFrame:
+        return load_finalized_polls(self.pool.connection())
+
+    def count_active_polls(self) -> int:
+        return count_active_polls(self.pool.connection())
+
+    def load_options_between(self, start_min: int, end_min: int) -> pd.DataFrame:
+        return load_options_between(self.pool.connection(), start_min, end_min)
+
+    def load_conflict_window(self, start_min: int, end_min: int) -> pd.DataFrame:
+        return load_conflict_window(self.pool.connection(), start_min, end_min)
+
+    def load_calendar_sync(self, calendar_id: str) -> Dict[str, Tuple[str, str]]:
+        return load_calendar_sync(self.pool.connection(), calendar_id)
+
+    def record_calendar_sync(self, calendar_id: str, rows: Iterable[Tuple[str, str, str]]) -> None:
+        with self.pool.transaction() as conn:
+            record_calendar_sync(conn, calendar_id, rows)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def open_repository(url: Optional[str] = None) -> PollRepository:
+    """Backend for ``url``, defaulting to ``$SCHEDULER_DB_URL`` and then :data:`DB_PATH`.
+
+    ``postgresql://...`` selects PostgreSQL; ``sqlite:///path`` or a bare path selects SQLite.
+    """
+    url = url or os.environ.get("SCHEDULER_DB_URL") or DB_PATH
+    if url.startswith(("postgres://", "postgresql://")):
+        from scheduler_postgres import PostgresRepository
+
+        return PostgresRepository(url)
+    return SqliteRepository(url[len("sqlite:///"):] if url.startswith("sqlite:///") else url)
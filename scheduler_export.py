@@ -0,0 +1,82 @@
+import csv
+import io
+import tempfile
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from scheduler_core import PollRepository
+
+try:  # optional: Parquet export
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the deployment
+    pa = None
+    pq = None
+
+CHUNK_ROWS = 2000
+
+
+def iter_csv(
+    repo: PollRepository, poll_ids: Optional[Sequence[str]] = None, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Yield UTF-8 CSV in chunks of ``chunk_rows`` rows, header first. ``None`` exports every poll."""
+    columns, chunks = repo.result_chunks(poll_ids, chunk_rows)
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    yield buf.getvalue().encode("utf-8")
+    for rows in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+
+
+def write_parquet(
+    repo: PollRepository, out: BinaryIO, poll_ids: Optional[Sequence[str]] = None, chunk_rows: int = CHUNK_ROWS
+) -> None:
+    """Write results as one Parquet row group per chunk. Requires pyarrow."""
+    if pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    columns, chunks = repo.result_chunks(poll_ids, chunk_rows)
+    types = {"option_id": pa.int64(), "available": pa.int64()}
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in columns])
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in chunks:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+
+def _spilled(write: Callable[[BinaryIO], None]) -> BinaryIO:
+    """Write the export to an anonymous temp file and return it rewound.
+
+    Rows stream to disk chunk by chunk, but ``st.download_button`` reads whatever its deferred
+    callable returns into one ``bytes`` object, so the whole export is held in memory once at
+    download time; the API leaves no way around that. Handing over the file at least avoids a
+    second copy. The file is an unbuffered ``FileIO`` because Streamlit rejects the
+    ``BufferedRandom`` a default temp file is.
+    """
+    out = tempfile.TemporaryFile(buffering=0)
+    write(out)
+    out.seek(0)
+    return out
+
+
+def export_csv(repo: PollRepository, poll_ids: Optional[Sequence[str]] = None) -> BinaryIO:
+    def write(out: BinaryIO) -> None:
+        for chunk in iter_csv(repo, poll_ids):
+            out.write(chunk)
+
+    return _spilled(write)
+
+
+def export_parquet(repo: PollRepository, poll_ids: Optional[Sequence[str]] = None) -> BinaryIO:
+    return _spilled(lambda out: write_parquet(repo, out, poll_ids))
+
+
+# format -> (file extension, mime type, exporter)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, Callable[[PollRepository, Optional[Sequence[str]]], BinaryIO]]] = {
+    "csv": ("csv", "text/csv", export_csv),
+}
+# without pyarrow the app never offers Parquet, so export_parquet is not reachable from the UI
+if pq is not None:
+    EXPORT_FORMATS["parquet"] = ("parquet", "application/vnd.apache.parquet", export_parquet)
@@ -0,0 +1,310 @@
+"""Process-wide counters, gauges and histograms exported in the Prometheus text format.
+
+Set ``SCHEDULER_METRICS_PORT`` to serve ``/metrics`` from a side HTTP listener, and/or
+``SCHEDULER_METRICS_FILE`` to rewrite a ``.prom`` file for node-exporter's textfile
+collector every ``SCHEDULER_METRICS_INTERVAL`` seconds (default 15).
+
+Recording never takes a lock: every value is split into per-thread shards keyed by thread
+ident. A live thread only ever adds to its own shard, and a scrape sums them.
+"""
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import get_ident
+from time import perf_counter, sleep
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TEXTFILE_INTERVAL_SECONDS = 15.0
+
+
+class _Shards:
+    """Float sum split per thread so concurrent adds need neither a lock nor the GIL's luck."""
+
+    __slots__ = ("_by_thread",)
+
+    def __init__(self):
+        self._by_thread: Dict[int, List[float]] = {}
+
+    def add(self, amount: float) -> None:
+        ident = get_ident()
+        shard = self._by_thread.get(ident)
+        if shard is None:
+            # idents are unique among live threads, so a reused one inherits a dead thread's shard
+            shard = self._by_thread.setdefault(ident, [0.0])
+        shard[0] += amount
+
+    def value(self) -> float:
+        return sum(shard[0] for shard in list(self._by_thread.values()))
+
+
+class _CounterChild:
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = _Shards()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value.add(amount)
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        yield f"{name}{labels} {_num(self._value.value())}"
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_fn")
+
+    def __init__(self):
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the value at scrape time instead."""
+        self._fn = fn
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        value = self._value
+        if self._fn is not None:
+            try:
+                value = float(self._fn())
+            except Exception:
+                return  # a failing callback drops the sample rather than the whole scrape
+        yield f"{name}{labels} {_num(value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_buckets", "_sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = tuple(bounds)
+        self._buckets = [_Shards() for _ in range(len(self._bounds) + 1)]  # last one is +Inf
+        self._sum = _Shards()
+
+    def observe(self, value: float) -> None:
+        self._buckets[bisect_left(self._bounds, value)].add(1.0)
+        self._sum.add(value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - t0)
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        cumulative = 0.0
+        inner = labels[1:-1] + "," if labels else ""
+        for bound, bucket in zip(self._bounds + (float("inf"),), self._buckets):
+            cumulative += bucket.value()
+            yield f'{name}_bucket{{{inner}le="{_num(bound)}"}} {_num(cumulative)}'
+        yield f"{name}_sum{labels} {_num(self._sum.value())}"
+        yield f"{name}_count{labels} {_num(cumulative)}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        (registry or REGISTRY).register(self)
+        if not self.labelnames:
+            self.labels()  # export 0 before the first event instead of no series at all
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Child for one label combination, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def expose(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in list(self._children.items()):
+            yield from child.samples(self.name, _labels(self.labelnames, values))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self.labels().set_function(fn)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        """``with histogram.time():`` observes the block's duration in seconds."""
+        return self.labels().time()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()  # registration only, never on the recording path
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+REGISTRY = Registry()
+
+VOTES_SAVED = Counter("scheduler_votes_saved_total", "Saves that changed a voter's answers, comment or password.")
+VOTE_ROWS_CHANGED = Counter("scheduler_vote_rows_changed_total", "Vote rows inserted or flipped by saves.")
+SAVE_SECONDS = Histogram("scheduler_save_votes_seconds", "save_votes latency, write lock wait included.")
+PASSWORD_HASH_SECONDS = Histogram(
+    "scheduler_password_hash_seconds", "PBKDF2 derivations (hashing and checks).", buckets=(0.05, 0.1, 0.2, 0.4, 0.8, 1.6, 3.2)
+)
+DB_LOCK_WAIT_SECONDS = Histogram("scheduler_db_lock_wait_seconds", "Time BEGIN IMMEDIATE waited for the SQLite write lock.")
+DB_LOCKED = Counter("scheduler_db_locked_errors_total", "'database is locked' errors after busy_timeout ran out.")
+ACTIVE_POLLS = Gauge("scheduler_active_polls", "Polls that are not finalized yet.")
+CACHE_LOOKUPS = Counter("scheduler_cache_lookups_total", "Cache lookups by cache.", ("cache",))
+CACHE_MISSES = Counter("scheduler_cache_misses_total", "Cache lookups that had to compute the value.", ("cache",))
+SYNOLOGY_PUSHES = Counter("scheduler_synology_pushes_total", "Synology event pushes by outcome.", ("outcome",))
+SYNOLOGY_RETRIES = Counter("scheduler_synology_retries_total", "Synology requests retried, by reason.", ("reason",))
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache).inc()
+    if not hit:
+        CACHE_MISSES.labels(cache).inc()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # scrapes every few seconds would flood the app log
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", registry: Optional[Registry] = None) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` on a daemon thread and return the server."""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry or REGISTRY})
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_textfile(path: str, registry: Optional[Registry] = None) -> None:
+    """Atomically replace ``path`` so the textfile collector never reads a partial file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write((registry or REGISTRY).render())
+    os.replace(tmp, path)
+
+
+def start_textfile_writer(path: str, interval: float = TEXTFILE_INTERVAL_SECONDS) -> threading.Thread:
+    def loop() -> None:
+        while True:
+            try:
+                write_textfile(path)
+            except OSError:
+                pass  # e.g. the directory is briefly unavailable; try again next round
+            sleep(interval)
+
+    thread = threading.Thread(target=loop, name="metrics-textfile", daemon=True)
+    thread.start()
+    return thread
+
+
+_started: Dict[str, object] = {}
+_start_lock = threading.Lock()
+
+
+def serve_from_env() -> Dict[str, object]:
+    """Start the listener/file writer configured by environment variables, once per process."""
+    with _start_lock:
+        port = os.environ.get("SCHEDULER_METRICS_PORT")
+        if port and "http" not in _started:
+            _started["http"] = start_http_server(int(port), os.environ.get("SCHEDULER_METRICS_ADDR", "0.0.0.0"))
+        path = os.environ.get("SCHEDULER_METRICS_FILE")
+        if path and "textfile" not in _started:
+            interval = float(os.environ.get("SCHEDULER_METRICS_INTERVAL", TEXTFILE_INTERVAL_SECONDS))
+            _started["textfile"] = start_textfile_writer(path, interval)
+        return dict(_started)
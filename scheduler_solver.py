@@ -0,0 +1,142 @@
+"""Pick meeting times from a poll's availability: best single meetings and k-meeting series.
+
+Works on the snapshot's ``AvailabilityMatrix`` columns (one voter bitset per option), so
+"who can attend" for a multi-slot meeting is a bitwise AND over adjacent options and every
+score is a popcount. Thousands of options x hundreds of voters stay in the millisecond range.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from scheduler_core import AvailabilityMatrix, SlotIndex, popcount
+
+
+@dataclass
+class Meeting:
+    positions: List[int]  # consecutive option positions in the poll's SlotIndex
+    option_ids: List[int]
+    start_ts: str
+    end_ts: str
+    label: str
+    attendees: List[str]
+    missing_required: List[str]
+
+
+@dataclass
+class SeriesPlan:
+    meetings: List[Meeting]
+    attendance: Dict[str, int]  # voter -> number of chosen meetings they can attend
+    short: Dict[str, int]  # voter -> meetings still missing to reach the target
+
+
+def meeting_bits(bits: np.ndarray, slots: SlotIndex, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Attendee bitsets of every ``length``-option meeting and the positions it may start at.
+
+    A meeting spans options that follow each other back to back (end == next start).
+    """
+    n = len(slots)
+    if length < 1 or n < length:
+        return np.zeros((0, bits.shape[1]), dtype=np.uint8), np.zeros(0, dtype=np.int64)
+    joined = np.ones(n, dtype=bool)
+    joined[:-1] = slots.ends[:-1] == slots.starts[1:]
+    combined = bits[: n - length + 1].copy()
+    valid = np.ones(n - length + 1, dtype=bool)
+    for step in range(1, length):
+        combined &= bits[step : n - length + 1 + step]
+        valid &= joined[step - 1 : n - length + step]
+    starts = np.flatnonzero(valid)
+    return combined[starts], starts
+
+
+def _meeting(
+    slots: SlotIndex, start: int, length: int, attend: np.ndarray, names: Sequence[str], required: np.ndarray
+) -> Meeting:
+    who = np.unpackbits(attend, count=len(names)).astype(bool)
+    need = np.unpackbits(required, count=len(names)).astype(bool)
+    positions = list(range(start, start + length))
+    first, last = positions[0], positions[-1]
+    return Meeting(
+        positions=positions,
+        option_ids=[slots.option_ids[p] for p in positions],
+        start_ts=slots.start_ts[first],
+        end_ts=slots.end_ts[last],
+        label=f"{slots.labels[first].rsplit(' - ', 1)[0]} - {slots.time_labels[last].rsplit(' - ', 1)[-1]}",
+        attendees=[n for n, ok in zip(names, who) if ok],
+        missing_required=[n for n, ok, req in zip(names, who, need) if req and not ok],
+    )
+
+
+def best_meetings(
+    matrix: AvailabilityMatrix,
+    slots: SlotIndex,
+    length: int = 1,
+    required: Sequence[str] = (),
+    top: int = 5,
+) -> List[Meeting]:
+    """Top meetings of ``length`` back-to-back options.
+
+    Ranked by required participants missing (fewest first), then attendees (most first),
+    then start time.
+    """
+    names = matrix.voters
+    req = matrix.mask(required)
+    attend, starts = meeting_bits(matrix.columns, slots, length)
+    if not len(starts):
+        return []
+    missing = popcount(req & ~attend)
+    count = popcount(attend)
+    order = np.lexsort((starts, -count, missing))[:top]
+    return [_meeting(slots, int(starts[i]), length, attend[i], names, req) for i in order]
+
+
+def plan_series(
+    matrix: AvailabilityMatrix,
+    slots: SlotIndex,
+    meetings: int,
+    min_attend: int = 1,
+    length: int = 1,
+    required: Sequence[str] = (),
+    min_gap_days: int = 0,
+) -> SeriesPlan:
+    """Choose ``meetings`` meetings so every voter can attend at least ``min_attend`` of them.
+
+    Greedy set multi-cover: each round takes the candidate that helps the most voters still
+    short of the target (ties: more attendees, then earlier). Candidates must include every
+    ``required`` voter, must not overlap chosen ones, and start at least ``min_gap_days``
+    calendar days after any chosen meeting's day.
+    """
+    names = matrix.voters
+    req = matrix.mask(required)
+    attend, starts = meeting_bits(matrix.columns, slots, length)
+    keep = popcount(req & ~attend) == 0
+    attend, starts = attend[keep], starts[keep]
+    days = slots.starts[starts].astype("datetime64[D]").astype(np.int64) if len(starts) else np.zeros(0, np.int64)
+    begin, finish = slots.start_min[starts], slots.end_min[starts + length - 1]
+    counts = popcount(attend)
+    need = np.full(len(names), min_attend, dtype=np.int64)
+    open_ = np.ones(len(starts), dtype=bool)
+    chosen: List[Meeting] = []
+    attendance = np.zeros(len(names), dtype=np.int64)
+    while len(chosen) < meetings and open_.any():
+        short = np.packbits(need > 0)
+        gain = np.where(open_, popcount(attend & short), -1)
+        best = int(np.lexsort((starts, -counts, -gain))[0])
+        if not open_[best]:
+            break
+        meeting = _meeting(slots, int(starts[best]), length, attend[best], names, req)
+        chosen.append(meeting)
+        who = np.unpackbits(attend[best], count=len(names)).astype(np.int64)
+        attendance += who
+        need = np.maximum(need - who, 0)
+        # no overlap in time with the chosen meeting (options may overlap each other), and keep
+        # the requested spacing between days
+        open_ &= (finish <= begin[best]) | (begin >= finish[best])
+        if min_gap_days > 0:
+            open_ &= np.abs(days - days[best]) >= min_gap_days
+    chosen.sort(key=lambda m: m.positions[0])
+    return SeriesPlan(
+        meetings=chosen,
+        attendance={n: int(a) for n, a in zip(names, attendance)},
+        short={n: int(s) for n, s in zip(names, need) if s > 0},
+    )
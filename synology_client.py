@@ -1,16 +1,47 @@
 import json
-from datetime import datetime
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from zoneinfo import ZoneInfo
+
+from scheduler_metrics import SYNOLOGY_PUSHES, SYNOLOGY_RETRIES
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 10)  # (connect, read) seconds
+SID_TTL_SECONDS = 20 * 60
+RETRIES = 3
+BACKOFF_SECONDS = 0.5
+RETRY_STATUS = {502, 503, 504}
+# SYNO.API error codes meaning the sid is no longer valid
+SESSION_ERRORS = {105, 106, 107, 119}
+DISCOVER_PARAMS = {"api": "SYNO.API.Info", "version": 1, "method": "query", "query": "SYNO.API.Auth,SYNO.Cal.Event"}
+
+# pushes run here so a slow NAS never blocks a Streamlit script thread
+_PUSH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="synology")
 
 
 class SynologyError(Exception):
-    pass
+    @property
+    def code(self) -> Optional[int]:
+        data = self.args[0] if self.args else None
+        if isinstance(data, dict):
+            return (data.get("error") or {}).get("code")
+        return None
 
 
-def _request_json(method: str, url: str, **kwargs) -> dict:
-    resp = requests.request(method, url, timeout=10, **kwargs)
+def _request_json(
+    method: str,
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: Union[float, Tuple[float, float]] = 10,
+    **kwargs,
+) -> dict:
+    resp = (session or requests).request(method, url, timeout=timeout, **kwargs)
     resp.raise_for_status()
     data = resp.json()
     if not data.get("success", False):
@@ -18,36 +49,80 @@ def _request_json(method: str, url: str, **kwargs) -> dict:
     return data
 
 
-def discover_endpoints(base_url: str) -> Dict[str, dict]:
+def _never_sent(exc: requests.ConnectionError) -> bool:
+    """True when no connection was made, so the NAS cannot have seen the request.
+
+    Other connection errors (``Connection aborted``, ``RemoteDisconnected``) can happen after
+    the body went out.
+    """
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = exc.args[0] if exc.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)  # urllib3 MaxRetryError wraps it
+
+
+def _login_form(account: str, password: str) -> dict:
+    return {
+        "api": "SYNO.API.Auth",
+        "method": "login",
+        "version": 3,
+        "account": account,
+        "passwd": password,
+        "session": "Calendar",
+        "format": "sid",
+    }
+
+
+def _utc_time(dt: datetime, timezone: str) -> str:
+    """Naive ``dt`` is wall-clock in ``timezone``; repeated DST times resolve to standard time."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(timezone), fold=1)
+    return dt.astimezone(dt_timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _event_form(
+    sid: str,
+    calendar_id: str,
+    title: str,
+    description: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    event_id: Optional[str] = None,
+    timezone: str = "UTC",
+) -> dict:
+    """Form for ``create``, or for ``set`` (update in place) when ``event_id`` is given.
+
+    Naive times are read as wall-clock in ``timezone`` and sent as UTC.
+    """
+    event_payload = {
+        "summary": title,
+        "description": description,
+        "start": {"time": _utc_time(start_dt, timezone), "tz": "UTC"},
+        "end": {"time": _utc_time(end_dt, timezone), "tz": "UTC"},
+        "all_day": False,
+    }
+    form = {
+        "api": "SYNO.Cal.Event",
+        "method": "create" if event_id is None else "set",
+        "version": 3,
+        "calendar_id": calendar_id,
+        "event": json.dumps(event_payload),
+        "_sid": sid,
+    }
+    if event_id is not None:
+        form["evt_id"] = event_id
+    return form
+
+
+def discover_endpoints(base_url: str, session: Optional[requests.Session] = None) -> Dict[str, dict]:
     info_url = f"{base_url}/webapi/query.cgi"
-    data = _request_json(
-        "GET",
-        info_url,
-        params={
-            "api": "SYNO.API.Info",
-            "version": 1,
-            "method": "query",
-            "query": "SYNO.API.Auth,SYNO.Cal.Event",
-        },
-    )
+    data = _request_json("GET", info_url, session, params=DISCOVER_PARAMS)
     return data.get("data", {})
 
 
-def login(base_url: str, account: str, password: str, auth_path: str) -> str:
+def login(base_url: str, account: str, password: str, auth_path: str, session: Optional[requests.Session] = None) -> str:
     auth_url = f"{base_url}{auth_path}"
-    data = _request_json(
-        "POST",
-        auth_url,
-        data={
-            "api": "SYNO.API.Auth",
-            "method": "login",
-            "version": 3,
-            "account": account,
-            "passwd": password,
-            "session": "Calendar",
-            "format": "sid",
-        },
-    )
+    data = _request_json("POST", auth_url, session, data=_login_form(account, password))
     return data["data"]["sid"]
 
 
@@ -60,27 +135,183 @@ def create_event(
     description: str,
     start_dt: datetime,
     end_dt: datetime,
+    session: Optional[requests.Session] = None,
+    timezone: str = "UTC",
 ) -> dict:
     url = f"{base_url}{event_path}"
-    event_payload = {
-        "summary": title,
-        "description": description,
-        "start": {"time": start_dt.isoformat(), "tz": "UTC"},
-        "end": {"time": end_dt.isoformat(), "tz": "UTC"},
-        "all_day": False,
-    }
-    return _request_json(
-        "POST",
-        url,
-        data={
-            "api": "SYNO.Cal.Event",
-            "method": "create",
-            "version": 3,
-            "calendar_id": calendar_id,
-            "event": json.dumps(event_payload),
-            "_sid": sid,
-        },
-    )
+    form = _event_form(sid, calendar_id, title, description, start_dt, end_dt, timezone=timezone)
+    return _request_json("POST", url, session, data=form)
+
+
+class PushJob:
+    """Handle for a background push; the UI polls ``status`` on each rerun."""
+
+    def __init__(self, future: Future):
+        self.future = future
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return "running"
+        return "failed" if self.future.exception() is not None else "done"
+
+    @property
+    def result(self) -> Any:
+        return self.future.result() if self.status == "done" else None
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self.future.exception() if self.future.done() else None
+
+
+def run_in_background(fn: Callable[..., Any], *args: Any) -> PushJob:
+    """Submit ``fn(*args)`` to the shared push pool."""
+    return PushJob(_PUSH_POOL.submit(fn, *args))
+
+
+class SynologyClient:
+    """Synology Calendar over one pooled ``requests.Session``.
+
+    Endpoint discovery is done once and the login sid is reused until ``sid_ttl`` passes or
+    the NAS reports it invalid. Transient failures (connection errors, 502/503/504) are
+    retried with exponential backoff. A ``create`` is only retried when the connection was
+    never made, since after a read timeout or a dropped connection the event may already exist.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        account: str,
+        password: str,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+        sid_ttl: float = SID_TTL_SECONDS,
+        session: Optional[requests.Session] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.account = account
+        self._password = password
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.sid_ttl = sid_ttl
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._endpoints: Optional[Dict[str, dict]] = None
+        self._sid: Optional[str] = None
+        self._sid_expires = 0.0
+
+    def _call(self, method: str, path: str, idempotent: bool = True, **kwargs) -> dict:
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                return _request_json(method, url, self.session, self.timeout, **kwargs)
+            except requests.ConnectionError as exc:
+                if last or not (idempotent or _never_sent(exc)):
+                    raise
+                reason = "connection"
+            except requests.Timeout:  # read timeout: the request may have been applied
+                if last or not idempotent:
+                    raise
+                reason = "timeout"
+            except requests.HTTPError as exc:
+                if last or exc.response is None or exc.response.status_code not in RETRY_STATUS:
+                    raise
+                reason = f"http_{exc.response.status_code}"
+            SYNOLOGY_RETRIES.labels(reason).inc()
+            time.sleep(self.backoff * 2 ** attempt)
+        raise AssertionError("unreachable")
+
+    def endpoints(self) -> Dict[str, dict]:
+        with self._lock:
+            if self._endpoints is None:
+                self._endpoints = self._call("GET", "/webapi/query.cgi", params=DISCOVER_PARAMS).get("data", {})
+            return self._endpoints
+
+    def _path(self, api: str, default: str) -> str:
+        """Discovery reports paths relative to /webapi/ (e.g. ``entry.cgi``)."""
+        path = self.endpoints().get(api, {}).get("path", default)
+        return path if path.startswith("/") else f"/webapi/{path}"
+
+    def sid(self) -> str:
+        """Cached login sid, renewed after ``sid_ttl`` seconds."""
+        auth_path = self._path("SYNO.API.Auth", "auth.cgi")
+        with self._lock:
+            if self._sid is None or time.monotonic() >= self._sid_expires:
+                data = self._call("POST", auth_path, data=_login_form(self.account, self._password))
+                self._sid = data["data"]["sid"]
+                self._sid_expires = time.monotonic() + self.sid_ttl
+            return self._sid
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._sid = None
+
+    def create_event(
+        self,
+        calendar_id: str,
+        title: str,
+        description: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        event_id: Optional[str] = None,
+        timezone: str = "UTC",
+    ) -> dict:
+        """Create an event, or overwrite ``event_id`` in place; naive times are wall-clock in ``timezone``."""
+        try:
+            response = self._push(calendar_id, title, description, start_dt, end_dt, event_id, timezone)
+        except Exception:
+            SYNOLOGY_PUSHES.labels("failed").inc()
+            raise
+        SYNOLOGY_PUSHES.labels("created" if event_id is None else "updated").inc()
+        return response
+
+    def _push(
+        self,
+        calendar_id: str,
+        title: str,
+        description: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        event_id: Optional[str],
+        timezone: str,
+    ) -> dict:
+        event_path = self._path("SYNO.Cal.Event", "entry.cgi")
+        for attempt in range(2):
+            sid = self.sid()
+            try:
+                form = _event_form(sid, calendar_id, title, description, start_dt, end_dt, event_id, timezone)
+                # an update can be replayed safely, a create cannot
+                return self._call("POST", event_path, idempotent=event_id is not None, data=form)
+            except SynologyError as exc:
+                # expired or kicked-out session: log in again once
+                if attempt or exc.code not in SESSION_ERRORS:
+                    raise
+                SYNOLOGY_RETRIES.labels("session").inc()
+                self.invalidate()
+        raise AssertionError("unreachable")
+
+    def push_event(
+        self,
+        calendar_id: str,
+        title: str,
+        description: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        timezone: str = "UTC",
+    ) -> PushJob:
+        """Run :meth:`create_event` on the background pool and return immediately."""
+        return run_in_background(
+            self.create_event, calendar_id, title, description, start_dt, end_dt, None, timezone
+        )
+
+    def close(self) -> None:
+        self.session.close()
 
 
 def push_synology_event(
@@ -92,12 +323,11 @@ def push_synology_event(
     description: str,
     start_dt: datetime,
     end_dt: datetime,
+    timezone: str = "UTC",
 ) -> Optional[dict]:
     """High-level helper to create an event on Synology Calendar via REST."""
-    endpoints = discover_endpoints(base_url)
-    auth_info = endpoints.get("SYNO.API.Auth", {})
-    event_info = endpoints.get("SYNO.Cal.Event", {})
-    auth_path = auth_info.get("path", "/webapi/auth.cgi")
-    event_path = event_info.get("path", "/webapi/entry.cgi")
-    sid = login(base_url, username, password, auth_path)
-    return create_event(base_url, sid, event_path, calendar_id, title, description, start_dt, end_dt)
+    client = SynologyClient(base_url, username, password)
+    try:
+        return client.create_event(calendar_id, title, description, start_dt, end_dt, timezone=timezone)
+    finally:
+        client.close()
@@ -0,0 +1,56 @@
+import os
+from datetime import date, time
+
+import pytest
+
+from scheduler_core import SqliteRepository, generate_slot_arrays
+
+FIRST_DAY = date(2030, 3, 4)  # a Monday, far enough ahead that nothing is archived
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SqliteRepository(str(tmp_path / "scheduler.db"))
+    yield repo
+    repo.close()
+
+
+def make_poll(
+    repo,
+    poll_id="p1",
+    days=2,
+    start_t=time(9, 0),
+    end_t=time(12, 0),
+    slot_minutes=60,
+    timezone="Asia/Seoul",
+    title=None,
+):
+    """Create a poll over ``days`` consecutive days and return its snapshot."""
+    last_day = date.fromordinal(FIRST_DAY.toordinal() + days - 1)
+    slots = generate_slot_arrays(FIRST_DAY, last_day, start_t, end_t, slot_minutes)
+    repo.create_poll(
+        poll_id, title or poll_id, "", FIRST_DAY, last_day, start_t, end_t,
+        slot_minutes, None, slots, timezone=timezone,
+    )
+    return repo.load_poll_snapshot(poll_id)
+
+
+POSTGRES_URL = os.environ.get("SCHEDULER_TEST_POSTGRES_URL")
+POSTGRES_TABLES = "polls, options, voters, votes, poll_revisions, option_tallies, calendar_sync"
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def any_repo(request, tmp_path):
+    """Each :class:`PollRepository` backend; PostgreSQL only when ``$SCHEDULER_TEST_POSTGRES_URL`` is set."""
+    if request.param == "sqlite":
+        repo = SqliteRepository(str(tmp_path / "scheduler.db"))
+    else:
+        if not POSTGRES_URL:
+            pytest.skip("set SCHEDULER_TEST_POSTGRES_URL to test the PostgreSQL backend")
+        from scheduler_postgres import PostgresRepository
+
+        repo = PostgresRepository(POSTGRES_URL)
+        with repo.pool.connection() as conn:
+            conn.execute(f"TRUNCATE {POSTGRES_TABLES}")
+    yield repo
+    repo.close()
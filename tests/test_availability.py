@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from scheduler_core import AvailabilityMatrix, PollTally, SlotIndex, to_epoch_minutes
+
+VOTERS = [f"v{i:02d}" for i in range(13)]  # not a multiple of 8: the last byte is padded
+
+
+def slot_index(n, timezone="Asia/Seoul"):
+    starts = pd.date_range("2030-03-04 09:00", periods=n, freq="30min")
+    ends = starts + pd.Timedelta(minutes=30)
+    iso = lambda ts: ts.strftime("%Y-%m-%dT%H:%M:%S").tolist()  # noqa: E731
+    options = pd.DataFrame(
+        {
+            "option_id": np.arange(100, 100 + n),
+            "start_ts": iso(starts),
+            "end_ts": iso(ends),
+            "start_min": to_epoch_minutes(starts, timezone),
+            "end_min": to_epoch_minutes(ends, timezone),
+        }
+    )
+    return SlotIndex.from_options(options, timezone)
+
+
+def random_votes(slots, seed=7):
+    rng = np.random.default_rng(seed)
+    grid = pd.MultiIndex.from_product([VOTERS, slots.option_ids], names=["voter_name", "option_id"])
+    votes = grid.to_frame(index=False)
+    votes["available"] = (rng.random(len(votes)) < 0.4).astype(int)
+    return votes
+
+
+def test_bit_order_and_padding():
+    dense = np.zeros((len(VOTERS), 11), dtype=bool)
+    dense[0, 0] = dense[12, 10] = dense[8, 3] = True
+    matrix = AvailabilityMatrix.from_dense(VOTERS, list(range(11)), dense)
+    assert matrix.rows.shape == (13, 2) and matrix.columns.shape == (11, 2)
+    # most significant bit first: position 0 is 0x80 of byte 0
+    assert matrix.rows[0].tolist() == [0x80, 0] and matrix.rows[12].tolist() == [0, 0x20]
+    assert matrix.columns[3].tolist() == [0, 0x80] and matrix.columns[10].tolist() == [0, 0x08]
+    assert matrix.counts().tolist() == [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+    assert matrix.choices("v12") == [10] and matrix.choices("nobody") == []
+    assert matrix.mask().tolist() == [0xFF, 0xF8]  # padding bits stay clear
+
+
+def test_mask_ignores_unknown_names():
+    matrix = AvailabilityMatrix.from_dense(VOTERS, [1], np.ones((len(VOTERS), 1)))
+    assert matrix.mask(["v01", "ghost", "v09"]).tolist() == [0x40, 0x40]
+    assert matrix.mask(["ghost"]).tolist() == [0, 0]
+    assert matrix.counts(["ghost"]).tolist() == [0]
+    assert matrix.free_at([1], ["v01", "ghost"]) == ["v01"]
+
+
+def test_matches_dataframe_tally_on_random_poll():
+    slots = slot_index(11)
+    votes = random_votes(slots)
+    matrix = AvailabilityMatrix.from_votes(votes, slots, voters=VOTERS)
+    subset = VOTERS[2:9] + ["ghost"]
+    for names, frame in [(None, votes), (subset, votes[votes["voter_name"].isin(subset)])]:
+        expected, actual = PollTally.from_votes(frame), matrix.tally(names)
+        assert actual.counts == expected.counts
+        assert actual.total_voters == expected.total_voters
+        assert {k: sorted(v) for k, v in actual.voters.items()} == {k: sorted(v) for k, v in expected.voters.items()}
+    for name in ("v00", "v12"):
+        mine = votes[(votes["voter_name"] == name) & (votes["available"] == 1)]["option_id"].tolist()
+        assert matrix.choices(name) == mine
+
+
+def test_from_votes_drops_unknown_options_and_keeps_silent_voters():
+    slots = slot_index(3)
+    votes = pd.DataFrame({"voter_name": ["a", "a", "b"], "option_id": [100, 999, 102]})
+    matrix = AvailabilityMatrix.from_votes(votes, slots, voters=["a", "b", "c"])
+    assert matrix.voters == ["a", "b", "c"]
+    assert [matrix.choices(n) for n in matrix.voters] == [[100], [102], []]
+    assert matrix.free_at([100, 999]) == []
@@ -0,0 +1,106 @@
+import threading
+
+from scheduler_calendar_sync import sync_finalized_polls
+from tests.conftest import make_poll
+
+
+class FakeClient:
+    """Stands in for :class:`SynologyClient`; records every create/set call."""
+
+    def __init__(self, fail=(), no_id=()):
+        self.fail = set(fail)
+        self.no_id = set(no_id)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def sid(self):
+        return "sid"
+
+    def create_event(self, calendar_id, title, description, start_dt, end_dt, event_id=None, timezone="UTC"):
+        with self._lock:
+            self.calls.append((title, start_dt, end_dt, timezone, event_id))
+            if title in self.fail:
+                raise RuntimeError("NAS said no")
+            if title in self.no_id:
+                return {"success": True, "data": {}}
+            return {"success": True, "data": {"evt_id": event_id or f"ev{len(self.calls)}"}}
+
+
+def finalized_polls(repo, *poll_ids, timezone="Asia/Seoul"):
+    for poll_id in poll_ids:
+        make_poll(repo, poll_id, timezone=timezone)
+        repo.finalize_poll(poll_id, "2030-03-04T10:00:00", "2030-03-04T11:00:00")
+
+
+def test_second_sync_pushes_nothing(any_repo):
+    finalized_polls(any_repo, "p1", "p2")
+    make_poll(any_repo, "open")  # not finalized, never pushed
+    client = FakeClient()
+
+    report = sync_finalized_polls(any_repo, client, "cal")
+    assert sorted(report.created) == ["p1", "p2"] and report.unchanged == 0
+    assert [event_id for *_, event_id in client.calls] == [None, None]
+
+    report = sync_finalized_polls(any_repo, client, "cal")
+    assert len(client.calls) == 2
+    assert report.created == report.updated == [] and report.unchanged == 2
+
+
+def test_changed_final_time_updates_existing_event(any_repo):
+    finalized_polls(any_repo, "p1", "p2")
+    client = FakeClient()
+    sync_finalized_polls(any_repo, client, "cal")
+    event_id = any_repo.load_calendar_sync("cal")["p1"][0]
+
+    any_repo.finalize_poll("p1", "2030-03-05T09:00:00", "2030-03-05T10:00:00")
+    report = sync_finalized_polls(any_repo, client, "cal")
+    assert report.updated == ["p1"] and report.created == [] and report.unchanged == 1
+    assert len(client.calls) == 3
+    assert client.calls[-1][-1] == event_id  # a set on the same event, not a second create
+
+    sync_finalized_polls(any_repo, client, "cal")
+    assert len(client.calls) == 3
+
+
+def test_failed_push_is_retried_next_run(any_repo):
+    finalized_polls(any_repo, "p1", "p2")
+    report = sync_finalized_polls(any_repo, FakeClient(fail={"p1"}), "cal")
+    assert report.created == ["p2"] and list(report.failed) == ["p1"]
+    assert set(any_repo.load_calendar_sync("cal")) == {"p2"}
+
+    client = FakeClient()
+    report = sync_finalized_polls(any_repo, client, "cal")
+    assert report.created == ["p1"] and report.unchanged == 1
+    assert len(client.calls) == 1
+
+
+def test_create_without_event_id_is_not_recorded(any_repo):
+    finalized_polls(any_repo, "p1", "p2")
+    report = sync_finalized_polls(any_repo, FakeClient(no_id={"p1"}), "cal")
+    assert report.created == ["p2"] and list(report.failed) == ["p1"]
+    assert set(any_repo.load_calendar_sync("cal")) == {"p2"}
+
+    report = sync_finalized_polls(any_repo, FakeClient(), "cal")
+    assert report.created == ["p1"]
+    assert any_repo.load_calendar_sync("cal")["p1"][0] == "ev1"
+
+
+def test_update_keeps_event_id_when_response_has_none(any_repo):
+    finalized_polls(any_repo, "p1")
+    sync_finalized_polls(any_repo, FakeClient(), "cal")
+    any_repo.finalize_poll("p1", "2030-03-05T09:00:00", "2030-03-05T10:00:00")
+    report = sync_finalized_polls(any_repo, FakeClient(no_id={"p1"}), "cal")
+    assert report.updated == ["p1"] and report.failed == {}
+    assert any_repo.load_calendar_sync("cal")["p1"][0] == "ev1"
+
+
+def test_pushes_wall_clock_times_with_the_poll_timezone(any_repo):
+    finalized_polls(any_repo, "p1", timezone="America/New_York")
+    client = FakeClient()
+    sync_finalized_polls(any_repo, client, "cal")
+    [(_, start, end, timezone, _)] = client.calls
+    assert (start.isoformat(), end.isoformat(), timezone) == (
+        "2030-03-04T10:00:00",
+        "2030-03-04T11:00:00",
+        "America/New_York",
+    )
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import numpy as np
+
+from scheduler_conflicts import IntervalIndex
+from scheduler_core import SqliteRepository, to_epoch_minutes
+from tests.conftest import make_poll
+
+
+def test_owners_overlapping_matches_brute_force():
+    rng = np.random.default_rng(3)
+    index = IntervalIndex()
+    intervals = []
+    for owner in range(30):
+        starts = rng.integers(0, 5_000, size=rng.integers(1, 20))
+        ends = starts + rng.integers(1, 240, size=len(starts))
+        index.add(owner, starts, ends)
+        intervals += [(owner, s, e) for s, e in zip(starts, ends)]
+    index.remove(7)
+    intervals = [iv for iv in intervals if iv[0] != 7]
+
+    q_starts = rng.integers(-100, 5_300, size=500)
+    q_ends = q_starts + rng.integers(1, 120, size=500)
+    found = index.owners_overlapping(q_starts, q_ends)
+    assert len(found) == 500
+    for qs, qe, owners in zip(q_starts, q_ends, found):
+        expected = sorted({o for o, s, e in intervals if s < qe and e > qs})
+        assert owners.tolist() == expected
+
+
+def test_owners_overlapping_empty():
+    index = IntervalIndex()
+    assert index.owners_overlapping([], []) == []
+    assert [a.tolist() for a in index.owners_overlapping([1, 5], [2, 6])] == [[], []]
+
+
+def minutes(*wall):
+    return to_epoch_minutes(list(wall), "Asia/Seoul").tolist()
+
+
+def test_conflict_index_finals_and_candidates(any_repo):
+    make_poll(any_repo, "decided", days=1, title="Decided")
+    any_repo.finalize_poll("decided", "2030-03-04T10:00:00", "2030-03-04T12:00:00")
+    make_poll(any_repo, "open", days=1, title="Open")  # 09-10, 10-11, 11-12 candidates
+
+    starts = minutes("2030-03-04T08:00", "2030-03-04T11:30", "2030-03-05T10:00")
+    ends = minutes("2030-03-04T09:00", "2030-03-04T12:30", "2030-03-05T11:00")
+    index = any_repo.conflict_index(max(ends))
+    clashes = index.conflicts(starts, ends)
+    assert [(c.finals, c.candidates) for c in clashes] == [
+        ([], []),
+        (["decided"], ["open"]),
+        ([], []),
+    ]
+    assert index.describe(["decided", "open"]) == "Decided, Open"
+    # the poll being edited never clashes with itself
+    assert index.conflicts(starts, ends, exclude="open")[1].candidates == []
+
+    # writes through the repository update the cached index in place
+    any_repo.finalize_poll("open", "2030-03-04T09:00:00", "2030-03-04T10:00:00")
+    assert any_repo.conflict_index(max(ends)) is index
+    assert index.conflicts(starts, ends)[1] == (["decided"], [])
+
+
+def test_conflict_index_widens_for_later_slots(any_repo):
+    make_poll(any_repo, "later", days=1)
+    any_repo.finalize_poll("later", "2030-03-04T09:00:00", "2030-03-04T10:00:00")
+    start, end = minutes("2030-03-04T09:30", "2030-03-04T10:30")
+
+    near = any_repo.conflict_index(0)  # the default window, well short of 2030
+    assert not near.covers(end)
+    assert near.conflicts([start], [end])[0].finals == []
+
+    wide = any_repo.conflict_index(end)
+    assert wide is not near and wide.covers(end)
+    assert wide.conflicts([start], [end])[0].finals == ["later"]
+    assert any_repo.conflict_index(0) is wide
+
+
+def test_write_during_build_reaches_the_new_index(any_repo, monkeypatch):
+    make_poll(any_repo, "p1", days=1)
+    start, end = minutes("2030-03-04T09:30", "2030-03-04T10:30")
+    queried, resume = threading.Event(), threading.Event()
+    load = any_repo.load_conflict_window
+
+    def slow_load(*window):
+        rows = load(*window)  # read before the finalize below commits
+        queried.set()
+        resume.wait(5)
+        return rows
+
+    monkeypatch.setattr(any_repo, "load_conflict_window", slow_load)
+    built = []
+    builder = threading.Thread(target=lambda: built.append(any_repo.conflict_index(end)))
+    builder.start()
+    assert queried.wait(5)
+    writer = threading.Thread(
+        target=any_repo.finalize_poll, args=("p1", "2030-03-04T09:00:00", "2030-03-04T10:00:00")
+    )
+    writer.start()
+    time.sleep(0.2)  # committed, now waiting for the index lock
+    assert writer.is_alive()
+    resume.set()
+    builder.join(5)
+    writer.join(5)
+    assert built[0].conflicts([start], [end])[0].finals == ["p1"]
+
+
+def test_repositories_do_not_share_the_index_lock(tmp_path):
+    first, second = SqliteRepository(str(tmp_path / "a.db")), SqliteRepository(str(tmp_path / "b.db"))
+    try:
+        assert first._conflicts_lock is not second._conflicts_lock
+        with first._conflicts_lock:
+            assert second.conflict_index(0) is not None
+    finally:
+        first.close()
+        second.close()
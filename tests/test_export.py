@@ -0,0 +1,62 @@
+import csv
+import importlib
+import io
+import sys
+
+import pytest
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+from scheduler_export import EXPORT_FORMATS, export_csv
+from tests.conftest import make_poll
+
+
+@pytest.fixture
+def voted_repo(any_repo):
+    for poll_id in ("p1", "p2"):
+        snapshot = make_poll(any_repo, poll_id)
+        option_ids = snapshot.options["option_id"].tolist()
+        any_repo.save_votes(poll_id, "alice", option_ids, option_ids[:2])
+        any_repo.save_votes(poll_id, "bob", option_ids, option_ids[1:3])
+    return any_repo
+
+
+@pytest.mark.parametrize("export_format", sorted(EXPORT_FORMATS))
+def test_exporter_output_is_accepted_by_deferred_download(voted_repo, export_format):
+    # the app hands st.download_button ``data=lambda: exporter(...)``; streamlit runs it on click
+    extension, mime, exporter = EXPORT_FORMATS[export_format]
+    manager = MediaFileManager(MemoryMediaFileStorage("/media"))
+    file_id = manager.add_deferred(
+        lambda: exporter(voted_repo, ["p1"]), mime, "coords", f"p1_results.{extension}"
+    )
+    url = manager.execute_deferred(file_id)
+    assert url.startswith("/media/")
+
+
+def test_csv_export_single_and_all_polls(voted_repo):
+    rows = list(csv.reader(io.StringIO(export_csv(voted_repo, ["p1"]).read().decode("utf-8"))))
+    assert rows[0] == ["voter_name", "option_id", "available", "start_ts", "end_ts"]
+    assert len(rows) == 1 + 2 * 6  # two voters over 2 days x 3 slots
+
+    rows = list(csv.reader(io.StringIO(export_csv(voted_repo).read().decode("utf-8"))))
+    assert rows[0][0] == "poll_id"
+    assert {row[0] for row in rows[1:]} == {"p1", "p2"}
+
+
+def test_parquet_round_trip(voted_repo):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(EXPORT_FORMATS["parquet"][2](voted_repo, ["p1"]))
+    assert table.column_names == ["voter_name", "option_id", "available", "start_ts", "end_ts"]
+    assert table.num_rows == 12
+
+
+def test_parquet_is_not_offered_without_pyarrow(monkeypatch):
+    import scheduler_export
+
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    try:
+        assert list(importlib.reload(scheduler_export).EXPORT_FORMATS) == ["csv"]
+    finally:
+        monkeypatch.undo()
+        importlib.reload(scheduler_export)
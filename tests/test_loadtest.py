@@ -0,0 +1,15 @@
+import argparse
+
+from benchmarks import loadtest
+
+
+def test_run_saves_every_guest_without_lock_errors(tmp_path):
+    args = argparse.Namespace(
+        voters=8, rounds=2, toggles=2, spread=0.05, slots=12, existing_voters=3,
+        conn="pool", with_password=True, db=None, out=None,
+    )
+    report = loadtest.run(args, str(tmp_path))
+    assert report["guests_saved"] == args.voters
+    assert report["locked_errors"] == 0
+    assert report["errors"] == {}
+    assert report["latency"]["save_votes"]["count"] == args.voters * args.rounds
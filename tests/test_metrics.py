@@ -0,0 +1,85 @@
+import threading
+
+from scheduler_metrics import Counter, Gauge, Histogram, Registry, _num
+
+
+def test_render_text_format():
+    registry = Registry()
+    saves = Counter("t_saves_total", "Saves.", registry=registry)
+    pushes = Counter("t_pushes_total", "Pushes by outcome.", ("outcome",), registry=registry)
+    saves.inc()
+    saves.inc(2)
+    pushes.labels("ok").inc()
+    pushes.labels('say "no"\n').inc()
+    assert registry.render() == (
+        "# HELP t_saves_total Saves.\n"
+        "# TYPE t_saves_total counter\n"
+        "t_saves_total 3\n"
+        "# HELP t_pushes_total Pushes by outcome.\n"
+        "# TYPE t_pushes_total counter\n"
+        't_pushes_total{outcome="ok"} 1\n'
+        't_pushes_total{outcome="say \\"no\\"\\n"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative_with_inf():
+    registry = Registry()
+    latency = Histogram("t_seconds", "Latency.", ("op",), buckets=(0.5, 0.1), registry=registry)
+    for value in (0.1, 0.2, 0.5, 7):
+        latency.labels("save").observe(value)
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        't_seconds_bucket{op="save",le="0.1"} 1',  # bounds are inclusive
+        't_seconds_bucket{op="save",le="0.5"} 3',
+        't_seconds_bucket{op="save",le="+Inf"} 4',
+        't_seconds_sum{op="save"} 7.8',
+        't_seconds_count{op="save"} 4',
+    ]
+
+
+def test_unlabelled_metrics_export_zero_and_failing_gauges_drop_out():
+    registry = Registry()
+    Histogram("t_idle_seconds", "Idle.", buckets=(1,), registry=registry)
+    Gauge("t_broken", "Broken.", registry=registry).set_function(lambda: 1 / 0)
+    Gauge("t_polls", "Polls.", registry=registry).set_function(lambda: 4)
+    assert registry.render().splitlines() == [
+        "# HELP t_idle_seconds Idle.",
+        "# TYPE t_idle_seconds histogram",
+        't_idle_seconds_bucket{le="1"} 0',
+        't_idle_seconds_bucket{le="+Inf"} 0',
+        "t_idle_seconds_sum 0",
+        "t_idle_seconds_count 0",
+        "# HELP t_broken Broken.",
+        "# TYPE t_broken gauge",
+        "# HELP t_polls Polls.",
+        "# TYPE t_polls gauge",
+        "t_polls 4",
+    ]
+
+
+def test_per_thread_shards_sum_on_scrape():
+    registry = Registry()
+    counter = Counter("t_hits_total", "Hits.", registry=registry)
+    latency = Histogram("t_lat_seconds", "Latency.", buckets=(1,), registry=registry)
+    start = threading.Barrier(8)
+
+    def work():
+        start.wait()
+        for _ in range(5000):
+            counter.inc()
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc()  # the main thread's own shard
+    rendered = registry.render()
+    assert "t_hits_total 40001\n" in rendered
+    assert 't_lat_seconds_bucket{le="1"} 40000\n' in rendered
+    assert "t_lat_seconds_sum 20000\n" in rendered
+
+
+def test_num_formatting():
+    assert [_num(v) for v in (0, 3, 2.0, 0.25, 1e-05, float("inf"))] == ["0", "3", "2", "0.25", "1e-05", "+Inf"]
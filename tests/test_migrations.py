@@ -0,0 +1,50 @@
+import sqlite3
+
+import pandas as pd
+
+from scheduler_core import SCHEMA_VERSION, get_conn, schema_version, to_epoch_minutes
+
+LEGACY_SCHEMA = """
+CREATE TABLE polls(
+    poll_id TEXT PRIMARY KEY, title TEXT, description TEXT, start_date TEXT, end_date TEXT,
+    start_time TEXT, end_time TEXT, slot_minutes INTEGER, created_at TEXT
+);
+CREATE TABLE options(option_id INTEGER PRIMARY KEY AUTOINCREMENT, poll_id TEXT, start_ts TEXT, end_ts TEXT);
+CREATE TABLE votes(
+    vote_id INTEGER PRIMARY KEY AUTOINCREMENT, poll_id TEXT, voter_name TEXT, option_id INTEGER,
+    available INTEGER, comment TEXT, UNIQUE(poll_id, voter_name, option_id)
+);
+INSERT INTO polls VALUES ('old', 'Old poll', 'kept', '2024-05-02', '2024-05-02', '09:00:00', '11:00:00', 60, NULL);
+INSERT INTO options(poll_id, start_ts, end_ts) VALUES
+    ('old', '2024-05-02T09:00:00', '2024-05-02T10:00:00'),
+    ('old', '2024-05-02T10:00:00', '2024-05-02T11:00:00');
+INSERT INTO votes(poll_id, voter_name, option_id, available, comment) VALUES
+    ('old', 'alice', 1, 1, 'hi'), ('old', 'alice', 2, 0, 'hi'),
+    ('old', 'bob', 1, 1, NULL), ('old', 'bob', 2, 1, NULL);
+"""
+
+
+def test_migrates_legacy_database_to_current_version(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(LEGACY_SCHEMA)
+    legacy.close()
+
+    conn = get_conn(db_path)
+    assert schema_version(conn) == SCHEMA_VERSION == 8
+    assert conn.execute("SELECT voter_name, comment FROM voters ORDER BY voter_name").fetchall() == [
+        ("alice", "hi"),
+        ("bob", None),
+    ]
+    assert dict(conn.execute("SELECT option_id, yes_count FROM option_tallies")) == {1: 2, 2: 1}
+    poll = conn.execute("SELECT timezone, created_at, archived_at FROM polls").fetchone()
+    assert poll == ("Asia/Seoul", "2024-05-02", None)
+    expected = to_epoch_minutes(pd.to_datetime(["2024-05-02T09:00:00"]), "Asia/Seoul").tolist()
+    assert conn.execute("SELECT start_min FROM options WHERE option_id = 1").fetchone()[0] == expected[0]
+    conn.close()
+
+    # reopening a current database runs nothing
+    conn = get_conn(db_path)
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM voters").fetchone()[0] == 2
+    conn.close()
@@ -0,0 +1,185 @@
+"""Contract tests every :class:`PollRepository` backend has to pass."""
+from datetime import date, time
+
+import pytest
+
+from scheduler_core import generate_slot_arrays, to_epoch_minutes
+from tests.conftest import make_poll
+
+
+def option_ids(snapshot):
+    return snapshot.options["option_id"].tolist()
+
+
+def test_create_and_load_snapshot(any_repo):
+    snapshot = make_poll(any_repo, timezone="Europe/Berlin")
+    assert len(snapshot.options) == 6
+    assert snapshot.timezone == "Europe/Berlin"
+    assert snapshot.options["start_ts"].iloc[0] == "2030-03-04T09:00:00"
+    expected = to_epoch_minutes(["2030-03-04T09:00"], "Europe/Berlin")[0]
+    assert int(snapshot.options["start_min"].iloc[0]) == expected
+    assert any_repo.load_poll_snapshot("missing") is None
+    assert any_repo.load_polls()["poll_id"].tolist() == ["p1"]
+
+
+def test_writes_bump_revision(any_repo):
+    snapshot = make_poll(any_repo)
+    ids = option_ids(snapshot)
+    revision = any_repo.poll_revision("p1")
+    assert revision == snapshot.revision
+    any_repo.save_votes("p1", "alice", ids, ids[:1])
+    assert any_repo.poll_revision("p1") == revision + 1
+    # an unchanged save is not a write
+    any_repo.save_votes("p1", "alice", ids, ids[:1])
+    assert any_repo.poll_revision("p1") == revision + 1
+
+
+def test_save_votes_tallies_and_voters(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    assert any_repo.save_votes("p1", "alice", ids, ids[:3], comment="hi", voter_password="h1") == 6
+    assert any_repo.save_votes("p1", "bob", ids, ids[2:]) == 6
+    assert any_repo.save_votes("p1", "alice", ids, ids[1:4]) == 2
+
+    snapshot = any_repo.load_poll_snapshot("p1")
+    counts = {oid: n for oid, n in snapshot.tally.counts.items() if n}
+    assert counts == {ids[1]: 1, ids[2]: 2, ids[3]: 2, ids[4]: 1, ids[5]: 1}
+    assert sorted(any_repo.load_voter_choices("p1", "alice")) == ids[1:4]
+    assert tuple(any_repo.load_voter("p1", "alice")) == ("h1", "hi")
+    any_repo.set_voter_password("p1", "alice", "h2")
+    assert any_repo.load_voter("p1", "alice").voter_password == "h2"
+    assert any_repo.load_voter("p1", "carol") is None
+
+
+def test_remove_options_drops_votes_and_tallies(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    any_repo.save_votes("p1", "alice", ids, ids)
+    any_repo.remove_options("p1", ids[:2])
+    snapshot = any_repo.load_poll_snapshot("p1")
+    assert option_ids(snapshot) == ids[2:]
+    assert set(snapshot.tally.counts) == set(ids[2:])
+    assert sorted(any_repo.load_voter_choices("p1", "alice")) == ids[2:]
+
+
+def test_finalize_and_load_finalized(any_repo):
+    make_poll(any_repo, "p1")
+    make_poll(any_repo, "p2")
+    any_repo.finalize_poll("p1", "2030-03-04T10:00:00", "2030-03-04T11:00:00")
+    finalized = any_repo.load_finalized_polls()
+    assert finalized["poll_id"].tolist() == ["p1"]
+    start_min = to_epoch_minutes(["2030-03-04T10:00"], "Asia/Seoul")[0]
+    assert int(finalized["final_start_min"].iloc[0]) == start_min
+    assert int(finalized["final_end_min"].iloc[0]) == start_min + 60
+    assert any_repo.load_poll_snapshot("p1").final_slot is not None
+
+
+def test_delete_poll(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    any_repo.save_votes("p1", "alice", ids, ids)
+    any_repo.delete_poll("p1")
+    assert any_repo.load_poll_snapshot("p1") is None
+    assert any_repo.load_voter("p1", "alice") is None
+    assert any_repo.load_options_between(0, 2**62).empty
+
+
+def test_load_options_between(any_repo):
+    make_poll(any_repo, "p1", days=1)
+    make_poll(any_repo, "p2", days=2)
+    day_two = to_epoch_minutes(["2030-03-05T00:00"], "Asia/Seoul")[0]
+    rows = any_repo.load_options_between(day_two, day_two + 24 * 60)
+    assert rows["poll_id"].tolist() == ["p2"] * 3
+    assert rows["start_min"].is_monotonic_increasing
+
+
+def test_poll_page_search_pagination_and_archive(any_repo):
+    for n in range(5):
+        make_poll(any_repo, f"p{n}", days=1, title=f"Seminar {n}" if n % 2 else f"Reading group {n}")
+    page = any_repo.load_poll_page(limit=2)
+    assert len(page.polls) == 2 and page.next_cursor is not None
+    seen = page.polls["poll_id"].tolist()
+    while page.next_cursor is not None:
+        page = any_repo.load_poll_page(cursor=page.next_cursor, limit=2)
+        seen += page.polls["poll_id"].tolist()
+    assert sorted(seen) == [f"p{n}" for n in range(5)]
+
+    assert sorted(any_repo.load_poll_page("semi").polls["poll_id"]) == ["p1", "p3"]
+
+    day = date(2020, 1, 1)
+    any_repo.create_poll(
+        "old", "Old", "", day, day, time(9, 0), time(10, 0), 60, None,
+        generate_slot_arrays(day, day, time(9, 0), time(10, 0), 60),
+    )
+    any_repo.finalize_poll("old", "2020-01-01T09:00:00", "2020-01-01T10:00:00")
+    assert "old" not in any_repo.load_poll_page().polls["poll_id"].tolist()
+    assert any_repo.archive_finished_polls() == ["old"]
+    assert any_repo.load_poll_page(archived=True).polls["poll_id"].tolist() == ["old"]
+
+
+def test_result_chunks(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    any_repo.save_votes("p1", "bob", ids, ids[:1])
+    any_repo.save_votes("p1", "alice", ids, ids[:1])
+    columns, chunks = any_repo.result_chunks(["p1"], 4)
+    batches = list(chunks)
+    assert columns == ["voter_name", "option_id", "available", "start_ts", "end_ts"]
+    assert [len(batch) for batch in batches] == [4, 4, 4]
+    assert [row[0] for row in batches[0][:2]] == ["alice", "bob"]
+    columns, chunks = any_repo.result_chunks(None, 100)
+    assert columns[0] == "poll_id" and len(next(chunks)) == 12
+
+
+def test_calendar_sync_records(any_repo):
+    assert any_repo.load_calendar_sync("cal") == {}
+    any_repo.record_calendar_sync("cal", [("p1", "ev1", "f1"), ("p2", "ev2", "f2")])
+    any_repo.record_calendar_sync("cal", [("p1", "ev1", "f3")])
+    assert any_repo.load_calendar_sync("cal") == {"p1": ("ev1", "f3"), "p2": ("ev2", "f2")}
+    assert any_repo.load_calendar_sync("other") == {}
+
+
+def test_remove_options_clears_final_time_it_overlaps(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    # a three-slot meeting, 09:00-12:00 on the first day
+    any_repo.finalize_poll("p1", "2030-03-04T09:00:00", "2030-03-04T12:00:00")
+    any_repo.remove_options("p1", [ids[4]])  # a slot on the second day
+    assert any_repo.load_poll_snapshot("p1").final_slot is not None
+
+    any_repo.remove_options("p1", [ids[1]])  # the middle slot of the meeting
+    snapshot = any_repo.load_poll_snapshot("p1")
+    assert snapshot.final_slot is None
+    assert snapshot.meta["final_start_ts"] is None
+    assert any_repo.load_finalized_polls().empty
+
+
+def test_remove_options_keeps_adjacent_final_time(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    any_repo.finalize_poll("p1", "2030-03-04T10:00:00", "2030-03-04T11:00:00")
+    any_repo.remove_options("p1", [ids[0], ids[2]])  # 09:00-10:00 and 11:00-12:00 only touch it
+    assert any_repo.load_finalized_polls()["poll_id"].tolist() == ["p1"]
+
+
+def test_finalize_poll_rejects_windows_that_are_not_its_slots(any_repo):
+    ids = option_ids(make_poll(any_repo))
+    for start, end in [
+        ("2030-03-04T09:30:00", "2030-03-04T10:30:00"),  # straddles two slots
+        ("2030-03-04T11:00:00", "2030-03-05T10:00:00"),  # runs over the night gap
+        ("2030-03-06T09:00:00", "2030-03-06T10:00:00"),  # a day the poll does not have
+        ("2030-03-04T10:00:00", "2030-03-04T10:00:00"),  # empty
+    ]:
+        with pytest.raises(ValueError):
+            any_repo.finalize_poll("p1", start, end)
+    assert any_repo.load_poll_snapshot("p1").final_slot is None
+
+    any_repo.remove_options("p1", [ids[1]])  # e.g. an admin edit racing the finalize
+    with pytest.raises(ValueError):
+        any_repo.finalize_poll("p1", "2030-03-04T09:00:00", "2030-03-04T12:00:00")
+    any_repo.finalize_poll("p1", "2030-03-04T11:00:00", "2030-03-04T12:00:00")
+    assert any_repo.load_poll_snapshot("p1").final_slot is not None
+
+
+def test_count_active_polls(any_repo):
+    assert any_repo.count_active_polls() == 0
+    for poll_id in ("p1", "p2", "p3"):
+        make_poll(any_repo, poll_id)
+    any_repo.finalize_poll("p2", "2030-03-04T09:00:00", "2030-03-04T10:00:00")
+    assert any_repo.count_active_polls() == 2
+    any_repo.delete_poll("p3")
+    assert any_repo.count_active_polls() == 1
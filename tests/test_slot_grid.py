@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scheduler_core import SlotIndex, run_positions, slot_runs, to_epoch_minutes
+from tests.conftest import make_poll
+
+
+def grid_positions(cells):
+    return sorted(pos for row in cells for pos in row if pos >= 0)
+
+
+@pytest.mark.parametrize(
+    "positions, runs",
+    [
+        ([], []),
+        ([4], [[4, 1]]),
+        ([3, 1, 2, 7, 8, 10], [[1, 3], [7, 2], [10, 1]]),
+    ],
+)
+def test_slot_runs_round_trip(positions, runs):
+    assert slot_runs(positions) == runs
+    assert run_positions(runs) == sorted(positions)
+
+
+def test_slot_runs_round_trip_random():
+    rng = np.random.default_rng(11)
+    for _ in range(50):
+        positions = sorted(set(rng.integers(0, 200, size=rng.integers(0, 120)).tolist()))
+        assert run_positions(slot_runs(positions)) == positions
+
+
+def test_grid_layout(repo):
+    slots = make_poll(repo, days=2).slots
+    days, times, cells = slots.grid()
+    assert days == ["2030-03-04 (Mon)", "2030-03-05 (Tue)"]
+    assert times == ["09:00 - 10:00", "10:00 - 11:00", "11:00 - 12:00"]
+    assert cells == [[0, 3], [1, 4], [2, 5]]
+
+
+def slot_index(wall, timezone):
+    """SlotIndex over ``(start, end)`` wall-clock pairs given as epoch-minute offsets from UTC."""
+    starts = np.array([s for s, _ in wall], dtype=np.int64)
+    ends = np.array([e for _, e in wall], dtype=np.int64)
+    options = pd.DataFrame(
+        {"option_id": range(1, len(wall) + 1), "start_ts": "", "end_ts": "", "start_min": starts, "end_min": ends}
+    )
+    return SlotIndex.from_options(options, timezone)
+
+
+def test_grid_keeps_slots_with_the_same_label_apart():
+    start = int(to_epoch_minutes(["2030-03-04T09:00"], "UTC")[0])
+    # a custom slot list holding 09:00-10:00 twice on the first day
+    index = slot_index([(start, start + 60), (start, start + 60), (start + 1440, start + 1500)], "UTC")
+    days, times, cells = index.grid()
+    assert times == ["09:00 - 10:00", "09:00 - 10:00 (2)"]
+    assert cells == [[0, 2], [1, -1]]
+
+
+def test_grid_keeps_repeated_dst_hour():
+    # New York falls back at 02:00 EDT on 2030-11-03, so 01:00-01:30 happens twice
+    midnight = int(to_epoch_minutes(["2030-11-03T00:00"], "America/New_York")[0])
+    index = slot_index([(midnight + 30 * h, midnight + 30 * (h + 1)) for h in range(6)], "America/New_York")
+    days, times, cells = index.grid()
+    assert times == [
+        "00:00 - 00:30",
+        "00:30 - 01:00",
+        "01:00 - 01:30",
+        "01:30 - 01:00",  # 01:30 EDT to 01:00 EST
+        "01:00 - 01:30 (2)",
+        "01:30 - 02:00",
+    ]
+    assert [row[0] for row in cells] == [0, 1, 2, 3, 4, 5]
+
+
+def test_grid_orders_rows_across_days_by_earliest_start():
+    start = int(to_epoch_minutes(["2030-03-04T09:00"], "UTC")[0])
+    # day one has 09:00 twice then 10:00; day two only 09:00 once and 08:00
+    wall = [(start, start + 60), (start, start + 60), (start + 60, start + 120)]
+    wall += [(start + 1440 - 60, start + 1440), (start + 1440, start + 1500)]
+    days, times, cells = slot_index(wall, "UTC").grid()
+    assert times == ["08:00 - 09:00", "09:00 - 10:00", "09:00 - 10:00 (2)", "10:00 - 11:00"]
+    assert cells == [[-1, 3], [0, 4], [1, -1], [2, -1]]
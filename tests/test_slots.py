@@ -0,0 +1,93 @@
+from datetime import date, datetime, time
+
+import numpy as np
+
+from scheduler_core import SlotArrays, SlotRules, generate_slot_arrays, generate_slots, to_epoch_minutes
+
+MON = date(2030, 3, 4)
+FRI = date(2030, 3, 8)
+SUN = date(2030, 3, 10)
+
+
+def wall(slots: SlotArrays):
+    starts, ends = slots.iso()
+    return [(s[5:16], e[11:16]) for s, e in zip(starts, ends)]
+
+
+def test_plain_grid_shortens_last_slot():
+    slots = generate_slot_arrays(MON, date(2030, 3, 5), time(9, 0), time(10, 30), 40)
+    assert wall(slots) == [
+        ("03-04T09:00", "09:40"),
+        ("03-04T09:40", "10:20"),
+        ("03-04T10:20", "10:30"),
+        ("03-05T09:00", "09:40"),
+        ("03-05T09:40", "10:20"),
+        ("03-05T10:20", "10:30"),
+    ]
+    assert slots.starts.dtype == np.dtype("datetime64[m]")
+
+
+def test_weekdays_and_excluded_dates():
+    rules = SlotRules(weekdays=[0, 2, 4], exclude_dates=[date(2030, 3, 6)])
+    slots = generate_slot_arrays(MON, SUN, time(9, 0), time(10, 0), 60, rules)
+    assert wall(slots) == [("03-04T09:00", "10:00"), ("03-08T09:00", "10:00")]
+
+
+def test_breaks_restart_slotting():
+    rules = SlotRules(breaks=[(time(12, 0), time(13, 30))])
+    slots = generate_slot_arrays(MON, MON, time(11, 0), time(15, 0), 60, rules)
+    assert wall(slots) == [
+        ("03-04T11:00", "12:00"),
+        ("03-04T13:30", "14:30"),
+        ("03-04T14:30", "15:00"),
+    ]
+
+
+def test_day_windows_override_the_default_window():
+    rules = SlotRules(day_windows={4: (time(14, 0), time(16, 0))})  # Fridays run later
+    slots = generate_slot_arrays(date(2030, 3, 7), FRI, time(9, 0), time(10, 0), 60, rules)
+    assert wall(slots) == [("03-07T09:00", "10:00"), ("03-08T14:00", "15:00"), ("03-08T15:00", "16:00")]
+
+
+def test_empty_ranges():
+    assert len(generate_slot_arrays(FRI, MON, time(9, 0), time(10, 0), 30)) == 0
+    assert len(generate_slot_arrays(MON, FRI, time(10, 0), time(10, 0), 30)) == 0
+    assert len(generate_slot_arrays(MON, FRI, time(9, 0), time(10, 0), 30, SlotRules(weekdays=[5, 6]))) == 0
+    # a break covering the whole window leaves nothing
+    rules = SlotRules(breaks=[(time(8, 0), time(11, 0))])
+    assert len(generate_slot_arrays(MON, FRI, time(9, 0), time(10, 0), 30, rules)) == 0
+
+
+def test_matches_generate_slots():
+    rules = SlotRules(weekdays=[1, 3], breaks=[(time(12, 0), time(13, 0))])
+    slots = generate_slot_arrays(MON, SUN, time(10, 0), time(15, 0), 45, rules)
+    pairs = generate_slots(MON, SUN, time(10, 0), time(15, 0), 45, rules)
+    assert pairs[0] == (datetime(2030, 3, 5, 10, 0), datetime(2030, 3, 5, 10, 45))
+    assert SlotArrays.from_pairs(pairs).iso() == slots.iso()
+
+
+def test_rules_json_round_trip():
+    rules = SlotRules(
+        weekdays=[0, 4],
+        exclude_dates=[MON],
+        breaks=[(time(12, 0), time(13, 0))],
+        day_windows={4: (time(14, 0), time(16, 0))},
+    )
+    assert SlotRules.from_json(rules.to_json()) == rules
+    assert SlotRules.from_json(None) == SlotRules()
+
+
+def test_dst_gap_and_repeat_in_epoch_minutes():
+    tz = "America/New_York"
+    # 2030-03-10 02:00-03:00 does not exist; the 02:00 slot moves forward to 03:00 EDT
+    spring = generate_slot_arrays(SUN, SUN, time(1, 0), time(4, 0), 60)
+    starts, ends = spring.minutes(tz)
+    one_am = int(to_epoch_minutes(["2030-03-10T01:00"], tz)[0])
+    assert (starts - one_am).tolist() == [0, 60, 60]
+    assert (ends - one_am).tolist() == [60, 60, 120]
+    # 2030-11-03 01:00 happens twice; wall-clock times resolve to standard time (the second one)
+    fall = generate_slot_arrays(date(2030, 11, 3), date(2030, 11, 3), time(0, 0), time(2, 0), 60)
+    starts, ends = fall.minutes(tz)
+    midnight = int(to_epoch_minutes(["2030-11-03T00:00"], tz)[0])
+    assert (starts - midnight).tolist() == [0, 120]
+    assert (ends - midnight).tolist() == [120, 180]
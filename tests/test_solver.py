@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from scheduler_core import SlotArrays
+from scheduler_solver import best_meetings, plan_series
+from tests.conftest import FIRST_DAY, make_poll
+
+
+def vote(repo, snapshot, choices):
+    """Save ``{voter: [positions]}`` and reload the snapshot."""
+    ids = snapshot.options["option_id"].tolist()
+    for name, positions in choices.items():
+        repo.save_votes(snapshot.poll_id, name, ids, [ids[p] for p in positions])
+    return repo.load_poll_snapshot(snapshot.poll_id)
+
+
+def starts(meetings):
+    return [m.positions[0] for m in meetings]
+
+
+def test_required_attendees_rank_first(repo):
+    # positions 0-2: 09:00, 10:00, 11:00 on day one
+    snapshot = vote(repo, make_poll(repo), {"alice": [0, 1], "bob": [1, 2], "carol": [0]})
+    meetings = best_meetings(snapshot.availability, snapshot.slots, required=["bob"])
+    assert starts(meetings)[:2] == [1, 2]
+    assert meetings[0].attendees == ["alice", "bob"] and meetings[0].missing_required == []
+    assert meetings[2].positions == [0] and meetings[2].missing_required == ["bob"]
+
+
+def test_ties_break_on_attendees_then_start(repo):
+    snapshot = vote(repo, make_poll(repo), {"alice": [4, 5], "bob": [1, 4, 5], "carol": [0, 1, 2]})
+    meetings = best_meetings(snapshot.availability, snapshot.slots, top=6)
+    assert starts(meetings) == [1, 4, 5, 0, 2, 3]
+    assert [len(m.attendees) for m in meetings] == [2, 2, 2, 1, 1, 0]
+
+
+def test_multi_slot_meetings_stay_within_a_run(repo):
+    snapshot = make_poll(repo)  # 09:00-12:00 on two days; 12:00 -> 09:00 is not back to back
+    snapshot = vote(repo, snapshot, {"alice": range(6), "bob": range(6)})
+    assert starts(best_meetings(snapshot.availability, snapshot.slots, length=2)) == [0, 1, 3, 4]
+    [first, second] = best_meetings(snapshot.availability, snapshot.slots, length=3)
+    assert (first.start_ts, first.end_ts) == ("2030-03-04T09:00:00", "2030-03-04T12:00:00")
+    assert first.label == "03/04 (Mon) 09:00 - 12:00" and second.positions == [3, 4, 5]
+    assert best_meetings(snapshot.availability, snapshot.slots, length=4) == []
+
+
+def test_series_covers_everyone_and_reports_who_is_short(repo):
+    snapshot = vote(repo, make_poll(repo), {"alice": [0], "bob": [3], "carol": [], "dan": [0, 3]})
+    plan = plan_series(snapshot.availability, snapshot.slots, meetings=2, min_attend=1)
+    assert starts(plan.meetings) == [0, 3]
+    assert plan.attendance == {"alice": 1, "bob": 1, "carol": 0, "dan": 2}
+    assert plan.short == {"carol": 1}
+
+    plan = plan_series(snapshot.availability, snapshot.slots, meetings=2, min_attend=2)
+    assert starts(plan.meetings) == [0, 3]
+    assert plan.short == {"alice": 1, "bob": 1, "carol": 2}
+
+
+def test_series_respects_required_and_min_gap_days(repo):
+    snapshot = vote(repo, make_poll(repo, days=3), {"alice": range(9), "bob": range(3, 9)})
+    plan = plan_series(snapshot.availability, snapshot.slots, meetings=2)
+    assert starts(plan.meetings) == [3, 4]
+    plan = plan_series(snapshot.availability, snapshot.slots, meetings=3, min_gap_days=2)
+    assert starts(plan.meetings) == [3]  # day three is the only one two days after day two
+    plan = plan_series(snapshot.availability, snapshot.slots, meetings=2, min_gap_days=1, required=["alice"])
+    assert starts(plan.meetings) == [3, 6]
+
+
+def test_series_skips_meetings_that_overlap_in_time(repo):
+    # half-hour staggered hour slots: positions 0 and 1 overlap even though they are distinct options
+    day = FIRST_DAY
+    hours = [(9, 0), (9, 30), (10, 0), (10, 30)]
+    pairs = [(datetime(2030, 3, 4, h, m), datetime(2030, 3, 4, h + 1, m)) for h, m in hours]
+    repo.create_poll(
+        "p1", "Staggered", "", day, day, pairs[0][0].time(), pairs[-1][1].time(), 60, None,
+        SlotArrays.from_pairs(pairs),
+    )
+    snapshot = vote(repo, repo.load_poll_snapshot("p1"), {"alice": range(4), "bob": range(4)})
+    plan = plan_series(snapshot.availability, snapshot.slots, meetings=3)
+    assert [m.start_ts for m in plan.meetings] == ["2030-03-04T09:00:00", "2030-03-04T10:00:00"]
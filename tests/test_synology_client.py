@@ -0,0 +1,142 @@
+import json
+from datetime import datetime
+from http.client import RemoteDisconnected
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from synology_client import SynologyClient, SynologyError, _event_form
+
+BASE_URL = "https://nas.test:5001"
+ENDPOINTS = {"SYNO.API.Auth": {"path": "auth.cgi"}, "SYNO.Cal.Event": {"path": "entry.cgi"}}
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers discovery and login itself; event calls are served from ``script`` in order.
+
+    Each script entry is a JSON body, an ``(status, body)`` pair or an exception to raise.
+    """
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.logins = 0
+        self.event_forms = []
+
+    def send(self, request, **kwargs):
+        if request.url.startswith(f"{BASE_URL}/webapi/query.cgi"):
+            return self._response(request, 200, {"success": True, "data": ENDPOINTS})
+        form = {key: values[0] for key, values in parse_qs(request.body).items()}
+        if form["api"] == "SYNO.API.Auth":
+            self.logins += 1
+            return self._response(request, 200, {"success": True, "data": {"sid": f"sid{self.logins}"}})
+        self.event_forms.append(form)
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        status, body = step if isinstance(step, tuple) else (200, step)
+        return self._response(request, status, body)
+
+    @staticmethod
+    def _response(request, status, body):
+        resp = requests.Response()
+        resp.status_code = status
+        resp._content = json.dumps(body).encode("utf-8")
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+def scripted_client(*script):
+    client = SynologyClient(BASE_URL, "lab", "secret", backoff=0)
+    adapter = ScriptedAdapter(script)
+    client.session.mount("https://", adapter)
+    return client, adapter
+
+
+def push(client, event_id=None):
+    start = datetime(2030, 3, 4, 10, 0)
+    return client.create_event("cal", "Seminar", "", start, start.replace(hour=11), event_id)
+
+
+CREATED = {"success": True, "data": {"evt_id": "ev1"}}
+ABORTED = requests.ConnectionError(ProtocolError("Connection aborted.", RemoteDisconnected("closed")))
+REFUSED = requests.ConnectionError(
+    MaxRetryError(None, "/webapi/entry.cgi", NewConnectionError(None, "Connection refused"))
+)
+
+
+def test_retries_gateway_errors():
+    client, adapter = scripted_client((503, {}), (502, {}), CREATED)
+    assert push(client)["data"]["evt_id"] == "ev1"
+    assert len(adapter.event_forms) == 3
+
+
+def test_create_is_not_retried_after_connection_dropped():
+    client, adapter = scripted_client(ABORTED, CREATED)
+    with pytest.raises(requests.ConnectionError):
+        push(client)
+    assert len(adapter.event_forms) == 1
+
+
+def test_create_is_not_retried_after_read_timeout():
+    client, adapter = scripted_client(requests.ReadTimeout(), CREATED)
+    with pytest.raises(requests.ReadTimeout):
+        push(client)
+    assert len(adapter.event_forms) == 1
+
+
+@pytest.mark.parametrize("error", [REFUSED, requests.ConnectTimeout()], ids=["refused", "connect_timeout"])
+def test_create_is_retried_when_never_connected(error):
+    client, adapter = scripted_client(error, CREATED)
+    assert push(client)["data"]["evt_id"] == "ev1"
+    assert len(adapter.event_forms) == 2
+
+
+def test_update_is_retried_after_connection_dropped():
+    client, adapter = scripted_client(ABORTED, requests.ReadTimeout(), {"success": True})
+    push(client, event_id="ev1")
+    assert [form["method"] for form in adapter.event_forms] == ["set"] * 3
+    assert adapter.event_forms[-1]["evt_id"] == "ev1"
+
+
+def test_sid_is_reused_across_pushes():
+    client, adapter = scripted_client(CREATED, CREATED)
+    push(client)
+    push(client)
+    assert adapter.logins == 1
+    assert [form["_sid"] for form in adapter.event_forms] == ["sid1", "sid1"]
+
+
+def test_logs_in_again_once_when_session_expires():
+    expired = {"success": False, "error": {"code": 119}}
+    client, adapter = scripted_client(expired, CREATED)
+    assert push(client)["data"]["evt_id"] == "ev1"
+    assert adapter.logins == 2
+    assert [form["_sid"] for form in adapter.event_forms] == ["sid1", "sid2"]
+
+    client, adapter = scripted_client(expired, expired)
+    with pytest.raises(SynologyError):
+        push(client)
+    assert adapter.logins == 2
+
+
+def test_event_times_are_sent_in_utc():
+    start, end = datetime(2030, 3, 4, 14, 0), datetime(2030, 3, 4, 15, 0)
+    event = json.loads(_event_form("sid", "cal", "Seminar", "", start, end, timezone="Asia/Seoul")["event"])
+    assert event["start"] == {"time": "2030-03-04T05:00:00", "tz": "UTC"}
+    assert event["end"] == {"time": "2030-03-04T06:00:00", "tz": "UTC"}
+
+
+def test_push_event_passes_the_poll_timezone():
+    client, adapter = scripted_client(CREATED)
+    start = datetime(2030, 7, 1, 9, 0)
+    client.push_event("cal", "Seminar", "", start, start.replace(hour=10), "Europe/Berlin").future.result()
+    event = json.loads(adapter.event_forms[0]["event"])
+    assert event["start"]["time"] == "2030-07-01T07:00:00"
@@ -0,0 +1,35 @@
+from tests.conftest import make_poll
+
+
+def stored_tallies(conn, poll_id):
+    return dict(conn.execute("SELECT option_id, yes_count FROM option_tallies WHERE poll_id = ?", (poll_id,)))
+
+
+def recounted_tallies(conn, poll_id):
+    rows = conn.execute(
+        """
+        SELECT o.option_id, COALESCE(SUM(v.available), 0) FROM options o
+        LEFT JOIN votes v ON v.option_id = o.option_id
+        WHERE o.poll_id = ? GROUP BY o.option_id
+        """,
+        (poll_id,),
+    )
+    return dict(rows)
+
+
+def test_save_votes_keeps_tallies_consistent(repo):
+    snapshot = make_poll(repo)
+    option_ids = snapshot.options["option_id"].tolist()
+
+    assert repo.save_votes("p1", "alice", option_ids, option_ids[:3]) == len(option_ids)
+    assert repo.save_votes("p1", "bob", option_ids, option_ids[2:]) == len(option_ids)
+    # only changed rows are written; an unchanged save writes nothing
+    assert repo.save_votes("p1", "alice", option_ids, option_ids[1:4]) == 2
+    assert repo.save_votes("p1", "alice", option_ids, option_ids[1:4]) == 0
+
+    conn = repo.pool.connection()
+    assert stored_tallies(conn, "p1") == recounted_tallies(conn, "p1")
+    expected = {oid: n for oid, n in recounted_tallies(conn, "p1").items() if n}
+    snapshot = repo.load_poll_snapshot("p1")
+    assert {oid: n for oid, n in snapshot.tally.counts.items() if n} == expected
+    assert {oid: n for oid, n in snapshot.availability.tally().counts.items() if n} == expected
@@ -0,0 +1,33 @@
+import threading
+
+from scheduler_core import Tracer
+
+
+def test_tracing_toggle_is_per_run():
+    tracer = Tracer()
+    traced_run = tracer.begin("admin", enabled=True)
+    with tracer._record(traced_run, "work", "span", {}):
+        pass
+    tracer.end()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(tracer.begin("guest")))
+    thread.start()
+    thread.join()
+
+    assert other == [None] and tracer.enabled is False
+    assert [tr.label for tr in tracer.traces] == ["admin"]
+    assert [sp.name for sp in traced_run.spans] == ["work"]
+    assert tracer.begin("admin", enabled=False) is None and tracer.current() is None
+
+
+def test_session_traces_only_lists_that_session():
+    tracer = Tracer()
+    for session in ("a", "b", "a"):
+        tracer.begin("guest", enabled=True, session=session)
+        tracer.end()
+    tracer.begin("admin", enabled=True)
+    tracer.end()
+    assert len(tracer.traces) == 4
+    assert [tr.session for tr in tracer.session_traces("a")] == ["a", "a"]
+    assert all(tr.ended is not None for tr in tracer.traces)
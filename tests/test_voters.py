@@ -0,0 +1,10 @@
+from tests.conftest import make_poll
+
+
+def test_save_votes_keeps_stored_comment_and_password(repo):
+    snapshot = make_poll(repo)
+    option_ids = snapshot.options["option_id"].tolist()
+    repo.save_votes("p1", "alice", option_ids, option_ids[:1], comment="late", voter_password="hash")
+    repo.save_votes("p1", "alice", option_ids, option_ids[:2])
+    assert tuple(repo.load_voter("p1", "alice")) == ("hash", "late")
+    assert repo.load_voter_choices("p1", "alice") == option_ids[:2]